@@ -6,25 +6,29 @@ from __future__ import annotations
 from pathlib import Path
 from shiny import App, Inputs, Outputs, Session, ui
 
-import pandas as pd
-from great_tables import GT, style, loc
-from shiny import App, render, reactive, ui
-import numpy as np
-from components.table_logic import summary
-from components.table_visual import table_display
-from datetime import datetime
-import io
+from shiny import render, reactive, req, ui
+from components.dashboard import Dashboard
+from components.table_logic import DEFAULT_GOAL, DEFAULT_PRIORITY, view_options
+from components.Discount_logic import COMPANY_GOALS, CUSTOMER_PRIORITIES
+from components.table_visual import strategy_cells
+from components.export import (
+    EXPORT_FORMATS, clean_export_frame, export_executor, export_filename,
+    iter_export_chunks, iter_file_chunks,
+)
+import asyncio
+import logging
+import os
 
-# Load dataset
-df = pd.read_excel("dataset/sample_-_superstore.xls")
-current_date = df["Order Date"].max().strftime("%b %d, %Y")
-df["Year"] = pd.to_datetime(df["Order Date"]).dt.year.astype(str)
+logger = logging.getLogger("dashboard.app")
 
+# Dataset, caches and views shared by every session of this process (see components/dashboard.py);
+# serve.py adds its warm-up to the app
+dashboard = Dashboard("dataset/sample_-_superstore.xls")
+refresher = dashboard.refresher
+current_date = dashboard.dataset.last_order_date.strftime("%b %d, %Y")
 
 # Get unique values for filters
-region_options = ["All"] + sorted(df["Region"].dropna().unique())
-year_options = sorted(df["Year"].dropna().unique())
-year_options = year_options[1:]
+region_options, year_options = view_options(dashboard.dataset.cube)
 
 # ========================================================================
 
@@ -52,23 +56,44 @@ def server(input: Inputs, output: Outputs, session: Session) -> None:
     ui.input_radio_buttons(
         "company_goal", 
         "Goal:", 
-        choices=["Revenue Growth", "Profit Protection", "Market Share Expansion", "Customer Retention"], 
-        selected="Revenue Growth",
+        choices=COMPANY_GOALS, 
+        selected=DEFAULT_GOAL,
     )
 
     # Customer priority
     ui.input_radio_buttons(
         "customer_priority", 
         "Priority:", 
-        choices=["New Customers", "Loyal Customers", "High-Value Accounts", "All Segments"], 
-        selected="New Customers"
+        choices=CUSTOMER_PRIORITIES, 
+        selected=DEFAULT_PRIORITY
+    )
+
+    # Export every goal x priority strategy side by side
+    ui.input_checkbox(
+        "export_matrix",
+        "Export all goal × priority strategies",
+        value=False
+    )
+
+    # File format of the exports (plain numeric columns, no HTML)
+    ui.input_select(
+        "export_format",
+        "Export format:",
+        choices={"csv": "CSV", "parquet": "Parquet", "xlsx": "Excel (XLSX)"},
+        selected="csv"
+    )
+
+    # Every region x year in one zip, built in the background
+    ui.input_action_button(
+        "export_all",
+        "Export all regions × years (zip)"
     )
 
     ui.HTML(f"""
     <div class="more-info">
         <div style="margin-bottom: 10px;">
             <span style="font-weight: 600;">Data last updated:</span><br>
-            {current_date}
+            <span id="data_last_updated" class="shiny-text-output">{current_date}</span>
         </div>
         <div>
             <span style="font-weight: 600;">Developed by:</span><br>
@@ -78,38 +103,243 @@ def server(input: Inputs, output: Outputs, session: Session) -> None:
     """)
 
 
+    def selected_year():
+        # Select inputs come back as strings, the data has integer years
+        return int(input.year())
+
+    if refresher is not None:
+        # Re-render when the workbook was refreshed (an in-memory version check every second)
+        @reactive.poll(lambda: refresher.state.version)
+        def live_dataset():
+            return refresher.state
+
+        # Choices this session's selects were last sent, so a refresh only resends them when they change
+        sent_choices = reactive.value((region_options, year_options))
+
+        @reactive.effect
+        def update_filter_choices():
+            # New years or regions in the refreshed data
+            regions, years = view_options(live_dataset().cube)
+            with reactive.isolate():
+                region, year = input.region(), selected_year()
+                sent_regions, sent_years = sent_choices()
+            if years != sent_years:
+                ui.update_select("year", choices=years, selected=year if year in years else years[-1])
+            if regions != sent_regions:
+                ui.update_select("region", choices=regions, selected=region if region in regions else regions[0])
+            sent_choices.set((regions, years))
+    else:
+        def live_dataset():
+            return dashboard.dataset
+
+    @render.text
+    def data_last_updated():
+        return live_dataset().last_order_date.strftime("%b %d, %Y")
+
     @reactive.Calc
-    def filtered():
-        f = df[df["Year"] == input.year()]
-        if input.region() != "All":
-            f = f[f["Region"] == input.region()]
-        return f
+    def table_matrix():
+        # All 16 goal/priority strategies of the selected view, for the downloads (the
+        # table itself is computed by table_task below, which leaves it in the cache)
+        return dashboard.view_matrix(selected_year(), input.region(), live_dataset())
 
     @reactive.Calc
     def table_logic():
-        return summary(df, filtered(), input.year(), input.region(), input.company_goal(), input.customer_priority()  )
+        return dashboard.view_strategy(table_matrix(), input.company_goal(), input.customer_priority())
 
-    @render.download(filename=lambda: f"export_{input.region()}_{input.year()}.csv")
+    @render.download(
+        filename=lambda: export_filename(f"export_{input.region()}_{input.year()}", input.export_format()),
+        media_type=lambda: EXPORT_FORMATS[input.export_format()][1],
+    )
     def navbar_download():
-        # Build the numeric summary from the same reactive filtered data
-        f = table_logic()                      
-        if f.empty:
+        # Export the summary from the same reactive data, without the HTML markup
+        f = table_matrix() if input.export_matrix() else table_logic()
+        if len(f) == 0:
             yield "No data available"
             return
 
-        export_df = (f)
+        # Streamed a chunk at a time instead of building the whole file first
+        estimates = dashboard.view_estimates(input.region(), live_dataset())
+        yield from iter_export_chunks(clean_export_frame(f, estimates), input.export_format())
+
+    # Zips built for this session, removed when it ends
+    bulk_files = []
 
-        # Return CSV text (strings yielded will be encoded as UTF-8)
-        buf = io.StringIO()
-        export_df.to_csv(buf, index=False)
-        yield buf.getvalue()
+    @reactive.extended_task
+    async def bulk_export_task(fmt, all_strategies, goal, priority):
+        # Runs in the shared export worker thread, so the session stays responsive meanwhile
+        loop = asyncio.get_running_loop()
+        path = await loop.run_in_executor(export_executor, dashboard.bulk_export, fmt, all_strategies, goal, priority)
+        bulk_files.append(path)
+        return path
+
+    @reactive.effect
+    @reactive.event(input.export_all)
+    def start_bulk_export():
+        bulk_export_task(input.export_format(), input.export_matrix(), input.company_goal(), input.customer_priority())
+
+    @render.text
+    def bulk_status():
+        return {
+            "running": "Preparing the zip…",
+            "success": "Zip ready, download started.",
+            "error": "Export failed, please try again.",
+        }.get(bulk_export_task.status(), "")
+
+    @reactive.effect
+    async def announce_bulk_export():
+        # Starts the download on the client (see the "bulk_export_ready" handler in navbar-filter.lua)
+        if bulk_export_task.status() == "success":
+            await session.send_custom_message("bulk_export_ready", {"id": "bulk_download"})
+
+    @render.download(filename="export_all_regions_years.zip", media_type="application/zip", label="Download zip")
+    def bulk_download():
+        if bulk_export_task.status() != "success":
+            yield "No export ready"
+            return
+        yield from iter_file_chunks(bulk_export_task.result())
+
+    def remove_bulk_exports():
+        for path in bulk_files:
+            if os.path.exists(path):
+                os.remove(path)
+
+    session.on_ended(remove_bulk_exports)
 
     # ========================================================================
 
+    @reactive.extended_task
+    async def table_task(data, year, region, goal, priority):
+        # Runs in the render threads, so other sessions keep being served meanwhile
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(dashboard.render_executor, dashboard.compute_view, data, year, region, goal, priority)
+
+    def restart_table_task(goal, priority):
+        # A render still running (or queued) for earlier inputs is cancelled
+        with reactive.isolate():
+            data, year, region = live_dataset(), selected_year(), input.region()
+        dashboard.warmup.note_activity()
+        table_task.cancel()
+        table_task(data, year, region, goal, priority)
+
+    @reactive.effect
+    def start_table_task():
+        # Year/region (or dataset) changes render a new table
+        input.year(), input.region(), live_dataset()
+        with reactive.isolate():
+            restart_table_task(input.company_goal(), input.customer_priority())
+
     @render.ui
     def render_table_ui():
-        df_sum = table_logic()
-        return table_display(df_sum, input.year(), input.region())
+        # Goal/priority changes patch the strategy column in place through
+        # push_strategy_column() below
+        if table_task.status() == "cancelled":
+            req(False, cancel_output=True)  # a newer render is queued: keep the current table meanwhile
+        view = table_task.result()
+        # data-rows/data-total: rows sent so far and in all (see requestTablePage in navbar-filter.lua)
+        return ui.div(
+            view.table, class_="strategy-table", data_view=view.key,
+            data_rows=min(len(view.matrix), dashboard.page_rows), data_total=len(view.matrix),
+        )
+
+    @reactive.effect
+    @reactive.event(input.company_goal, input.customer_priority, ignore_init=True)
+    async def push_strategy_column():
+        goal, priority = input.company_goal(), input.customer_priority()
+        if table_task.status() == "running":
+            # The table on its way has the previous strategy column: render it again
+            restart_table_task(goal, priority)
+            return
+        if table_task.status() != "success":
+            return
+        view = table_task.result()
+        df_sum = dashboard.view_strategy(view.matrix, goal, priority)
+        if len(df_sum) == 0:
+            return
+        # Product rows of the expanded sub-categories follow the new goal/priority too
+        products = {}
+        for key, node in expanded_nodes:
+            if key == view.key:
+                rows = dashboard.product_strategy(view, node, goal, priority)
+                products[node] = strategy_cells(rows) if len(rows) else []
+        # Only the rows sent so far; further pages are rendered with the new goal/priority
+        shown = shown_rows.get(view.key, dashboard.page_rows)
+        await session.send_custom_message(
+            "strategy_column",
+            {"view": view.key, "cells": strategy_cells(df_sum[:shown]), "products": products},
+        )
+
+    # Rows sent of a paged table, by view key (the first page until more are asked for)
+    shown_rows = {}
+
+    async def send_table_page(view, start):
+        # Computed in the render threads; done again if the goal/priority moved meanwhile
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                with reactive.isolate():
+                    goal, priority = input.company_goal(), input.customer_priority()
+                html = await loop.run_in_executor(dashboard.render_executor, dashboard.compute_page, view, start, goal, priority)
+                with reactive.isolate():
+                    if (goal, priority) == (input.company_goal(), input.customer_priority()):
+                        break
+        except Exception:
+            logger.exception("rendering rows from %d of %s failed", start, view.key)
+            await send_no_table_page(view.key, start)
+            return
+        stop = min(start + dashboard.page_rows, len(view.matrix))
+        shown_rows.clear()
+        shown_rows[view.key] = stop
+        await session.send_custom_message("table_rows", {"view": view.key, "start": start, "count": stop - start, "html": html})
+
+    async def send_no_table_page(view_key, start):
+        # Lets the client ask for the page again (see tableRowsFailed in navbar-filter.lua)
+        await session.send_custom_message("table_rows_failed", {"view": view_key, "start": start})
+
+    @reactive.effect
+    @reactive.event(input.table_page)
+    async def table_page():
+        # The end of a paged table was scrolled into view (see requestTablePage in navbar-filter.lua);
+        # every request is answered with its rows or with table_rows_failed
+        event = input.table_page()
+        start = int(event["start"])
+        if table_task.status() != "success" or event["view"] != table_task.result().key or start >= len(table_task.result().matrix):
+            await send_no_table_page(event["view"], start)  # scrolled in a table replaced since
+            return
+        dashboard.warmup.note_activity()
+        # Not awaited here, so this session keeps handling its inputs meanwhile
+        asyncio.create_task(send_table_page(table_task.result(), start))
+
+    # Sub-categories expanded in the table, as (view key, sub-category)
+    expanded_nodes = set()
+
+    async def send_product_rows(view, node):
+        # Computed in the render threads; done again if the goal/priority moved meanwhile
+        loop = asyncio.get_running_loop()
+        while True:
+            with reactive.isolate():
+                goal, priority = input.company_goal(), input.customer_priority()
+            html = await loop.run_in_executor(dashboard.render_executor, dashboard.compute_products, view, node, goal, priority)
+            with reactive.isolate():
+                if (goal, priority) == (input.company_goal(), input.customer_priority()):
+                    break
+        await session.send_custom_message("product_rows", {"view": view.key, "node": node, "html": html})
+
+    @reactive.effect
+    @reactive.event(input.expand_node)
+    def expand_node():
+        # A sub-category row was clicked (see toggleProductRows in navbar-filter.lua)
+        event = input.expand_node()
+        if table_task.status() != "success" or event["view"] != table_task.result().key:
+            return  # clicked in a table replaced since
+        view = table_task.result()
+        expanded_nodes.difference_update([n for n in expanded_nodes if n[0] != view.key])
+        if not event["open"]:
+            expanded_nodes.discard((view.key, event["node"]))
+            return
+        expanded_nodes.add((view.key, event["node"]))
+        dashboard.warmup.note_activity()
+        # Not awaited here, so this session keeps handling its inputs meanwhile
+        asyncio.create_task(send_product_rows(view, event["node"]))
 
     # ========================================================================
 
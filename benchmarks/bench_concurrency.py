@@ -0,0 +1,132 @@
+'''
+Responsiveness of one session while another session renders a slow view.
+
+Starts the dashboard in this process (uvicorn on a free local port) and opens
+two websocket sessions:
+  - session A switches to --view, whose computation is made slow on purpose
+    (a summary_matrix() over --rows synthetic rows runs first)
+  - meanwhile session B toggles the goal every --interval seconds and times
+    each strategy column update until A's table arrives
+
+The view is computed in the render threads (see table_task in Dashboard.qmd),
+so B's updates should keep arriving in milliseconds while A waits:
+
+    python -m benchmarks.bench_concurrency --rows 1000000
+'''
+import argparse
+import asyncio
+import json
+import socket
+import statistics
+import threading
+import time
+
+import uvicorn
+import websockets
+
+from app import app, dashboard, region_options, year_options
+from benchmarks.synthetic import generate_superstore
+from components.cube import build_cube, build_trends
+from components.table_logic import DEFAULT_PRIORITY, summary_matrix
+
+GOALS = ["Revenue Growth", "Profit Protection"]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _slow_down(view, rows):
+    # Make the computation of one view slow, without touching any other view
+    big = generate_superstore(rows)
+    cube = build_cube(big)
+    trends = build_trends(cube)
+    year = sorted(big["Year"].unique())[-1]
+    compute_view = dashboard.compute_view
+
+    def slow_compute_view(data, *args):
+        if tuple(args[:2]) == view:
+            summary_matrix(big, big[big["Year"] == year], year, "All", cube=cube, trends=trends)
+        return compute_view(data, *args)
+
+    dashboard.compute_view = slow_compute_view
+
+
+async def _receive(ws, predicate):
+    while True:
+        message = json.loads(await ws.recv())
+        if predicate(message):
+            return message
+
+
+async def _connect(port):
+    ws = await websockets.connect(f"ws://127.0.0.1:{port}/websocket/", max_size=None)
+    inputs = {
+        "region": "All", "year": str(year_options[-1]),
+        "company_goal": GOALS[0], "customer_priority": DEFAULT_PRIORITY,
+        "export_matrix": False, "export_format": "csv", "export_all:shiny.action": 0,
+        ".clientdata_output_render_table_ui_hidden": False,
+    }
+    await ws.send(json.dumps({"method": "init", "data": inputs}))
+    await _receive(ws, lambda m: "render_table_ui" in m.get("values", {}))
+    return ws
+
+
+async def _run(port, view, interval):
+    session_a = await _connect(port)
+    session_b = await _connect(port)
+
+    start = time.perf_counter()
+    await session_a.send(json.dumps({"method": "update", "data": {"year": view[0], "region": view[1]}}))
+    rendered = asyncio.ensure_future(_receive(session_a, lambda m: "render_table_ui" in m.get("values", {})))
+
+    latencies = []
+    while not rendered.done():
+        sent = time.perf_counter()
+        goal = GOALS[(len(latencies) + 1) % 2]
+        await session_b.send(json.dumps({"method": "update", "data": {"company_goal": goal}}))
+        await _receive(session_b, lambda m: "strategy_column" in m.get("custom", {}))
+        latencies.append(time.perf_counter() - sent)
+        await asyncio.sleep(interval)
+    await rendered
+    seconds = time.perf_counter() - start
+
+    await session_a.close()
+    await session_b.close()
+    return seconds, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="synthetic rows behind the slow view")
+    parser.add_argument("--view", nargs=2, default=None, metavar=("YEAR", "REGION"),
+                        help="the slow view (the oldest year, last region by default)")
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between two goal toggles")
+    args = parser.parse_args()
+
+    view = (int(args.view[0]), args.view[1]) if args.view else (year_options[0], region_options[-1])
+    _slow_down(view, args.rows)
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning", lifespan="off"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    seconds, latencies = asyncio.run(_run(port, view, args.interval))
+    server.should_exit = True
+
+    print(f"session A: {view[0]}/{view[1]} rendered in {seconds * 1000:.0f}ms")
+    if latencies:
+        print(
+            f"session B: {len(latencies)} strategy updates meanwhile, "
+            f"median {statistics.median(latencies) * 1000:.1f}ms, max {max(latencies) * 1000:.1f}ms"
+        )
+    else:
+        print("session B: no update completed while A was rendering")
+
+
+if __name__ == "__main__":
+    main()
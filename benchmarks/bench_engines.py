@@ -0,0 +1,81 @@
+'''
+Summary engines on scaled data: pandas (cube) vs. polars (lazy query over the raw rows).
+
+The sample rows are repeated --scale times, so every year/region view covers
+that many more rows. For each engine this prints
+  - "setup": what is done once per dataset (the cube and trends for pandas,
+    the Arrow handoff of the raw rows for polars)
+  - "view": one summary_matrix() call for the latest year, all regions
+  - "view+html": the same followed by the table HTML, without the render cache
+
+Run from the repository root:
+
+    python -m benchmarks.bench_engines --scale 1 10 100
+'''
+import argparse
+import statistics
+import time
+
+import pandas as pd
+
+from benchmarks.timing import time_calls
+from components import table_logic_polars
+from components.cube import build_cube, build_trends
+from components.data_loader import DATA_PATH, load_dataset
+from components.table_logic import summary_matrix, strategy_view
+from components.table_visual import render_table_html
+
+GOAL, PRIORITY = "Revenue Growth", "New Customers"
+
+
+def _pandas_engine(df, year):
+    start = time.perf_counter()
+    cube = build_cube(df)
+    trends = build_trends(cube)
+    setup = time.perf_counter() - start
+
+    def view():
+        return summary_matrix(df, df[df["Year"] == year], year, "All", cube=cube, trends=trends)
+
+    return setup, view, strategy_view
+
+
+def _polars_engine(df, year):
+    start = time.perf_counter()
+    rows = table_logic_polars.rows_frame(df)
+    trends = table_logic_polars.build_trends(rows)
+    setup = time.perf_counter() - start
+
+    def view():
+        return table_logic_polars.summary_matrix(rows, year, "All", trends=trends)
+
+    return setup, view, table_logic_polars.strategy_view
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=DATA_PATH, help="source workbook")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 100], help="row multipliers to test")
+    parser.add_argument("--repeat", type=int, default=5, help="views per engine")
+    args = parser.parse_args()
+
+    df = load_dataset(args.path)
+    year = sorted(df["Year"].unique())[-1]
+    engines = {"pandas": _pandas_engine, "polars": _polars_engine}
+
+    print(f"{'rows':>12}{'engine':>8}{'setup':>10}{'view':>10}{'view+html':>11}")
+    for scale in args.scale:
+        scaled = pd.concat([df] * scale, ignore_index=True)
+        for name, engine in engines.items():
+            setup, view, pick = engine(scaled, year)
+            view_times = time_calls(view, args.repeat)
+            html_times = time_calls(lambda: render_table_html(pick(view(), GOAL, PRIORITY), year, "All"), args.repeat)
+            print(
+                f"{len(scaled):>12,}{name:>8}{setup * 1000:>8.1f}ms"
+                f"{statistics.median(view_times) * 1000:>8.1f}ms"
+                f"{statistics.median(html_times) * 1000:>9.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+'''
+Memory footprint of the loaded dataset: every workbook column as read_excel() types it vs. the lean load.
+
+The lean load keeps LOADED_COLUMNS only, in their SCHEMA dtypes (categorical
+keys, int16 quantity and year); see components/data_loader.py.
+The report lists the memory of each column (strings and categories included)
+and the total a worker holds for its rows, cube and trends. The sample rows
+can be repeated --scale times. Run from the repository root:
+
+    python -m benchmarks.bench_memory --scale 1 100 --workers 4
+'''
+import argparse
+
+import pandas as pd
+
+from components.cube import build_cube, build_trends
+from components.data_loader import DATA_PATH, LOADED_COLUMNS, apply_schema, derive_columns, memory_report
+
+
+def _worker_bytes(df):
+    # Rows, cube and trends: what every worker process keeps for the life of the process
+    cube = build_cube(df)
+    return sum(int(memory_report(f).loc["Total", "bytes"]) for f in (df, cube, build_trends(cube)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=DATA_PATH, help="source workbook")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 100], help="row multipliers to test")
+    parser.add_argument("--workers", type=int, default=4, help="worker processes to total the saving for")
+    args = parser.parse_args()
+
+    workbook = pd.read_excel(args.path)
+    for scale in args.scale:
+        full = derive_columns(pd.concat([workbook] * scale, ignore_index=True))
+        lean = apply_schema(full)[LOADED_COLUMNS]
+        before, after = memory_report(full), memory_report(lean)
+
+        print(f"\n{len(full):,} rows")
+        print(f"{'column':<16}{'read_excel':>16}{'MB':>9}{'lean':>16}{'MB':>9}")
+        for col in full.columns:
+            kept = col in lean.columns
+            print(
+                f"{col:<16}{before.loc[col, 'dtype']:>16}{before.loc[col, 'bytes'] / 2**20:>9.2f}"
+                f"{after.loc[col, 'dtype'] if kept else '-':>16}"
+                f"{after.loc[col, 'bytes'] / 2**20 if kept else 0:>9.2f}"
+            )
+        rows_before, rows_after = before.loc["Total", "bytes"], after.loc["Total", "bytes"]
+        print(f"{'rows':<16}{rows_before / 2**20:>25.2f}{rows_after / 2**20:>25.2f}  ({rows_before / rows_after:.1f}x)")
+
+        worker_before, worker_after = _worker_bytes(full), _worker_bytes(lean)
+        saved = worker_before - worker_after
+        print(
+            f"per worker (rows + cube + trends): {worker_before / 2**20:.2f}MB -> {worker_after / 2**20:.2f}MB, "
+            f"{saved / 2**20:.2f}MB saved ({saved * args.workers / 2**20:.2f}MB for {args.workers} workers)"
+        )
+
+
+if __name__ == "__main__":
+    main()
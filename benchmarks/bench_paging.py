@@ -0,0 +1,55 @@
+'''
+Paged table rendering: the whole table vs. one page of rows as the summary grows.
+
+Synthetic data (benchmarks/synthetic.py) with --subcategories sub-categories
+gives summaries of that many rows plus the category totals. For each size this
+prints the time and HTML size of
+  - "full": the whole table, as sent when every row is rendered at once
+  - "first page": the table with its first --page-rows rows (table_display(page_rows=...))
+  - "next page": the rows of the second page, as a <tbody> (table_rows_html())
+without the render cache. Run from the repository root:
+
+    python -m benchmarks.bench_paging --subcategories 17 100 400 --page-rows 50
+'''
+import argparse
+import statistics
+
+from benchmarks.synthetic import generate_superstore
+from benchmarks.timing import time_calls
+from components.cube import build_cube, build_trends
+from components.data_loader import LOADED_COLUMNS
+from components.table_logic import strategy_view, summary_matrix
+from components.table_visual import render_cache, render_table_html, table_display, table_rows_html
+
+GOAL, PRIORITY = "Revenue Growth", "New Customers"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subcategories", type=int, nargs="+", default=[17, 100, 400], help="summary sizes to test")
+    parser.add_argument("--rows", type=int, default=200_000, help="order lines of the synthetic data")
+    parser.add_argument("--page-rows", type=int, default=50, help="rows per page")
+    parser.add_argument("--repeat", type=int, default=3, help="renders per mode")
+    args = parser.parse_args()
+
+    print(f"{'table rows':>10}{'mode':>12}{'time':>10}{'HTML':>10}")
+    for subcategories in args.subcategories:
+        df = generate_superstore(args.rows, subcategories=subcategories)[LOADED_COLUMNS]
+        cube = build_cube(df)
+        year = int(df["Year"].max())
+        df_sum = strategy_view(summary_matrix(df, None, year, "All", cube=cube, trends=build_trends(cube)), GOAL, PRIORITY)
+
+        modes = {
+            "full": lambda: render_table_html(df_sum, year, "All"),
+            "first page": lambda: table_display(df_sum, year, "All", page_rows=args.page_rows),
+            "next page": lambda: table_rows_html(df_sum, year, "All", args.page_rows, 2 * args.page_rows),
+        }
+        for name, fn in modes.items():
+            # Every render is cold: the cache would hide the cost of the full table
+            seconds = statistics.median(time_calls(fn, args.repeat, before=render_cache.clear))
+            size = len(str(fn()))
+            print(f"{len(df_sum):>10,}{name:>12}{seconds * 1000:>8.0f}ms{size / 1024:>8.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+'''
+Peak memory of the partitioned source as the sales history grows.
+
+Writes histories of increasing length (the sample rows repeated with their
+dates shifted by 4 years per copy) as Year/Region partitioned Parquet, then
+measures in a fresh process the peak RSS of
+  - "in-memory": reading every partition into one DataFrame and building the cube
+  - "streaming": PartitionedSource.stream_aggregates() plus one view's partition
+Linux only (reads VmHWM from /proc). Run from the repository root:
+
+    python -m benchmarks.bench_partitioned --copies 1 4 16
+'''
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+from components.data_loader import DATA_PATH, load_dataset
+from components.partitioned_source import write_partitioned
+
+CHILD = """
+import json, sys, time
+from components.cube import build_cube
+import pyarrow.dataset as ds
+from components.partitioned_source import PARTITIONING, PartitionedSource
+mode, root = sys.argv[1], sys.argv[2]
+start = time.perf_counter()
+if mode == "in-memory":
+    build_cube(ds.dataset(root, partitioning=PARTITIONING).to_table().to_pandas())
+else:
+    source = PartitionedSource(root, batch_size=65_536)
+    cube = source.stream_aggregates().cube
+    source.read_rows([source.years()[-1]], "West")
+seconds = time.perf_counter() - start
+# VmHWM rather than ru_maxrss, which would include the parent's RSS at fork time
+with open("/proc/self/status") as f:
+    peak_kb = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+print(json.dumps({"seconds": seconds, "peak_kb": peak_kb}))
+"""
+
+
+def _history(df, copies):
+    frames = []
+    for i in range(copies):
+        shifted = df.copy()
+        shifted["Order Date"] = shifted["Order Date"] + pd.DateOffset(years=4 * i)
+        shifted["Year"] = shifted["Order Date"].dt.year.astype("int64")
+        frames.append(shifted)
+    return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=DATA_PATH, help="source workbook")
+    parser.add_argument("--copies", type=int, nargs="+", default=[1, 4, 16], help="history lengths to test")
+    args = parser.parse_args()
+
+    df = load_dataset(args.path)
+    print(f"{'rows':>10}{'mode':>12}{'peak RSS':>12}{'time':>10}")
+    for copies in args.copies:
+        with tempfile.TemporaryDirectory() as root:
+            history = _history(df, copies)
+            write_partitioned(history, root)
+            for mode in ("in-memory", "streaming"):
+                out = subprocess.run(
+                    [sys.executable, "-c", CHILD, mode, root], capture_output=True, text=True, check=True
+                )
+                result = json.loads(out.stdout)
+                print(
+                    f"{len(history):>10,}{mode:>12}{result['peak_kb'] / 1024:>10.0f}MB"
+                    f"{result['seconds']:>9.2f}s"
+                )
+
+
+if __name__ == "__main__":
+    main()
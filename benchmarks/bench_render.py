@@ -0,0 +1,49 @@
+'''
+Render benchmark: building the Great Tables HTML from scratch vs. the render cache.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_render --repeat 5
+'''
+import argparse
+import statistics
+
+from benchmarks.timing import time_calls
+from components.cube import build_cube, build_trends
+from components.data_loader import DATA_PATH, load_dataset
+from components.table_logic import summary
+from components.table_visual import render_cache, table_display
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=DATA_PATH, help="source workbook")
+    parser.add_argument("--repeat", type=int, default=5, help="renders per mode")
+    args = parser.parse_args()
+
+    df = load_dataset(args.path)
+    cube = build_cube(df)
+    trends = build_trends(cube)
+    year = sorted(df["Year"].unique())[-1]
+    df_sum = summary(df, df[df["Year"] == year], year, "All", "Revenue Growth", "New Customers", cube=cube, trends=trends)
+
+    table_display(df_sum, year, "All")  # warm the cache
+    results = {
+        "fresh render": time_calls(lambda: table_display(df_sum, year, "All", use_cache=False), args.repeat),
+        "render cache hit": time_calls(lambda: table_display(df_sum, year, "All"), args.repeat),
+    }
+
+    print(f"{'mode':<20}{'median':>10}{'min':>10}{'max':>10}")
+    for name, timings in results.items():
+        print(
+            f"{name:<20}{statistics.median(timings) * 1000:>8.1f}ms"
+            f"{min(timings) * 1000:>8.1f}ms{max(timings) * 1000:>8.1f}ms"
+        )
+
+    fresh, cached = (statistics.median(t) for t in results.values())
+    print(f"speed-up: {fresh / cached:.1f}x")
+    print(f"cache: {render_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
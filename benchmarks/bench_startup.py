@@ -0,0 +1,43 @@
+'''
+Startup-time benchmark: parsing the .xls workbook vs. memory-mapping the Arrow cache.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup --repeat 5
+'''
+import argparse
+import statistics
+import tempfile
+
+from benchmarks.timing import time_calls
+from components.data_loader import DATA_PATH, load_dataset, read_source, write_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=DATA_PATH, help="source workbook")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per load path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Cold run builds the cache once, outside the timed loops
+        write_cache(read_source(args.path), args.path, cache_dir)
+
+        results = {
+            "xls (read_excel + Year)": time_calls(lambda: read_source(args.path), args.repeat),
+            "arrow cache (mmap)": time_calls(lambda: load_dataset(args.path, cache_dir), args.repeat),
+        }
+
+    print(f"{'load path':<26}{'median':>10}{'min':>10}{'max':>10}")
+    for name, timings in results.items():
+        print(
+            f"{name:<26}{statistics.median(timings) * 1000:>8.1f}ms"
+            f"{min(timings) * 1000:>8.1f}ms{max(timings) * 1000:>8.1f}ms"
+        )
+
+    xls, cached = (statistics.median(t) for t in results.values())
+    print(f"speed-up: {xls / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
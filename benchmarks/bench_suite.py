@@ -0,0 +1,184 @@
+'''
+Benchmark suite on synthetic superstore data, with machine-readable results.
+
+For every data size (see benchmarks/synthetic.py) it times and memory-profiles
+the steps behind one dashboard view:
+  - load: memory-mapping the LOADED_COLUMNS of the Arrow cache file of the dataset
+  - filter: selecting the latest year and one region (a slice of the cube)
+  - cube: building the cube and trends (once per dataset)
+  - summary: summary_matrix() for the latest year, all regions (pandas and polars engines)
+  - strategy: scoring every (year, region, sub-category) cell, row by row with
+    discount_strategy() and for all 16 goal/priority pairs with strategy_matrix()
+  - render: building the Great Tables HTML
+  - export: writing the CSV download (cleaned and streamed in chunks, as the dashboard does)
+
+Peak memory is the tracemalloc peak of a separate, untimed run (numpy and
+pandas buffers are included; Arrow buffers are not). Results are printed and,
+with --output, written as JSON; --compare prints the ratio to an earlier file,
+e.g. one produced on another commit:
+
+    python -m benchmarks.bench_suite --rows 10000 100000 1000000 --output base.json
+    python -m benchmarks.bench_suite --rows 10000 100000 1000000 --compare base.json
+
+10M rows need several GB of memory and are only run when asked for (--rows 10000000).
+'''
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+
+from benchmarks.synthetic import generate_superstore
+from benchmarks.timing import time_calls
+from components import table_logic_polars
+from components.Discount_logic import discount_strategy, strategy_matrix
+from components.cube import build_cube, build_trends, cube_slice, discount_mean
+from components.data_loader import LOADED_COLUMNS, read_cache
+from components.export import clean_export_frame, iter_export_chunks
+from components.table_logic import strategy_view, summary_matrix
+from components.table_visual import render_table_html
+
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+GOAL, PRIORITY = "Revenue Growth", "New Customers"
+REGION = "West"
+
+
+def _peak_bytes(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _write_arrow(df, path):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(str(path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _strategy_input(cube):
+    # One row per (region, year, sub-category) cell, as summary() would score them
+    cells = cube.reset_index()
+    return pd.DataFrame({
+        "Revenue": cells["Sales"],
+        "Profit": cells["Profit"],
+        "YoY Revenue %": cells.groupby(["Region", "Category", "Sub-Category"])["Sales"].pct_change().round(3),
+        "Discount": discount_mean(cells),
+    })
+
+
+def run_size(rows, subcategories, repeat, seed=0):
+    '''
+    Run every benchmark on one generated dataset.
+
+    Returns:
+        list[dict]: One result per benchmark with "name", "rows", "subcategories",
+        "median_s", "min_s", "max_s" and "peak_mb".
+    '''
+    df = generate_superstore(rows, subcategories, seed=seed)
+    year = sorted(df["Year"].unique())[-1]
+    cube = build_cube(df)
+    trends = build_trends(cube)
+    matrix = summary_matrix(df, None, year, "All", cube=cube, trends=trends)
+    view = strategy_view(matrix, GOAL, PRIORITY)
+    rows_pl = table_logic_polars.rows_frame(df)
+    trends_pl = pl.from_pandas(trends.reset_index())
+    scored = _strategy_input(cube)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = Path(tmp) / "superstore.arrow"
+        _write_arrow(df, cache_file)
+
+        benchmarks = {
+            "load": lambda: read_cache(cache_file, LOADED_COLUMNS),
+            "filter": lambda: cube_slice(cube, year, REGION),
+            "cube": lambda: build_trends(build_cube(df)),
+            "summary[pandas]": lambda: summary_matrix(df, None, year, "All", cube=cube, trends=trends),
+            "summary[polars]": lambda: table_logic_polars.summary_matrix(rows_pl, year, "All", trends=trends_pl),
+            "strategy[row-wise]": lambda: scored.apply(lambda r: discount_strategy(r, GOAL, PRIORITY), axis=1),
+            "strategy[vectorized x16]": lambda: strategy_matrix(scored),
+            "render": lambda: render_table_html(view, year, "All"),
+            "export": lambda: b"".join(iter_export_chunks(clean_export_frame(matrix), "csv")),
+        }
+
+        results = []
+        for name, fn in benchmarks.items():
+            timings = time_calls(fn, repeat)
+            results.append({
+                "name": name,
+                "rows": rows,
+                "subcategories": int(df["Sub-Category"].nunique()),
+                "median_s": statistics.median(timings),
+                "min_s": min(timings),
+                "max_s": max(timings),
+                "peak_mb": _peak_bytes(fn) / 2**20,
+            })
+    return results
+
+
+def _metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "polars": pl.__version__,
+        "pyarrow": pa.__version__,
+        "machine": platform.machine(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="data sizes to test")
+    parser.add_argument("--subcategories", type=int, default=None, help="sub-category cardinality (17 by default)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the data generator")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {(r["name"], r["rows"], r["subcategories"]): r for r in json.load(f)["results"]}
+
+    results = []
+    print(f"{'benchmark':<26}{'rows':>12}{'subcats':>9}{'median':>11}{'peak':>10}" + ("  vs base" if baseline else ""))
+    for rows in args.rows:
+        for result in run_size(rows, args.subcategories, args.repeat, args.seed):
+            results.append(result)
+            line = (
+                f"{result['name']:<26}{result['rows']:>12,}{result['subcategories']:>9}"
+                f"{result['median_s'] * 1000:>9.1f}ms{result['peak_mb']:>8.1f}MB"
+            )
+            base = baseline.get((result["name"], result["rows"], result["subcategories"]))
+            if base:
+                line += f"{result['median_s'] / base['median_s']:>8.2f}x"
+            print(line, flush=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"meta": _metadata(), "results": results}, f, indent=2)
+        print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+'''
+End-to-end toggle latency: time from an input change to the browser-bound update.
+
+Starts the app with uvicorn, connects over the Shiny websocket like a browser
+would, then flips the goal radio buttons (which only resend the strategy
+column) and the year dropdown (which re-renders the table), reporting latency
+and bytes received per change. Run from the repository root:
+
+    python -m benchmarks.bench_toggle --repeat 10
+'''
+import argparse
+import asyncio
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import websockets
+
+from components.Discount_logic import COMPANY_GOALS, CUSTOMER_PRIORITIES
+
+INITIAL_INPUTS = {
+    "region": "All",
+    "year": "2017",
+    "company_goal": COMPANY_GOALS[0],
+    "customer_priority": CUSTOMER_PRIORITIES[0],
+    "export_matrix": False,
+    ".clientdata_output_render_table_ui_hidden": False,
+    ".clientdata_url_pathname": "/",
+    ".clientdata_url_search": "",
+    ".clientdata_url_hostname": "127.0.0.1",
+    ".clientdata_url_protocol": "http:",
+    ".clientdata_url_port": "",
+    ".clientdata_singletons": "",
+    ".clientdata_pixelratio": 1,
+}
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_for(ws, done):
+    # Read messages until done(message) is true; returns (seconds, bytes received)
+    start = time.perf_counter()
+    received = 0
+    while True:
+        raw = await asyncio.wait_for(ws.recv(), timeout=60)
+        received += len(raw)
+        if isinstance(raw, str) and done(json.loads(raw)):
+            return time.perf_counter() - start, received
+
+
+def _has_table(msg):
+    return "render_table_ui" in msg.get("values", {})
+
+
+def _has_strategy(msg):
+    return "strategy_column" in msg.get("custom", {})
+
+
+async def _measure(url, repeat):
+    results = {"goal toggle": [], "year change": []}
+    async with websockets.connect(url, max_size=None) as ws:
+        await ws.send(json.dumps({"method": "init", "data": INITIAL_INPUTS}))
+        await _wait_for(ws, _has_table)
+
+        for i in range(repeat):
+            goal = COMPANY_GOALS[(i + 1) % len(COMPANY_GOALS)]
+            await ws.send(json.dumps({"method": "update", "data": {"company_goal": goal}}))
+            results["goal toggle"].append(await _wait_for(ws, _has_strategy))
+
+            year = ["2016", "2017"][i % 2]
+            await ws.send(json.dumps({"method": "update", "data": {"year": year}}))
+            results["year change"].append(await _wait_for(ws, _has_table))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="changes per input")
+    args = parser.parse_args()
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"]
+    )
+    try:
+        url = f"ws://127.0.0.1:{port}/websocket/"
+        for _ in range(100):  # wait for the server to accept connections
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError:
+                time.sleep(0.2)
+        results = asyncio.run(_measure(url, args.repeat))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{'change':<14}{'median':>10}{'max':>10}{'bytes':>10}")
+    for name, samples in results.items():
+        latencies = [s for s, _ in samples]
+        payload = statistics.median(b for _, b in samples)
+        print(
+            f"{name:<14}{statistics.median(latencies) * 1000:>8.1f}ms"
+            f"{max(latencies) * 1000:>8.1f}ms{payload:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+'''
+Per-worker memory: every worker loading its own copy vs. attaching to a shared segment.
+
+Starts N worker processes that either copy the dataset into their own memory
+and build the aggregates ("copy") or attach to one published segment
+(components/shared_data.py, "shared"). Each worker reports its RSS and PSS
+(proportional set size: shared pages divided among the processes mapping
+them) and USS (the pages only that worker maps) before and after loading,
+while all workers are alive. Linux only.
+Run from the repository root:
+
+    python -m benchmarks.bench_workers --workers 4 --scale 20
+'''
+import argparse
+import multiprocessing as mp
+import statistics
+import tempfile
+from collections import namedtuple
+
+import pandas as pd
+import pyarrow as pa
+
+from components.cube import build_cube, build_trends
+from components.data_loader import DATA_PATH, load_dataset
+from components.shared_data import attach, publish
+
+MemoryKB = namedtuple("MemoryKB", ["rss", "pss", "uss"])
+
+
+def memory_kb():
+    '''
+    Return the RSS, PSS and private memory (USS) of the current process in kB.
+    '''
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                values[key] = int(rest.split()[0])
+    return MemoryKB(values["Rss"], values["Pss"], values["Private_Clean"] + values["Private_Dirty"])
+
+
+def _worker(mode, shared_dir, version, barrier, results):
+    before = memory_kb()
+    if mode == "shared":
+        data = attach(shared_dir, version)
+        frames = (data.df, data.cube, data.trends)
+    else:
+        with pa.OSFile(f"{shared_dir}/{version}/df.arrow", "rb") as source:  # private copy
+            df = pa.ipc.open_file(source).read_all().to_pandas()
+        cube = build_cube(df)
+        frames = (df, cube, build_trends(cube))
+    # Touch every column so lazily mapped pages are counted too
+    for frame in frames:
+        frame.select_dtypes("number").sum()
+    barrier.wait()  # measure while every worker is alive
+    results.put((before, memory_kb()))
+    barrier.wait()
+
+
+def measure_workers(mode, workers, shared_dir, version="bench"):
+    '''
+    Load the dataset published in shared_dir in `workers` processes at once.
+
+    Args:
+        mode (str): "copy" (every worker reads its own copy and builds the
+            aggregates) or "shared" (every worker attaches to the segment).
+        workers (int): Number of worker processes.
+        shared_dir (str): Directory holding the segment published under version.
+        version (str): The published segment.
+
+    Returns:
+        list[tuple[MemoryKB, MemoryKB]]: Memory of each worker before and after loading.
+    '''
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(mode, shared_dir, version, barrier, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    samples = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=DATA_PATH, help="source workbook")
+    parser.add_argument("--workers", type=int, default=4, help="worker processes")
+    parser.add_argument("--scale", type=int, default=20, help="repeat the sample rows this many times")
+    args = parser.parse_args()
+
+    df = load_dataset(args.path)
+    df = pd.concat([df] * args.scale, ignore_index=True)
+
+    with tempfile.TemporaryDirectory() as shared_dir:
+        publish(df, "bench", shared_dir)
+        print(f"{len(df):,} rows, {args.workers} workers (kB per worker, median)")
+        print(f"{'mode':<8}{'RSS before':>12}{'RSS after':>12}{'PSS after':>12}{'PSS added':>12}{'USS added':>12}")
+        for mode in ("copy", "shared"):
+            samples = measure_workers(mode, args.workers, shared_dir)
+            rss_before = statistics.median(b.rss for b, _ in samples)
+            rss_after = statistics.median(a.rss for _, a in samples)
+            pss_after = statistics.median(a.pss for _, a in samples)
+            pss_added = statistics.median(a.pss - b.pss for b, a in samples)
+            uss_added = statistics.median(a.uss - b.uss for b, a in samples)
+            print(f"{mode:<8}{rss_before:>12,.0f}{rss_after:>12,.0f}{pss_after:>12,.0f}{pss_added:>12,.0f}{uss_added:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
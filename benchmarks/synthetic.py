@@ -0,0 +1,129 @@
+'''
+Synthetic superstore data for benchmarks.
+
+Produces frames with the same columns, dtypes and row layout as the Arrow
+cache of load_dataset() (every column in its SCHEMA dtype, rows in "Row ID"
+order; see apply_schema()), the same categories, regions and segments, and
+value distributions close to the bundled sample, at any number of rows.
+Descriptive columns (customers, cities, products) come from generated pools.
+
+    from benchmarks.synthetic import generate_superstore
+    df = generate_superstore(1_000_000, subcategories=40)
+'''
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from components.data_loader import apply_schema
+
+# Sub-categories of the sample, per category
+SUBCATEGORIES = {
+    "Furniture": ["Bookcases", "Chairs", "Furnishings", "Tables"],
+    "Office Supplies": ["Appliances", "Art", "Binders", "Envelopes", "Fasteners", "Labels", "Paper", "Storage", "Supplies"],
+    "Technology": ["Accessories", "Copiers", "Machines", "Phones"],
+}
+REGIONS = ["Central", "East", "South", "West"]
+SEGMENTS = ["Consumer", "Corporate", "Home Office"]
+SHIP_MODES = ["First Class", "Same Day", "Second Class", "Standard Class"]
+YEARS = [2014, 2015, 2016, 2017]
+
+# Discount levels of the sample and how often they occur
+DISCOUNTS = [0.0, 0.1, 0.15, 0.2, 0.3, 0.32, 0.4, 0.45, 0.5, 0.6, 0.7, 0.8]
+DISCOUNT_WEIGHTS = [4798, 94, 52, 3657, 227, 27, 206, 11, 66, 138, 418, 300]
+
+CUSTOMERS = 800
+CITIES = 530
+PRODUCTS_PER_SUBCATEGORY = 110
+
+
+def subcategory_names(subcategories=None):
+    '''
+    Return (category, sub-category) pairs, cycling through the categories.
+
+    Args:
+        subcategories (int, optional): Total number of sub-categories. The 17 of
+            the sample by default; beyond that, numbered variants are added
+            ("Chairs 2", ...).
+
+    Returns:
+        list[tuple[str, str]]: The pairs, sorted like the sample.
+    '''
+    real = [(cat, sub) for cat, subs in SUBCATEGORIES.items() for sub in subs]
+    if subcategories is None:
+        return real
+    pairs = []
+    for i in range(subcategories):
+        cat, sub = real[i % len(real)]
+        copy = i // len(real)
+        pairs.append((cat, sub if copy == 0 else f"{sub} {copy + 1}"))
+    return sorted(pairs)
+
+
+def _take(pool, codes):
+    return pa.array(pool).take(pa.array(codes))
+
+
+def _labels(prefix, codes):
+    return pc.binary_join_element_wise(prefix, pc.cast(pa.array(codes), pa.string()), "")
+
+
+def generate_superstore(rows, subcategories=None, seed=0):
+    '''
+    Generate a superstore-shaped dataset.
+
+    Args:
+        rows (int): Number of order lines.
+        subcategories (int, optional): Sub-category cardinality (see subcategory_names()).
+        seed (int): Random seed; the same arguments always give the same frame.
+
+    Returns:
+        pandas.DataFrame: The columns of load_dataset(columns=None), in the same order, dtypes and layout.
+    '''
+    rng = np.random.default_rng(seed)
+    pairs = subcategory_names(subcategories)
+
+    sub_codes = rng.integers(0, len(pairs), rows)
+    product_codes = sub_codes * PRODUCTS_PER_SUBCATEGORY + rng.integers(0, PRODUCTS_PER_SUBCATEGORY, rows)
+    customer_codes = rng.integers(0, CUSTOMERS, rows)
+    city_codes = rng.integers(0, CITIES, rows)
+
+    start = np.datetime64(f"{YEARS[0]}-01-01", "D")
+    days = (np.datetime64(f"{YEARS[-1] + 1}-01-01", "D") - start).astype(int)
+    order_date = start + rng.integers(0, days, rows).astype("timedelta64[D]")
+    ship_date = order_date + rng.integers(0, 8, rows).astype("timedelta64[D]")
+    year = order_date.astype("datetime64[Y]").astype(int) + 1970
+
+    weights = np.asarray(DISCOUNT_WEIGHTS, dtype=float)
+    discount = rng.choice(DISCOUNTS, rows, p=weights / weights.sum())
+    quantity = rng.integers(1, 15, rows)
+    sales = np.round(rng.lognormal(4.0, 1.4, rows) * (1 - discount), 4)
+    # Margins shrink with the discount and turn negative past ~30%, as in the sample
+    margin = 0.3 - 1.1 * discount + rng.normal(0, 0.08, rows)
+    profit = np.round(sales * margin, 4)
+
+    categories, names = (np.array(col) for col in zip(*pairs))
+    table = pa.table({
+        "Row ID": np.arange(1, rows + 1),
+        "Order ID": _labels("CA-", rng.integers(100_000, 100_000 + max(rows // 2, 1), rows)),
+        "Order Date": order_date.astype("datetime64[us]"),
+        "Ship Date": ship_date.astype("datetime64[us]"),
+        "Ship Mode": _take(SHIP_MODES, rng.integers(0, len(SHIP_MODES), rows)),
+        "Customer ID": _labels("CU-", customer_codes),
+        "Customer Name": _labels("Customer ", customer_codes),
+        "Segment": _take(SEGMENTS, customer_codes % len(SEGMENTS)),
+        "Country": _take(["United States"], np.zeros(rows, dtype=np.int64)),
+        "City": _labels("City ", city_codes),
+        "State": _labels("State ", city_codes % 49),
+        "Postal Code": 10_000 + city_codes * 7,
+        "Region": _take(REGIONS, city_codes % len(REGIONS)),
+        "Product ID": _labels("PR-", product_codes),
+        "Category": _take(categories, sub_codes),
+        "Sub-Category": _take(names, sub_codes),
+        "Product Name": _labels("Product ", product_codes),
+        "Sales": sales,
+        "Quantity": quantity,
+        "Discount": discount,
+        "Profit": profit,
+        "Year": year.astype(np.int64),
+    })
+    return apply_schema(table.to_pandas())
@@ -0,0 +1,31 @@
+'''
+Timing helper shared by the benchmarks.
+
+    from benchmarks.timing import time_calls
+    timings = time_calls(lambda: build_cube(df), repeat=5)
+    print(f"{statistics.median(timings) * 1000:.1f}ms")
+'''
+import time
+
+
+def time_calls(fn, repeat, before=None):
+    '''
+    Call fn() repeatedly and time each call.
+
+    Args:
+        fn (callable): The code to time.
+        repeat (int): Number of calls.
+        before (callable, optional): Called before each call, outside the timing,
+            e.g. to clear a cache so every call is cold.
+
+    Returns:
+        list[float]: Seconds of each call.
+    '''
+    timings = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
@@ -1,3 +1,6 @@
+import numpy as np
+import pandas as pd
+
 discount_policy = {
     "high_revenue": 70000,
     "low_revenue": 30000,
@@ -7,6 +10,17 @@ discount_policy = {
     "max_discount": 0.2,
 }
 
+# Thresholds for a single product (drill-down rows): the revenue and profit of
+# one product over a year, about the median and top decile of products
+product_discount_policy = {
+    "high_revenue": 1000,
+    "low_revenue": 100,
+    "high_profit": 150,
+    "low_profit": 15,
+    "min_discount": 0.1,
+    "max_discount": 0.2,
+}
+
 market_context = {
     "inflation_rate": 0.06,          # 6%
     "competitor_discount": 0.15    # competitor offering
@@ -95,4 +109,205 @@ def discount_strategy(row, company_goal, customer_priority, policy=discount_poli
     elif score <= -1:
         return '<span class="decision-reduce">Reduce discount</span>'
     else:
-        return '<span class="decision-maintain">Maintain discount</span>'
\ No newline at end of file
+        return '<span class="decision-maintain">Maintain discount</span>'
+
+
+# Options of the "Goal" and "Priority" radio buttons in the dashboard sidebar
+COMPANY_GOALS = ["Revenue Growth", "Profit Protection", "Market Share Expansion", "Customer Retention"]
+CUSTOMER_PRIORITIES = ["New Customers", "Loyal Customers", "High-Value Accounts", "All Segments"]
+
+DECISION_LABELS = {
+    "increase": '<span class="decision-increase">Increase discount</span>',
+    "reduce": '<span class="decision-reduce">Reduce discount</span>',
+    "maintain": '<span class="decision-maintain">Maintain discount</span>',
+}
+
+
+def strategy_scores(frame, company_goal, customer_priority, policy=discount_policy, context=market_context):
+    '''
+    Compute the discount_strategy() score for every row of a frame at once.
+
+    Same rules as discount_strategy(), written as array operations over whole
+    columns instead of Python branches per row. Missing values (NaN) compare as
+    False, exactly like the scalar comparisons in the per-row version.
+
+    Args:
+        frame (pandas.DataFrame): Aggregated data with "Revenue", "Profit", "YoY Revenue %" and "Discount" columns.
+        company_goal (str): The company's strategic focus, for example "Revenue Growth".
+        customer_priority (str): The target customer segment, for example "New Customers".
+        policy (dict, optional): A dictionary of policy thresholds.
+        context (dict, optional): A dictionary of market context data.
+
+    Returns:
+        numpy.ndarray: An integer score per row.
+    '''
+    rev, profit, yoy, disc = _score_inputs(frame)
+    score = _base_score(rev, profit, disc, policy, context)
+    score += _goal_adjustment(company_goal, customer_priority, profit, yoy, policy)
+    score += _priority_adjustment(customer_priority, profit, yoy, policy)
+    return score
+
+
+def _score_inputs(frame):
+    # np.asarray accepts pandas and polars columns alike; None/null become NaN. The
+    # values are compared as they are, like discount_strategy() compares them, so both
+    # classify a sum landing a few ulps either side of a threshold the same way
+    return tuple(
+        np.asarray(frame[col], dtype=float)
+        for col in ("Revenue", "Profit", "YoY Revenue %", "Discount")
+    )
+
+
+def _base_score(rev, profit, disc, policy, context):
+    # The part of the score that does not depend on goal or priority. Policy and
+    # context values may be arrays broadcasting against the rows (see strategy_score_matrix())
+
+    # Revenue contribution
+    score = np.where(rev > policy["high_revenue"], 2, np.where(rev < policy["low_revenue"], -1, 0))
+
+    # Profit margin effect
+    score = score + np.where(profit < policy["low_profit"], -2, 1)
+
+    # Discount level
+    score = score + np.where(disc < policy["min_discount"], 1, np.where(disc > policy["max_discount"], -1, 0))
+
+    # External context
+    score = score - np.where(np.asarray(context["inflation_rate"]) > 0.05, 1, 0)
+    score = score + np.where(context["competitor_discount"] > disc, 2, 0)
+    return score
+
+
+def _goal_adjustment(company_goal, customer_priority, profit, yoy, policy):
+    if company_goal == "Revenue Growth":
+        return np.where(yoy > 0, 2, 0)
+    elif company_goal == "Profit Protection":
+        return np.where(profit < policy["low_profit"], -2, 0)
+    elif company_goal == "Market Share Expansion":
+        return 1
+    elif company_goal == "Customer Retention" and customer_priority == "Loyal Customers":
+        return 2
+    return 0
+
+
+def _priority_adjustment(customer_priority, profit, yoy, policy):
+    if customer_priority == "New Customers":
+        return 1
+    elif customer_priority == "High-Value Accounts":
+        return np.where(profit > policy["high_profit"], 2, 0)
+    elif customer_priority == "Loyal Customers":
+        return np.where(yoy <= 0, 1, 0)
+    return 0
+
+
+def strategy_labels(scores):
+    '''
+    Map an array of scores to the HTML decision labels used in the table.
+    '''
+    return np.select(
+        [scores >= 4, scores <= -1],
+        [DECISION_LABELS["increase"], DECISION_LABELS["reduce"]],
+        default=DECISION_LABELS["maintain"],
+    ).astype(object)
+
+
+def discount_strategy_frame(frame, company_goal, customer_priority, policy=discount_policy, context=market_context):
+    '''
+    Batch version of discount_strategy() for a whole aggregated frame.
+
+    Scores every row with strategy_scores() and only turns the result into HTML
+    labels at the end. discount_strategy() stays the reference implementation;
+    both return the same label for every row.
+
+    Args:
+        frame (pandas.DataFrame): Aggregated data with "Revenue", "Profit", "YoY Revenue %" and "Discount" columns.
+        company_goal (str): The company's strategic focus, for example "Revenue Growth".
+        customer_priority (str): The target customer segment, for example "New Customers".
+        policy (dict, optional): A dictionary of policy thresholds.
+        context (dict, optional): A dictionary of market context data.
+
+    Returns:
+        pandas.Series: The HTML-formatted strategy per row, aligned on frame.index.
+    '''
+    scores = strategy_scores(frame, company_goal, customer_priority, policy, context)
+    return pd.Series(strategy_labels(scores), index=frame.index, dtype=object)
+
+
+def strategy_column(company_goal, customer_priority):
+    '''
+    Name of the strategy_matrix() column for one goal/priority pair.
+    '''
+    return f"{company_goal} | {customer_priority}"
+
+
+def strategy_matrix(frame, policy=discount_policy, context=market_context):
+    '''
+    Compute the discount strategy for all 16 goal x priority pairs in one pass.
+
+    The goal- and priority-independent part of the score is computed once and
+    each pair only adds its two adjustments, so switching the "Goal" or
+    "Priority" radio buttons can just pick a column of the result.
+
+    Args:
+        frame (pandas.DataFrame): Aggregated data with "Revenue", "Profit", "YoY Revenue %" and "Discount" columns.
+        policy (dict, optional): A dictionary of policy thresholds.
+        context (dict, optional): A dictionary of market context data.
+
+    Returns:
+        pandas.DataFrame: One HTML-formatted strategy column per pair, named by
+        strategy_column(), in COMPANY_GOALS x CUSTOMER_PRIORITIES order.
+    '''
+    return pd.DataFrame(strategy_matrix_arrays(frame, policy, context), index=frame.index)
+
+
+def strategy_matrix_arrays(frame, policy=discount_policy, context=market_context):
+    '''
+    Same as strategy_matrix() but returns a dict of label arrays.
+
+    Works on any frame whose columns convert to numpy (pandas or polars).
+    '''
+    return {
+        column: strategy_labels(scores)
+        for column, scores in strategy_score_matrix(frame, policy, context).items()
+    }
+
+
+def strategy_score_matrix(frame, policy=discount_policy, context=market_context):
+    '''
+    Compute the discount_strategy() score of every row for all 16 goal x priority pairs.
+
+    Policy and context values can also be numpy arrays of shape (P, 1) to
+    score P policies at once (see components/sweep.py); every score array then
+    has shape (P, rows).
+
+    Args:
+        frame (pandas.DataFrame): Aggregated data with "Revenue", "Profit", "YoY Revenue %" and "Discount" columns.
+        policy (dict, optional): A dictionary of policy thresholds.
+        context (dict, optional): A dictionary of market context data.
+
+    Returns:
+        dict: Integer scores per pair, keyed by strategy_column(), in
+        COMPANY_GOALS x CUSTOMER_PRIORITIES order.
+    '''
+    rev, profit, yoy, disc = _score_inputs(frame)
+    base = _base_score(rev, profit, disc, policy, context)
+    priority_adj = {
+        priority: _priority_adjustment(priority, profit, yoy, policy)
+        for priority in CUSTOMER_PRIORITIES
+    }
+
+    scores = {}
+    for goal in COMPANY_GOALS:
+        for priority in CUSTOMER_PRIORITIES:
+            scores[strategy_column(goal, priority)] = (
+                base + _goal_adjustment(goal, priority, profit, yoy, policy) + priority_adj[priority]
+            )
+    return scores
+
+
+def strategy_decisions(scores):
+    '''
+    Map scores to decision codes: 1 to increase, -1 to reduce, 0 to maintain the discount.
+
+    Same thresholds as strategy_labels(), without building the HTML labels.
+    '''
+    return np.select([scores >= 4, scores <= -1], [1, -1], default=0).astype(np.int8)
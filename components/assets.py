@@ -0,0 +1,135 @@
+import base64
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+from starlette.responses import FileResponse
+from starlette.routing import Route
+
+# Category icons shown in the first column of the table: (image file, size in px)
+CATEGORY_ICONS = {
+    "Furniture": ("images/icons8_wing_chair_1.png", 26),
+    "Office Supplies": ("images/icons8_print _1.png", 26),
+    "Technology": ("images/icons8_server_1.png", 24),
+}
+
+ICON_URL_PREFIX = "/icons"
+
+# The icon URLs contain a content hash, so browsers may keep them forever
+ICON_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@lru_cache(maxsize=None)
+def _icon_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@lru_cache(maxsize=None)
+def icon_url(category):
+    '''
+    Return the static URL of a category icon, e.g. "/icons/1a2b3c4d/furniture.png".
+
+    The path contains a short hash of the image so a changed icon gets a new URL
+    and the long-lived cache headers never serve a stale file.
+    '''
+    path, _ = CATEGORY_ICONS[category]
+    digest = hashlib.sha256(_icon_bytes(path)).hexdigest()[:8]
+    slug = category.lower().replace(" ", "-")
+    return f"{ICON_URL_PREFIX}/{digest}/{slug}{Path(path).suffix}"
+
+
+@lru_cache(maxsize=None)
+def icon_data_uri(category):
+    '''
+    Return a category icon as a base64 data URI, encoded once per process.
+    '''
+    path, _ = CATEGORY_ICONS[category]
+    encoded = base64.b64encode(_icon_bytes(path)).decode("utf-8")
+    return f"data:image/png;base64,{encoded}"
+
+
+def icon_map(embed=False):
+    '''
+    Build the Category -> HTML label mapping used in the "Category" column.
+
+    Args:
+        embed (bool): If True, inline the images as data URIs so the HTML works on
+            its own (standalone pages, exported files). By default the images are
+            referenced by the URLs registered with icon_static_assets().
+
+    Returns:
+        dict: Category name to an HTML snippet with the icon and the name.
+    '''
+    labels = {}
+    for category, (_, size) in CATEGORY_ICONS.items():
+        src = icon_data_uri(category) if embed else icon_url(category)
+        labels[category] = (
+            f"<img src='{src}' style='width:{size}px;height:{size}px;vertical-align:middle;margin-right:4px;'/> {category}"
+        )
+    return labels
+
+
+def icon_static_assets(app_dir):
+    '''
+    Return the icon URL -> file mapping to add to the app's static assets.
+
+    Args:
+        app_dir (pathlib.Path): Directory the icon paths are relative to.
+
+    Returns:
+        dict: URL path to absolute file path, as expected by shiny.App(static_assets=...).
+    '''
+    return {
+        icon_url(category): Path(app_dir) / path
+        for category, (path, _) in CATEGORY_ICONS.items()
+    }
+
+
+class CacheControlMiddleware:
+    '''
+    ASGI middleware that adds a Cache-Control header to responses under a path prefix.
+
+    Args:
+        app: The wrapped ASGI application.
+        prefix (str): Only requests whose path starts with this prefix get the header.
+        cache_control (str): The header value.
+    '''
+
+    def __init__(self, app, prefix=ICON_URL_PREFIX, cache_control=ICON_CACHE_CONTROL):
+        self.app = app
+        self.prefix = prefix
+        self.header = (b"cache-control", cache_control.encode("latin-1"))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_header(message):
+            if message["type"] == "http.response.start":
+                headers = [h for h in message.get("headers", []) if h[0].lower() != b"cache-control"]
+                message = {**message, "headers": headers + [self.header]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_header)
+
+
+def _file_endpoint(path):
+    async def endpoint(request):
+        return FileResponse(path)
+    return endpoint
+
+
+def mount_icons(starlette_app, app_dir):
+    '''
+    Add the icon routes to the Starlette app behind a shiny.App, with long-lived cache headers.
+
+    Args:
+        starlette_app (starlette.applications.Starlette): e.g. app.starlette_app.
+        app_dir (pathlib.Path): Directory the icon paths are relative to.
+    '''
+    for url, path in icon_static_assets(app_dir).items():
+        starlette_app.router.routes.insert(0, Route(url, _file_endpoint(path), methods=["GET"]))
+    starlette_app.add_middleware(CacheControlMiddleware)
+
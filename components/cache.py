@@ -0,0 +1,163 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from components.metrics import register_gauge
+
+# Counter of stats() -> help of the gauge publishing it (see register_cache_gauges())
+CACHE_GAUGES = {
+    "hits": "Lookups answered from the cache.",
+    "misses": "Lookups that computed the value.",
+    "coalesced": "Lookups that waited on another caller's computation of the same key.",
+    "evictions": "Entries evicted to stay within the size or weight bound.",
+    "size": "Entries currently cached.",
+}
+
+
+class LRUCache:
+    '''
+    A bounded, thread-safe LRU cache with single-flight computation.
+
+    One instance is shared by every session of a worker process. When several
+    callers ask for a key that is still being computed, only the first one runs
+    the computation and the others wait for its result. Cached values are
+    shared, so callers must treat them as read-only.
+
+    Args:
+        maxsize (int): Maximum number of entries kept; the least recently used
+            entry is evicted beyond that.
+        maxweight (int, optional): Upper bound for the summed weight of all
+            entries, e.g. a byte budget. No bound when omitted.
+        weigher (callable, optional): Returns the weight of a value; required
+            with maxweight.
+    '''
+
+    def __init__(self, maxsize=128, maxweight=None, weigher=None):
+        if maxweight is not None and weigher is None:
+            raise ValueError("maxweight needs a weigher")
+        self.maxsize = maxsize
+        self.maxweight = maxweight
+        self.weigher = weigher
+        self.weight = 0
+        self._weights = {}
+        self._data = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0  # callers that waited on another caller's computation
+
+    def get_or_compute(self, key, compute):
+        '''
+        Return the cached value for key, calling compute() once if it is missing.
+
+        Args:
+            key (hashable): The cache key.
+            compute (callable): Zero-argument function producing the value.
+
+        Returns:
+            The cached or freshly computed value. If compute() raises, the error
+            is passed to every caller waiting on that key and nothing is cached.
+        '''
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                self.misses += 1
+                future = Future()
+                self._inflight[key] = future
+                generation = self._generation
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            # Don't store results computed against data that was invalidated meanwhile
+            if generation == self._generation:
+                self._store(key, value)
+        future.set_result(value)
+        return value
+
+    def _store(self, key, value):
+        # Called with the lock held
+        if self.weigher is not None:
+            self.weight -= self._weights.pop(key, 0)
+            self._weights[key] = self.weigher(value)
+            self.weight += self._weights[key]
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while self._data and (
+            len(self._data) > self.maxsize
+            or (self.maxweight is not None and self.weight > self.maxweight)
+        ):
+            evicted, _ = self._data.popitem(last=False)
+            self.weight -= self._weights.pop(evicted, 0)
+            self.evictions += 1
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def clear(self):
+        '''
+        Drop every entry, e.g. after a dataset reload.
+
+        Computations still in flight finish for their waiting callers but their
+        results are not stored.
+        '''
+        with self._lock:
+            self._data.clear()
+            self._weights.clear()
+            self.weight = 0
+            self._inflight.clear()
+            self._generation += 1
+
+    def stats(self):
+        '''
+        Return the hit/miss/eviction counters and the current size as a dict.
+        '''
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "weight": self.weight,
+                "maxweight": self.maxweight,
+            }
+
+
+def register_cache_gauges(caches):
+    '''
+    Publish the counters of caches at /metrics, one gauge per counter with a "cache" label.
+
+    Args:
+        caches (dict): Cache name (the label value) -> LRUCache.
+    '''
+    for counter, help in CACHE_GAUGES.items():
+        register_gauge(
+            f"dashboard_cache_{counter}", help, "cache",
+            lambda counter=counter: {name: cache.stats()[counter] for name, cache in caches.items()},
+        )
@@ -0,0 +1,252 @@
+import pandas as pd
+
+CUBE_KEYS = ["Region", "Year", "Category", "Sub-Category"]
+ALL_REGIONS = "All"  # same label as the "All" option of the region dropdown
+
+# Raw rows store the measures compactly (see components.data_loader.SCHEMA); they
+# are summed in these dtypes so that large sums neither lose precision nor overflow
+SUM_DTYPES = {"Sales": "float64", "Profit": "float64", "Discount": "float64", "Quantity": "int64"}
+
+# Decimals of the amounts in the source. Their sums are rounded to it: a float sum is
+# off the exact decimal total by a few ulps depending on the order it was added up in,
+# rounded it is the same whichever engine, chunking or order produced it
+SUM_DECIMALS = 4
+ROUNDED_SUMS = ["Sales", "Profit", "Discount_sum"]
+
+# Decimals of a mean discount: means of two-decimal discounts over fewer than 10^7
+# rows are at least 1e-7 apart, so this drops the float noise of the division
+# (0.1 rather than 0.09999999999999999) without merging distinct means
+MEAN_DECIMALS = 9
+
+
+def widen(df):
+    '''
+    Return df with its measure columns cast to SUM_DTYPES, ready to be summed.
+    '''
+    return df.astype({col: dtype for col, dtype in SUM_DTYPES.items() if col in df.columns})
+
+
+def discount_mean(cells):
+    '''
+    Return the mean discount of cube cells (or of any frame with "Discount_sum" and
+    "Discount_count" columns), rounded to MEAN_DECIMALS.
+    '''
+    return (cells["Discount_sum"] / cells["Discount_count"]).round(MEAN_DECIMALS)
+
+
+def _rounded(cells):
+    return cells.assign(**{col: cells[col].round(SUM_DECIMALS) for col in ROUNDED_SUMS})
+
+
+def _aggregate(df, keys):
+    cells = widen(df).groupby(keys).agg(
+        Sales=("Sales", "sum"),
+        Profit=("Profit", "sum"),
+        Discount_sum=("Discount", "sum"),
+        Discount_count=("Discount", "count"),
+        Quantity=("Quantity", "sum"),
+    )
+    cells = _rounded(cells)
+    # Plain labels for the categorical keys of the raw rows, so cubes of
+    # different chunks combine and cube lookups take plain strings
+    if isinstance(cells.index, pd.MultiIndex):
+        cells.index = cells.index.set_levels([
+            level.categories[level.codes] if isinstance(level, pd.CategoricalIndex) else level
+            for level in cells.index.levels
+        ])
+    return cells
+
+
+def build_cube(df):
+    '''
+    Pre-aggregate the raw rows into a Region x Year x Category x Sub-Category cube.
+
+    Every measure summary() needs is a sum or a mean over these four keys, so
+    the cube is built once at load time and each render reads a handful of
+    cells instead of scanning the raw rows. Amounts are summed to the
+    SUM_DECIMALS of the source, so every cell holds the exact decimal total
+    of its rows.
+
+    Args:
+        df (pandas.DataFrame): The full dataset with "Year", "Region", "Category",
+            "Sub-Category", "Sales", "Profit", "Discount" and "Quantity" columns.
+
+    Returns:
+        pandas.DataFrame: Indexed by (Region, Year, Category, Sub-Category) with the
+        columns "Sales", "Profit", "Discount_sum", "Discount_count" and "Quantity".
+    '''
+    by_region = _aggregate(df, CUBE_KEYS)
+    all_regions = pd.concat(
+        {ALL_REGIONS: _aggregate(df, CUBE_KEYS[1:])}, names=["Region"]
+    )
+    return pd.concat([by_region, all_regions]).sort_index()
+
+
+def partial_cube(df):
+    '''
+    Aggregate one chunk of raw rows per (Region, Year, Category, Sub-Category).
+
+    Partials of disjoint chunks can be merged with combine_partials() and turned
+    into a full cube with add_region_rollup(); used when the rows do not fit in
+    memory at once.
+    '''
+    return _aggregate(df, CUBE_KEYS)
+
+
+def combine_partials(partials):
+    '''
+    Merge partial cubes of disjoint chunks by adding up their cells.
+    '''
+    return _rounded(pd.concat(partials).groupby(level=CUBE_KEYS).sum())
+
+
+def add_region_rollup(by_region):
+    '''
+    Add the "All" region rows to a per-region cube by adding up the regions.
+    '''
+    all_regions = pd.concat(
+        {ALL_REGIONS: _rounded(by_region.groupby(level=CUBE_KEYS[1:]).sum())}, names=["Region"]
+    )
+    return pd.concat([by_region, all_regions]).sort_index()
+
+
+def update_cube(cube, df, cells):
+    '''
+    Recompute some cells of a cube from the raw rows, keeping the others as they are.
+
+    Used after rows were appended, corrected or removed: only the cells those
+    rows fall in, and their "All" region rollups, are aggregated again from
+    all of their current rows, so the result equals build_cube(df) without
+    scanning the groups that did not change.
+
+    Args:
+        cube (pandas.DataFrame): A cube as returned by build_cube().
+        df (pandas.DataFrame): The full dataset after the change.
+        cells (pandas.MultiIndex): (Region, Year, Category, Sub-Category) cells to
+            recompute; cells left without any row are dropped.
+
+    Returns:
+        pandas.DataFrame: The updated cube (a new frame).
+    '''
+    rollups = cells.droplevel("Region").unique()
+    stale = cube.index.isin(cells) | (
+        (cube.index.get_level_values("Region") == ALL_REGIONS)
+        & cube.index.droplevel("Region").isin(rollups)
+    )
+    # Cheap column filters first, the exact cell match on what is left
+    rows = df[
+        df["Year"].isin(rollups.unique("Year"))
+        & df["Sub-Category"].isin(rollups.unique("Sub-Category"))
+    ]
+    rows = rows[pd.MultiIndex.from_frame(rows[CUBE_KEYS[1:]]).isin(rollups)]
+    by_region = _aggregate(rows[pd.MultiIndex.from_frame(rows[CUBE_KEYS]).isin(cells)], CUBE_KEYS)
+    all_regions = pd.concat(
+        {ALL_REGIONS: _aggregate(rows, CUBE_KEYS[1:])}, names=["Region"]
+    )
+    return pd.concat([cube[~stale], by_region, all_regions]).sort_index()
+
+
+def add_rows(cube, rows):
+    '''
+    Add new raw rows to a cube, touching only the cells they fall in.
+
+    The cells are incremented rather than aggregated again; with the sums
+    rounded to SUM_DECIMALS the result equals build_cube() of all the rows.
+
+    Args:
+        cube (pandas.DataFrame): A cube as returned by build_cube().
+        rows (pandas.DataFrame): Rows not counted in the cube yet.
+
+    Returns:
+        pandas.DataFrame: The updated cube (a new frame).
+    '''
+    all_regions = pd.concat(
+        {ALL_REGIONS: _aggregate(rows, CUBE_KEYS[1:])}, names=["Region"]
+    )
+    return combine_partials([cube, partial_cube(rows), all_regions])
+
+
+def cube_slice(cube, year, region):
+    '''
+    Return the cells of one (region, year) pair, one row per Category/Sub-Category.
+
+    Args:
+        cube (pandas.DataFrame): A cube as returned by build_cube().
+        year (int): The year to select.
+        region (str): A region name or "All".
+
+    Returns:
+        pandas.DataFrame: "Category" and "Sub-Category" columns followed by the cube
+        measures, sorted by Category and Sub-Category. Empty if the pair has no data.
+    '''
+    try:
+        cells = cube.loc[(region, year)]
+    except KeyError:
+        cells = cube.iloc[0:0].droplevel(["Region", "Year"])
+    return cells.reset_index()
+
+
+def trend_frame(cube):
+    '''
+    Return yearly Revenue and mean Discount per Category/Sub-Category over all regions.
+    '''
+    trend = cube.loc[ALL_REGIONS].reset_index()
+    trend["Revenue"] = trend["Sales"]
+    trend["Discount"] = discount_mean(trend)
+    trend = trend.sort_values(["Category", "Sub-Category", "Year"], ignore_index=True)
+    return trend[["Category", "Sub-Category", "Year", "Revenue", "Discount"]]
+
+
+def build_trends(cube):
+    '''
+    Compute the revenue sparkline and elasticity proxy of every Category/Sub-Category.
+
+    Neither value depends on the selected year or region (both use all years and
+    all regions), so they are computed once per dataset with a single groupby
+    and each render only looks them up.
+
+    Args:
+        cube (pandas.DataFrame): A cube as returned by build_cube().
+
+    Returns:
+        pandas.DataFrame: Indexed by (Category, Sub-Category) with
+            - "Revenue Trend (All Years)": space-separated yearly revenue, oldest first
+            - "Elasticity Proxy": Discount vs Revenue correlation across years, rounded
+              to 2 decimals, 0 when fewer than 3 years are available
+    '''
+    trend_data = trend_frame(cube)
+    groups = trend_data.groupby(["Category", "Sub-Category"])
+
+    def build_trend(revenue):
+        # Filter out NaN values and join as a space-separated string
+        return " ".join(str(v) for v in revenue.tolist() if not pd.isna(v))
+
+    def calc_elasticity(series):
+        if len(series) >= 3:  # need at least 3 years to measure correlation
+            corr = series["Discount"].corr(series["Revenue"])
+            return round(corr, 2) if pd.notna(corr) else 0
+        return 0
+
+    return pd.DataFrame({
+        "Revenue Trend (All Years)": groups["Revenue"].agg(build_trend),
+        "Elasticity Proxy": groups[["Discount", "Revenue"]].apply(calc_elasticity),
+    })
+
+
+def update_trends(trends, cube, subcategories):
+    '''
+    Recompute the trends of some Category/Sub-Category pairs after update_cube().
+
+    Args:
+        trends (pandas.DataFrame): Trends as returned by build_trends().
+        cube (pandas.DataFrame): The updated cube.
+        subcategories (pandas.MultiIndex): (Category, Sub-Category) pairs whose cells changed.
+
+    Returns:
+        pandas.DataFrame: The updated trends (a new frame).
+    '''
+    cells = cube[cube.index.droplevel(["Region", "Year"]).isin(subcategories)]
+    kept = trends[~trends.index.isin(subcategories)]
+    if cells.empty:
+        return kept
+    return pd.concat([kept, build_trends(cells)]).sort_index()
@@ -0,0 +1,277 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import polars as pl
+
+from components import table_logic_polars
+from components.cache import LRUCache, register_cache_gauges
+from components.cube import build_cube, build_trends
+from components.data_loader import DATA_PATH, dataset_version, load_dataset, memory_report
+from components.drilldown import PRODUCT_COLUMNS, build_row_index, node_rows, product_matrix
+from components.elasticity import ROW_COLUMNS as ELASTICITY_COLUMNS, build_elasticity, combine_period_sums, fit_elasticity, period_sums, region_estimates
+from components.export import write_bulk_export
+from components.metrics import register_gauge, span, trace
+from components.partitioned_source import PartitionedSource
+from components.refresh import DatasetRefresher, DatasetState
+from components.shared_data import SharedDatasetRefresher, load_shared
+from components.table_logic import DEFAULT_GOAL, DEFAULT_PRIORITY, strategy_view, summary_matrix, view_options
+from components.table_visual import product_rows_html, render_cache, table_display, table_rows_html
+from components.warmup import Warmup
+
+# A rendered table; key identifies it, so strategy updates only apply to the matching one
+TableView = namedtuple("TableView", ["key", "data", "year", "region", "matrix", "table", "goal", "priority"])
+
+
+class Dashboard:
+    '''
+    The data, caches and views of the dashboard, shared by every session of a process.
+
+    Loads the dataset (from the workbook, a shared-memory segment or Year/Region
+    partitions, see the DASHBOARD_* variables in the README), optionally
+    watches the workbook for changes, and computes the tables, pages,
+    product rows and exports that the sessions of Dashboard.qmd display.
+    Summaries, elasticity fits and products are computed once per process
+    and dataset version, whichever session asks first.
+
+    Args:
+        data_path (str): Path of the superstore workbook.
+    '''
+
+    def __init__(self, data_path=DATA_PATH):
+        self.data_path = data_path
+        self.source = None
+        # Dataset load time is recorded as the "load" stage (see components/metrics.py)
+        with span("load"):
+            if os.environ.get("DASHBOARD_DATA_DIR"):
+                # Histories too large for memory: Year/Region partitioned Parquet/CSV files. Only the
+                # aggregates are kept (one streaming pass); tables are read from them, the drill-down
+                # reads just its own partition.
+                self.source = PartitionedSource(os.environ["DASHBOARD_DATA_DIR"], os.environ.get("DASHBOARD_DATA_FORMAT", "parquet"))
+                version = self.source.version()
+                df = None
+                cube, last_order_date, _ = self.source.stream_aggregates()
+                trends = build_trends(cube)
+            elif os.environ.get("DASHBOARD_SHARED_DATA") == "1":
+                # Several workers: the first one publishes the data and aggregates to a memory-mapped
+                # segment (see components/shared_data.py), every worker attaches to it without copying
+                version, df, cube, trends = load_shared(data_path)
+            else:
+                # (typed Arrow cache with the "Year" column, rebuilt only when the .xls changes;
+                # only the columns the views read are loaded, in compact dtypes)
+                df = load_dataset(data_path)
+                version = dataset_version(data_path)
+
+                # Region x Year x Category x Sub-Category sums that summary() reads from
+                cube = build_cube(df)
+                # Sparkline and elasticity per sub-category (independent of the filters)
+                trends = build_trends(cube)
+        if df is not None:
+            last_order_date = df["Order Date"].max()
+        self.dataset = DatasetState(version, df, cube, trends, last_order_date)
+
+        # Watch the workbook and apply new or corrected orders without a restart
+        # (every DASHBOARD_REFRESH_SECONDS, see components/refresh.py); with shared data one
+        # worker publishes the new version and every worker attaches to it
+        self.refresher = None
+        if df is not None and os.environ.get("DASHBOARD_REFRESH_SECONDS"):
+            refresher_class = SharedDatasetRefresher if os.environ.get("DASHBOARD_SHARED_DATA") == "1" else DatasetRefresher
+            self.refresher = refresher_class(self.dataset, data_path, interval=float(os.environ["DASHBOARD_REFRESH_SECONDS"]))
+            self.refresher.start()
+
+        register_gauge("dashboard_dataset_bytes", "Memory held by the loaded dataset, per frame.", "frame", self.dataset_bytes)
+
+        # Monthly (or weekly, DASHBOARD_ELASTICITY_FREQ) elasticity per region and sub-category with
+        # confidence intervals, fitted once per dataset version; shown as the Elasticity Proxy tooltips
+        self.elasticity_freq = os.environ.get("DASHBOARD_ELASTICITY_FREQ", "month")
+        self.elasticity_cache = LRUCache(maxsize=1)
+        self.view_elasticity(self.dataset)
+        if self.refresher is not None:
+            # Fitted again in the refresh thread, before sessions render the new version
+            self.refresher.subscribe(self.view_elasticity)
+
+        # Summary engine: "pandas" (reads the cube) or "polars" (one lazy query over the raw
+        # rows, handed to the table as an Arrow-backed polars frame)
+        self.summary_engine = os.environ.get("DASHBOARD_SUMMARY_ENGINE", "pandas")
+        self.polars_inputs_cache = LRUCache(maxsize=1)
+        if self.summary_engine == "polars":
+            self.polars_inputs(self.dataset)
+        self.view_strategy = table_logic_polars.strategy_view if self.summary_engine == "polars" else strategy_view
+
+        # Summaries shared by every session of this process, keyed by (data version, year, region)
+        self.summary_cache = LRUCache(maxsize=64)
+
+        # Summary, strategies and table HTML of a view are computed in these threads, off the
+        # event loop serving every session (DASHBOARD_RENDER_WORKERS threads)
+        self.render_executor = ThreadPoolExecutor(
+            max_workers=int(os.environ.get("DASHBOARD_RENDER_WORKERS", "4")), thread_name_prefix="render"
+        )
+
+        # Longer tables are sent DASHBOARD_PAGE_ROWS rows at a time: the first page with the
+        # table, the next ones as it is scrolled (see send_table_page in Dashboard.qmd)
+        self.page_rows = int(os.environ.get("DASHBOARD_PAGE_ROWS", "50"))
+
+        # Products of a sub-category are aggregated and scored only when its row is expanded,
+        # from that (year, region, sub-category) node's rows alone
+        self.row_index_cache = LRUCache(maxsize=1)
+        self.product_cache = LRUCache(maxsize=256)
+
+        # Hit, miss and eviction counters of every cache, exported at /metrics
+        register_cache_gauges({
+            "summary": self.summary_cache, "render": render_cache, "products": self.product_cache,
+            "row_index": self.row_index_cache, "elasticity": self.elasticity_cache,
+            "polars_inputs": self.polars_inputs_cache,
+        })
+
+        # Optional warm-up of every region x year view once the server accepts connections
+        # (DASHBOARD_WARMUP=1, DASHBOARD_WARMUP_WORKERS threads, started by serve.py); it
+        # pauses while renders run
+        self.warmup = Warmup(self.warmup_views, self.warm_view, workers=int(os.environ.get("DASHBOARD_WARMUP_WORKERS", "1")))
+        self.warmup_enabled = os.environ.get("DASHBOARD_WARMUP") == "1"
+        if self.warmup_enabled:
+            register_gauge("dashboard_warmup_views", "Views precomputed by the warm-up.", "state", self.warmup.metric_values)
+            if self.refresher is not None:
+                # Refreshed data has a new version: warm it again
+                self.refresher.subscribe(lambda state: self.warmup.start())
+
+    def current_dataset(self):
+        return self.refresher.state if self.refresher is not None else self.dataset
+
+    def dataset_bytes(self):
+        # Memory held by the loaded rows and their aggregates in this worker
+        data = self.current_dataset()
+        frames = {"rows": data.df, "cube": data.cube, "trends": data.trends}
+        return {name: int(memory_report(f).loc["Total", "bytes"]) for name, f in frames.items() if f is not None}
+
+    def view_elasticity(self, data):
+        def fit():
+            with span("elasticity_fit"):
+                if self.source is not None:
+                    # Summed one year of rows at a time
+                    return fit_elasticity(combine_period_sums(
+                        period_sums(self.source.read_rows([year], columns=ELASTICITY_COLUMNS), self.elasticity_freq)
+                        for year in self.source.years()
+                    ), self.elasticity_freq)
+                return build_elasticity(data.df, self.elasticity_freq)
+        return self.elasticity_cache.get_or_compute(data.version, fit)
+
+    def view_estimates(self, region, data=None):
+        # Elasticity estimates and confidence intervals of one region, for the exports
+        return region_estimates(self.view_elasticity(data or self.current_dataset()), region)
+
+    def polars_inputs(self, data):
+        # Rows, trends and elasticity for the polars engine, converted once per dataset version
+        def convert():
+            trends, elasticity = pl.from_pandas(data.trends.reset_index()), pl.from_pandas(self.view_elasticity(data).reset_index())
+            if self.source is not None:
+                return self.source.scan_polars(table_logic_polars.ROW_COLUMNS), trends, elasticity
+            return table_logic_polars.rows_frame(data.df), trends, elasticity
+        return self.polars_inputs_cache.get_or_compute(data.version, convert)
+
+    def view_matrix(self, year, region, data=None):
+        '''
+        Return all 16 goal/priority strategies of one year/region, computed once per process.
+
+        Concurrent sessions and bulk exports asking for the same view wait for
+        the same result.
+
+        Args:
+            year (int): The year.
+            region (str): A region name or "All".
+            data (DatasetState, optional): The dataset version; the current one by default.
+
+        Returns:
+            DataFrame: The summary_matrix() of the view (pandas, or polars with that engine).
+        '''
+        if data is None:
+            data = self.current_dataset()
+        if self.summary_engine == "polars":
+            rows, rows_trends, rows_elasticity = self.polars_inputs(data)
+            compute = lambda: table_logic_polars.summary_matrix(rows, year, region, trends=rows_trends, elasticity=rows_elasticity)
+        else:
+            # Read from the cube alone, no raw rows of the view (empty views included)
+            compute = lambda: summary_matrix(
+                data.df, None, year, region, cube=data.cube, trends=data.trends, elasticity=self.view_elasticity(data),
+            )
+        return self.summary_cache.get_or_compute((data.version, year, region), compute)
+
+    def bulk_export(self, fmt, all_strategies, goal, priority):
+        # Every year x region (all years, not only those in the Year filter) as one zip entry each
+        data = self.current_dataset()
+        regions, _ = view_options(data.cube)
+
+        def views():
+            for year in sorted(data.cube.index.unique("Year")):
+                for region in regions:
+                    matrix = self.view_matrix(year, region, data)
+                    frame = matrix if all_strategies else self.view_strategy(matrix, goal, priority)
+                    yield f"{year}/{region}", frame, self.view_estimates(region, data)
+        return write_bulk_export(views(), fmt)
+
+    def compute_view(self, data, year, region, goal, priority):
+        '''
+        Compute the summary and the table of one view, for one goal/priority pair.
+
+        Timed as the "render" stage and logged with its inputs when
+        DASHBOARD_SLOW_RENDER_MS is exceeded. Runs in the render threads.
+
+        Returns:
+            TableView: The view, its summary_matrix() and its table HTML (first page).
+        '''
+        with trace("render", year=year, region=region, goal=goal, priority=priority):
+            matrix = self.view_matrix(year, region, data)
+            table = table_display(self.view_strategy(matrix, goal, priority), year, region, page_rows=self.page_rows)
+        return TableView(f"{data.version}|{year}|{region}", data, year, region, matrix, table, goal, priority)
+
+    def compute_page(self, view, start, goal, priority):
+        # Rows [start, start + page_rows) of a rendered table, for the current goal/priority
+        with trace("render_page", year=view.year, region=view.region, goal=goal, priority=priority, start=start):
+            df_sum = self.view_strategy(view.matrix, goal, priority)
+            return table_rows_html(df_sum, view.year, view.region, start, start + self.page_rows)
+
+    def product_rows(self, data):
+        # The product columns are not loaded with the rest: they are read from the Arrow
+        # cache, and indexed, the first time a sub-category is expanded
+        def load():
+            rows = load_dataset(self.data_path, columns=PRODUCT_COLUMNS)
+            return rows, build_row_index(rows)
+        return self.row_index_cache.get_or_compute(data.version, load)
+
+    def product_node_rows(self, data, year, region, subcategory):
+        # Raw rows of one node: a slice of the row index, or the node's partitions
+        if self.source is not None:
+            rows = self.source.read_rows([year], region, columns=PRODUCT_COLUMNS)
+            return rows[rows["Sub-Category"] == subcategory]
+        rows, index = self.product_rows(data)
+        return node_rows(rows, index, year, region, subcategory)
+
+    def view_products(self, data, year, region, subcategory):
+        # All 16 goal/priority strategies of one sub-category's products, computed once per process
+        def compute():
+            with span("products"):
+                prev_year = year - 1
+                return product_matrix(
+                    self.product_node_rows(data, year, region, subcategory),
+                    self.product_node_rows(data, prev_year, region, subcategory),
+                )
+        return self.product_cache.get_or_compute((data.version, year, region, subcategory), compute)
+
+    def product_strategy(self, view, subcategory, goal, priority):
+        # Products of one sub-category of a rendered table, for one goal/priority pair
+        return strategy_view(self.view_products(view.data, view.year, view.region, subcategory), goal, priority)
+
+    def compute_products(self, view, subcategory, goal, priority):
+        # Product rows HTML of one sub-category of a rendered table ("" if it has none)
+        products = self.product_strategy(view, subcategory, goal, priority)
+        return product_rows_html(products, subcategory) if len(products) else ""
+
+    def warm_view(self, year, region):
+        # Summary and default table of one view, into the summary and render caches
+        with span("warmup"):
+            matrix = self.view_matrix(year, region)
+            table_display(self.view_strategy(matrix, DEFAULT_GOAL, DEFAULT_PRIORITY), year, region, page_rows=self.page_rows)
+
+    def warmup_views(self):
+        # Latest year first, "All" first within a year: the view sessions open with
+        regions, years = view_options(self.current_dataset().cube)
+        return [(year, region) for year in reversed(years) for region in regions]
@@ -0,0 +1,285 @@
+import hashlib
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+DATA_PATH = "dataset/sample_-_superstore.xls"
+CACHE_DIR = "dataset/.cache"
+
+# Bump when the cached layout or the derived columns change so old caches are rebuilt
+CACHE_VERSION = "5"
+
+# In-memory dtype of every workbook column and of the derived "Year": categoricals for
+# the low-cardinality text, the smallest integers that hold the values. Amounts stay
+# float64: float32 would round them (a 0.2 discount reads 0.2000000030) and that noise
+# reaches the trend strings and exports. Integers are summed in 64 bits (see components.cube.widen())
+SCHEMA = {
+    "Row ID": "int32",
+    "Order ID": "str",
+    "Order Date": "datetime64[us]",
+    "Ship Date": "datetime64[us]",
+    "Ship Mode": "category",
+    "Customer ID": "str",
+    "Customer Name": "str",
+    "Segment": "category",
+    "Country": "category",
+    "City": "category",
+    "State": "category",
+    "Postal Code": "Int32",
+    "Region": "category",
+    "Product ID": "str",
+    "Category": "category",
+    "Sub-Category": "category",
+    "Product Name": "str",
+    "Sales": "float64",
+    "Quantity": "int16",
+    "Discount": "float64",
+    "Profit": "float64",
+    "Year": "int16",
+}
+
+# The columns the dashboard keeps in memory ("Row ID" matches rows across refreshes);
+# the others (customers, products, ...) are read on demand with load_dataset(columns=...)
+LOADED_COLUMNS = [
+    "Row ID", "Order Date", "Year", "Region", "Category", "Sub-Category",
+    "Sales", "Profit", "Discount", "Quantity",
+]
+
+
+def derive_columns(df):
+    '''
+    Add the derived "Year" column (the order year, as an integer) to raw rows, in place.
+    '''
+    df["Year"] = pd.to_datetime(df["Order Date"]).dt.year.astype(SCHEMA["Year"])
+    return df
+
+
+def apply_schema(df):
+    '''
+    Cast the columns of df that SCHEMA knows to their in-memory dtype.
+
+    Columns already in that dtype are left alone, so applying it twice costs nothing.
+    '''
+    casts = {
+        col: dtype for col, dtype in SCHEMA.items()
+        if col in df.columns and not _has_dtype(df[col], dtype)
+    }
+    return df.astype(casts) if casts else df
+
+
+def _has_dtype(column, dtype):
+    if dtype == "category":
+        return isinstance(column.dtype, pd.CategoricalDtype)
+    return column.dtype == pd.api.types.pandas_dtype(dtype)
+
+
+def memory_report(df):
+    '''
+    Return the memory held by each column of df, strings and categories included.
+
+    Returns:
+        pandas.DataFrame: Indexed by column, with "dtype" and "bytes" columns and a
+        "Total" row.
+    '''
+    usage = df.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({"dtype": df.dtypes.astype(str), "bytes": usage})
+    report.loc["Total"] = ["", int(usage.sum())]
+    return report
+
+
+def read_workbook(path=DATA_PATH, usecols=None):
+    '''
+    Read the rows of the superstore workbook as they are, in their SCHEMA dtypes.
+
+    No column is derived and the rows keep the order of the sheet; see
+    read_source() for the loaded layout.
+
+    Args:
+        path (str): Path to the source workbook.
+        usecols (callable, optional): Keeps the columns whose name it accepts.
+
+    Returns:
+        pandas.DataFrame: The rows of the sheet.
+    '''
+    return apply_schema(pd.read_excel(path, usecols=usecols))
+
+
+def read_source(path=DATA_PATH, columns=None):
+    '''
+    Read the superstore workbook and add the derived "Year" column.
+
+    This is the slow path: the whole .xls is parsed with xlrd on every call.
+
+    Args:
+        path (str): Path to the source workbook.
+        columns (list[str], optional): Columns to keep, "Year" included; every
+            column by default. The others are dropped as the sheet is read.
+
+    Returns:
+        pandas.DataFrame: The rows in the order of the sheet, with an integer "Year" column.
+    '''
+    usecols = None
+    if columns is not None:
+        # "Year" is derived from the order date
+        needed = set(columns) | {"Order Date"}
+        usecols = lambda name: name in needed
+    df = derive_columns(read_workbook(path, usecols))
+    return df if columns is None else df[columns]
+
+
+def file_hash(path, chunk_size=1 << 20):
+    '''
+    Compute the sha256 hex digest of a file, reading it in chunks.
+    '''
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path_for(path=DATA_PATH, cache_dir=CACHE_DIR):
+    '''
+    Return the location of the Arrow cache file for a given source file.
+    '''
+    return Path(cache_dir) / (Path(path).stem + ".arrow")
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return {
+        "source_mtime_ns": str(stat.st_mtime_ns),
+        "source_size": str(stat.st_size),
+    }
+
+
+def dataset_version(path=DATA_PATH):
+    '''
+    Return a short identifier of the current source file contents (size and mtime).
+
+    Used in cache keys so that results computed from an older file are never reused.
+    '''
+    stamp = _source_stamp(path)
+    return f"{stamp['source_size']}-{stamp['source_mtime_ns']}"
+
+
+def _cache_is_fresh(path, cache_file):
+    '''
+    Check the cache metadata against the source file.
+
+    A matching size and mtime is accepted directly. If only the mtime moved
+    (a fresh checkout or a copy), the content hash decides.
+    '''
+    if not cache_file.exists():
+        return False
+
+    with pa.memory_map(str(cache_file), "r") as source:
+        meta = pa.ipc.open_file(source).schema.metadata or {}
+    meta = {k.decode(): v.decode() for k, v in meta.items()}
+
+    if meta.get("cache_version") != CACHE_VERSION:
+        return False
+
+    stamp = _source_stamp(path)
+    if meta.get("source_size") != stamp["source_size"]:
+        return False
+    if meta.get("source_mtime_ns") == stamp["source_mtime_ns"]:
+        return True
+    return meta.get("source_sha256") == file_hash(path)
+
+
+def write_cache(df, path=DATA_PATH, cache_dir=CACHE_DIR):
+    '''
+    Write a loaded dataset to an uncompressed Arrow IPC file next to the source.
+
+    The file is written to a temporary name and moved into place so that a
+    concurrent reader never sees a half-written cache.
+
+    Args:
+        df (pandas.DataFrame): The dataset as returned by read_source(), with every column.
+        path (str): Path to the source workbook the dataset was read from.
+        cache_dir (str): Directory holding the cache files.
+
+    Returns:
+        pathlib.Path: The cache file location.
+    '''
+    cache_file = cache_path_for(path, cache_dir)
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    meta = dict(table.schema.metadata or {})
+    meta.update({
+        k.encode(): v.encode()
+        for k, v in {
+            **_source_stamp(path),
+            "source_sha256": file_hash(path),
+            "cache_version": CACHE_VERSION,
+        }.items()
+    })
+    table = table.replace_schema_metadata(meta)
+
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp_file), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_file, cache_file)
+    return cache_file
+
+
+def read_cache(cache_file, columns=None):
+    '''
+    Memory-map an Arrow cache file and return it (or some of its columns) as a pandas DataFrame.
+
+    Columns left out are never read from the file.
+    '''
+    with pa.memory_map(str(cache_file), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pandas()
+
+
+def load_dataset(path=DATA_PATH, cache_dir=CACHE_DIR, use_cache=True, columns=LOADED_COLUMNS):
+    '''
+    Load the superstore dataset, going through the columnar cache when possible.
+
+    The first start parses the workbook and writes a typed Arrow file that
+    already contains the "Year" column, with every column in its SCHEMA dtype
+    and the rows in the order of the sheet (categoricals are stored as
+    dictionary arrays and come back as categoricals). Later starts memory-map that file
+    as long as it still matches the source (size and mtime, falling back to
+    a content hash). If the cache directory is not writable the workbook is
+    simply read on every start, as before.
+
+    Only LOADED_COLUMNS are returned by default. The cache keeps every
+    column, so a feature needing more (e.g. the product names of the
+    drill-down) loads them when it is first used, in the same row order.
+
+    Args:
+        path (str): Path to the source workbook.
+        cache_dir (str): Directory holding the cache files.
+        use_cache (bool): Set to False to always parse the workbook.
+        columns (list[str], optional): Columns to return; None for every column.
+
+    Returns:
+        pandas.DataFrame: The dataset with the derived "Year" column, in the order
+        of the sheet.
+    '''
+    if not use_cache:
+        return read_source(path, columns)
+
+    cache_file = cache_path_for(path, cache_dir)
+    try:
+        if _cache_is_fresh(path, cache_file):
+            return read_cache(cache_file, columns)
+    except (OSError, pa.ArrowInvalid):
+        pass  # unreadable or corrupt cache, rebuild it below
+
+    df = read_source(path)
+    try:
+        write_cache(df, path, cache_dir)
+    except OSError:
+        pass  # read-only deployments keep working without a cache
+    return df if columns is None else df[columns]
@@ -0,0 +1,134 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from components.cube import ALL_REGIONS, SUM_DECIMALS, discount_mean, widen
+from components.Discount_logic import product_discount_policy, strategy_matrix
+from components.table_logic import DISPLAY_COLUMNS
+
+# Sort order of the row index: the rows of a (year, sub-category) pair are
+# contiguous, and those of each region a contiguous run inside them
+INDEX_KEYS = ["Year", "Sub-Category", "Region"]
+
+# A product is the same Product ID under the same name (a few IDs carry two names)
+PRODUCT_KEYS = ["Product ID", "Product Name"]
+
+# Raw columns a product drill-down reads
+PRODUCT_COLUMNS = INDEX_KEYS + PRODUCT_KEYS + ["Sales", "Profit", "Discount", "Quantity"]
+
+RowIndex = namedtuple("RowIndex", ["order", "ranges"])
+
+
+def _runs(codes):
+    # (start, stop) of the runs of equal consecutive values, over several code arrays
+    n = len(codes[0])
+    if n == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    changed = np.zeros(n - 1, dtype=bool)
+    for c in codes:
+        changed |= c[1:] != c[:-1]
+    bounds = np.flatnonzero(changed) + 1
+    return np.r_[0, bounds], np.r_[bounds, n]
+
+
+def build_row_index(df):
+    '''
+    Index the raw rows by (year, region, sub-category) node.
+
+    The row positions are sorted once by year, sub-category and region, so
+    the rows of any node, "All" region included, are one contiguous slice of
+    that order; reading a node then costs its own size, not the dataset's.
+
+    Args:
+        df (pandas.DataFrame): The raw rows with "Year", "Region" and "Sub-Category" columns.
+
+    Returns:
+        RowIndex: "order", the sorted row positions (numpy array), and "ranges",
+        {(year, region, sub-category): (start, stop)} into that order.
+    '''
+    codes, labels = zip(*(pd.factorize(df[col], sort=True) for col in INDEX_KEYS))
+    order = np.lexsort(codes[::-1])
+    year, subcategory, region = (c[order] for c in codes)
+    years, subcategories, regions = (np.asarray(l, dtype=object) for l in labels)
+
+    ranges = {}
+    starts, stops = _runs([year, subcategory, region])
+    for start, stop in zip(starts.tolist(), stops.tolist()):
+        ranges[(years[year[start]], regions[region[start]], subcategories[subcategory[start]])] = (start, stop)
+    starts, stops = _runs([year, subcategory])
+    for start, stop in zip(starts.tolist(), stops.tolist()):
+        ranges[(years[year[start]], ALL_REGIONS, subcategories[subcategory[start]])] = (start, stop)
+    return RowIndex(order, ranges)
+
+
+def node_rows(df, index, year, region, subcategory):
+    '''
+    Return the raw rows of one (year, region, sub-category) node through the row index.
+
+    Args:
+        df (pandas.DataFrame): The rows the index was built on.
+        index (RowIndex): build_row_index(df).
+        year (int): The year.
+        region (str): A region name or "All".
+        subcategory (str): The sub-category.
+
+    Returns:
+        pandas.DataFrame: The node's rows (empty if it has none).
+    '''
+    start, stop = index.ranges.get((year, region, subcategory), (0, 0))
+    return df.take(index.order[start:stop])
+
+
+def product_matrix(rows, prev_rows, policy=product_discount_policy):
+    '''
+    Aggregate and score the products of one sub-category node, like summary_matrix() does for sub-categories.
+
+    Revenue, quantity, profit and mean discount are summed per product (rounded
+    like the cells of the cube, see components.cube.SUM_DECIMALS), YoY
+    revenue growth is taken against the same product (ID and name) in
+    prev_rows, and the strategy is computed for all 16 goal x priority pairs
+    against product-level thresholds. Products have no sparkline or
+    elasticity (empty cells).
+
+    Args:
+        rows (pandas.DataFrame): The node's raw rows (see node_rows()).
+        prev_rows (pandas.DataFrame): The raw rows of the same node the year before.
+        policy (dict, optional): A dictionary of product policy thresholds.
+
+    Returns:
+        pandas.DataFrame: One row per product, by decreasing revenue, with the
+        DISPLAY_COLUMNS of a summary (the product name as "Sub-Category") and
+        the strategy_matrix() columns. Empty if the node has no rows.
+    '''
+    if rows.empty:
+        return pd.DataFrame()
+    rows, prev_rows = widen(rows), widen(prev_rows)
+
+    products = rows.groupby(PRODUCT_KEYS, sort=False).agg(
+        Revenue=("Sales", "sum"),
+        Quantity=("Quantity", "sum"),
+        Profit=("Profit", "sum"),
+        Discount_sum=("Discount", "sum"),
+        Discount_count=("Discount", "count"),
+    ).round({"Revenue": SUM_DECIMALS, "Profit": SUM_DECIMALS, "Discount_sum": SUM_DECIMALS}).reset_index()
+    products["Discount"] = discount_mean(products)
+
+    prev_revenue = prev_rows.groupby(PRODUCT_KEYS)["Sales"].sum().round(SUM_DECIMALS)
+    prev = pd.Series(
+        prev_revenue.reindex(pd.MultiIndex.from_frame(products[PRODUCT_KEYS])).to_numpy(),
+        index=products.index, dtype=float,
+    )
+    products["YoY Revenue %"] = np.where(
+        prev > 0, ((products["Revenue"] - prev) / prev).round(3), None
+    )
+
+    products["Rank"] = products["Revenue"].rank(method="dense", ascending=False).astype(int)
+    products = products.sort_values(["Rank", "Product Name"], ignore_index=True)
+    products["Category_Display"] = ""
+    products["Sub-Category"] = products["Product Name"]
+    products["Revenue Trend (All Years)"] = ""
+    products["Elasticity Proxy"] = ""
+
+    matrix = strategy_matrix(products, policy)
+    return pd.concat([products[DISPLAY_COLUMNS[:-1]], matrix], axis=1)
@@ -0,0 +1,184 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from components.cube import ALL_REGIONS, CUBE_KEYS, widen
+
+# Period granularity -> (unit name used in the notes, period id of an order date)
+FREQUENCIES = {
+    "month": ("month", lambda dates: dates.dt.year * 12 + dates.dt.month - 1),
+    # days since 1970-01-01 (a Thursday) shifted so that weeks start on Monday
+    "week": ("week", lambda dates: (dates.values.astype("datetime64[D]").astype(np.int64) + 3) // 7),
+}
+
+# The raw columns the fit reads
+ROW_COLUMNS = ["Order Date", "Region", "Category", "Sub-Category", "Sales", "Discount"]
+
+# An estimate needs at least this many periods with sales
+MIN_PERIODS = 6
+CONFIDENCE = 0.95
+
+# Region, Category, Sub-Category
+GROUP_KEYS = [CUBE_KEYS[0]] + CUBE_KEYS[2:]
+
+# The estimate and its confidence interval
+ESTIMATE_COLUMNS = ["Elasticity", "CI Low", "CI High"]
+
+
+def period_sums(rows, freq="month"):
+    '''
+    Add up sales and discounts per (Region, Category, Sub-Category, period).
+
+    Sums of disjoint chunks of rows (e.g. one year at a time) can be merged
+    with combine_period_sums() before fitting.
+
+    Args:
+        rows (pandas.DataFrame): Raw rows with "Order Date", "Region", "Category",
+            "Sub-Category", "Sales" and "Discount" columns.
+        freq (str): One of FREQUENCIES.
+
+    Returns:
+        pandas.DataFrame: Indexed by (Region, Category, Sub-Category, Period), "All"
+        region included, with "Sales", "Discount_sum" and "Discount_count" columns.
+    '''
+    period = np.asarray(FREQUENCIES[freq][1](rows["Order Date"]))
+    frame = widen(rows[GROUP_KEYS + ["Sales", "Discount"]]).assign(Period=period)
+
+    def aggregate(keys):
+        return frame.groupby(keys).agg(
+            Sales=("Sales", "sum"),
+            Discount_sum=("Discount", "sum"),
+            Discount_count=("Discount", "count"),
+        )
+
+    by_region = aggregate(GROUP_KEYS + ["Period"])
+    all_regions = pd.concat({ALL_REGIONS: aggregate(GROUP_KEYS[1:] + ["Period"])}, names=["Region"])
+    return pd.concat([by_region, all_regions])
+
+
+def combine_period_sums(parts):
+    '''
+    Merge period_sums() of disjoint chunks of rows.
+    '''
+    return pd.concat(parts).groupby(level=GROUP_KEYS + ["Period"]).sum()
+
+
+def _t_quantile(p, dof):
+    # Student t quantile through its Cornish-Fisher expansion around the normal
+    # quantile; for a 95% interval, within 0.03% of the exact value at 4 degrees
+    # of freedom (the fewest a fit with MIN_PERIODS periods has), 0.005% from 6 up
+    z = NormalDist().inv_cdf(p)
+    v = np.asarray(dof, dtype=float)
+    return (
+        z
+        + (z**3 + z) / (4 * v)
+        + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * v**2)
+        + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * v**3)
+        + (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z) / (92160 * v**4)
+    )
+
+
+def fit_elasticity(sums, freq="month", confidence=CONFIDENCE, min_periods=MIN_PERIODS):
+    '''
+    Fit the discount elasticity of revenue of every (region, sub-category) at once.
+
+    Per group, log revenue of each period is regressed on the period's mean
+    discount (ordinary least squares); the elasticity is the slope times the
+    mean discount, i.e. the % change in revenue for a 1% relative change in
+    the discount rate at its usual level. The periods of all groups are laid
+    out as one padded (groups x periods) array and every sum the fit needs is
+    taken along its rows, so there is no loop over groups.
+
+    Args:
+        sums (pandas.DataFrame): A period_sums() (or combine_period_sums()) result.
+        freq (str): The granularity of the sums, for the notes.
+        confidence (float): Level of the confidence intervals.
+        min_periods (int): Fewer periods with sales give no estimate.
+
+    Returns:
+        pandas.DataFrame: Indexed by (Region, Category, Sub-Category) with
+            - "Elasticity", "CI Low", "CI High": rounded to 2 decimals, missing when
+              there are too few periods or the discount never changed
+            - "Periods": periods with sales
+            - "Note": a one-line description of the estimate, e.g. for a tooltip
+    '''
+    sums = sums[sums["Sales"] > 0].sort_index()
+    groups = sums.index.droplevel("Period")
+    codes, keys = pd.factorize(groups)
+    if len(keys) == 0:
+        return pd.DataFrame(columns=ESTIMATE_COLUMNS + ["Periods", "Note"])
+
+    # (groups x periods) arrays, padded with zeros outside each group's periods
+    n = np.bincount(codes, minlength=len(keys))
+    position = np.arange(len(codes)) - np.repeat(np.cumsum(n) - n, n)
+    x = np.zeros((len(keys), n.max()))
+    y = np.zeros_like(x)
+    mask = np.zeros_like(x, dtype=bool)
+    x[codes, position] = (sums["Discount_sum"] / sums["Discount_count"]).to_numpy()
+    y[codes, position] = np.log(sums["Sales"].to_numpy())
+    mask[codes, position] = True
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_mean = x.sum(axis=1) / n
+        y_mean = y.sum(axis=1) / n
+        dx = np.where(mask, x - x_mean[:, None], 0.0)
+        dy = np.where(mask, y - y_mean[:, None], 0.0)
+        sxx = (dx * dx).sum(axis=1)
+        slope = (dx * dy).sum(axis=1) / sxx
+        residuals = np.where(mask, dy - slope[:, None] * dx, 0.0)
+        se = np.sqrt((residuals * residuals).sum(axis=1) / (n - 2) / sxx)
+        margin = _t_quantile(0.5 + confidence / 2, np.maximum(n - 2, 1)) * se
+
+    valid = (n >= min_periods) & (sxx > 1e-12)
+    estimate = pd.DataFrame({
+        "Elasticity": np.where(valid, slope * x_mean, np.nan).round(2),
+        "CI Low": np.where(valid, (slope - margin) * x_mean, np.nan).round(2),
+        "CI High": np.where(valid, (slope + margin) * x_mean, np.nan).round(2),
+        "Periods": n,
+    }, index=pd.MultiIndex.from_tuples(keys, names=GROUP_KEYS))
+
+    unit = FREQUENCIES[freq][0]
+    notes = []
+    for e, low, high, periods, ok, enough in zip(
+        estimate["Elasticity"], estimate["CI Low"], estimate["CI High"], n, valid, n >= min_periods
+    ):
+        if ok:
+            notes.append(
+                f"{unit.capitalize()}ly elasticity {e:.2f} "
+                f"({confidence:.0%} CI {low:.2f} to {high:.2f}, {periods} {unit}s)"
+            )
+        elif enough:
+            notes.append(f"{unit.capitalize()}ly elasticity: the discount never changed")
+        else:
+            notes.append(f"{unit.capitalize()}ly elasticity: {periods} {unit}s with sales, {min_periods} needed")
+    estimate["Note"] = notes
+    return estimate.sort_index()
+
+
+def build_elasticity(rows, freq="month", confidence=CONFIDENCE, min_periods=MIN_PERIODS):
+    '''
+    Shortcut for fit_elasticity(period_sums(rows, freq), ...).
+    '''
+    return fit_elasticity(period_sums(rows, freq), freq, confidence, min_periods)
+
+
+def region_notes(estimates, region):
+    '''
+    Return the notes of one region ("All" included), indexed by (Category, Sub-Category).
+    '''
+    try:
+        return estimates.loc[region, "Note"]
+    except KeyError:
+        return pd.Series(dtype="str", name="Note")
+
+
+def region_estimates(estimates, region):
+    '''
+    Return the estimates and confidence intervals of one region ("All" included),
+    indexed by (Category, Sub-Category), with the ESTIMATE_COLUMNS.
+    '''
+    try:
+        return estimates.loc[region, ESTIMATE_COLUMNS]
+    except KeyError:
+        return pd.DataFrame(columns=ESTIMATE_COLUMNS, dtype=float)
@@ -0,0 +1,223 @@
+import os
+import re
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from components.elasticity import ESTIMATE_COLUMNS
+from components.table_logic import DISPLAY_COLUMNS
+
+# format -> (file extension, media type)
+EXPORT_FORMATS = {
+    "csv": (".csv", "text/csv"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "xlsx": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+# Rows serialized per chunk of a download
+EXPORT_CHUNK_ROWS = 10_000
+# Bytes per chunk when streaming a file
+FILE_CHUNK_BYTES = 1 << 16
+
+# Bulk exports of every session run one at a time, off the event loop
+export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export")
+
+_TAGS = re.compile(r"<[^>]+>")
+
+# Export column of each elasticity estimate column
+ESTIMATE_EXPORT_COLUMNS = {"Elasticity": "Elasticity", "CI Low": "Elasticity CI Low", "CI High": "Elasticity CI High"}
+
+
+def _strip_tags(values):
+    return values.astype("str").str.replace(_TAGS, "", regex=True).str.replace("●", "").str.strip()
+
+
+def clean_export_frame(frame, elasticity=None):
+    '''
+    Turn a summary table into plain columns for export.
+
+    The table shown in the dashboard carries HTML (the category icons, the
+    elasticity dot and the strategy labels). The export gets the category name
+    on every row, "Total" as the Sub-Category of the total rows, numeric Rank,
+    YoY Revenue % and Elasticity Proxy columns, and plain strategy labels.
+
+    Args:
+        frame (pandas.DataFrame | polars.DataFrame): A summary(), strategy_view() or
+            summary_matrix() result, from either engine.
+        elasticity (pandas.DataFrame, optional): The region_estimates() of the
+            table's region (see components/elasticity.py). Its estimate and
+            confidence interval, shown only in the Elasticity Proxy tooltips,
+            are added as "Elasticity", "Elasticity CI Low" and "Elasticity CI
+            High" columns after Elasticity Proxy.
+
+    Returns:
+        pandas.DataFrame: The cleaned table, "Category" first.
+    '''
+    if isinstance(frame, pl.DataFrame):
+        frame = frame.to_pandas()
+    if frame.empty:
+        return pd.DataFrame()
+
+    out = frame.drop(columns=["Category_Display"])
+    label = _strip_tags(frame["Category_Display"])
+    is_total = label.eq("Total")
+    out.insert(0, "Category", label.where(label.ne("") & ~is_total).ffill())
+    out["Sub-Category"] = out["Sub-Category"].where(~is_total, "Total").astype("str")
+
+    out["Rank"] = pd.to_numeric(out["Rank"]).astype("Int64")
+    out["YoY Revenue %"] = pd.to_numeric(out["YoY Revenue %"], errors="coerce")
+    out["Elasticity Proxy"] = pd.to_numeric(
+        _strip_tags(out["Elasticity Proxy"].where(~is_total)), errors="coerce"
+    )
+    trend = out["Revenue Trend (All Years)"].astype("str").str.strip()
+    out["Revenue Trend (All Years)"] = trend.where(trend.ne(""))
+
+    # "Discount Strategy", or the 16 goal/priority columns of a summary_matrix()
+    for col in out.columns.difference(DISPLAY_COLUMNS[:-1] + ["Category"], sort=False):
+        out[col] = _strip_tags(out[col]).where(~is_total)
+
+    if elasticity is not None:
+        estimates = elasticity.reindex(pd.MultiIndex.from_arrays([out["Category"], out["Sub-Category"]]))
+        position = out.columns.get_loc("Elasticity Proxy") + 1
+        for offset, col in enumerate(ESTIMATE_COLUMNS):
+            values = pd.Series(estimates[col].to_numpy(dtype=float), index=out.index)
+            out.insert(position + offset, ESTIMATE_EXPORT_COLUMNS[col], values.where(~is_total))
+    return out
+
+
+class _ChunkSink:
+    # Write-only file object handing out what was written since the last take()
+    # while tell() keeps counting, as the Parquet writer needs absolute offsets
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_export_chunks(frame, fmt="csv", chunk_rows=EXPORT_CHUNK_ROWS):
+    '''
+    Serialize a cleaned export frame chunk by chunk.
+
+    CSV and Parquet are produced incrementally (a block of rows or a row group
+    at a time); XLSX is written row by row by openpyxl's write-only mode to a
+    temporary file and then streamed from it.
+
+    Args:
+        frame (pandas.DataFrame): A clean_export_frame() result.
+        fmt (str): One of EXPORT_FORMATS.
+        chunk_rows (int): Rows per chunk.
+
+    Yields:
+        bytes: Consecutive pieces of the file.
+    '''
+    if fmt == "csv":
+        for start in range(0, max(len(frame), 1), chunk_rows):
+            yield frame.iloc[start:start + chunk_rows].to_csv(index=False, header=start == 0).encode("utf-8")
+
+    elif fmt == "parquet":
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        sink = _ChunkSink()
+        with pq.ParquetWriter(pa.PythonFile(sink, mode="w"), table.schema) as writer:
+            for batch in table.to_batches(max_chunksize=chunk_rows):
+                writer.write_batch(batch)
+                yield sink.take()
+        yield sink.take()
+
+    elif fmt == "xlsx":
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Export")
+        sheet.append(list(frame.columns))
+        for start in range(0, len(frame), chunk_rows):
+            chunk = frame.iloc[start:start + chunk_rows].astype(object)
+            for row in chunk.where(chunk.notna(), None).itertuples(index=False):
+                sheet.append(list(row))
+        with tempfile.TemporaryFile() as f:
+            workbook.save(f)
+            f.seek(0)
+            yield from iter(lambda: f.read(FILE_CHUNK_BYTES), b"")
+
+    else:
+        raise ValueError(f"unknown export format: {fmt!r}")
+
+
+def export_filename(stem, fmt):
+    '''
+    Return the download file name for a format, e.g. "export_All_2017.parquet".
+    '''
+    return stem + EXPORT_FORMATS[fmt][0]
+
+
+def write_bulk_export(views, fmt="csv", directory=None):
+    '''
+    Write many summary tables into one zip file, one entry per view.
+
+    Views are produced and written one after the other, so only one table is
+    held in memory at a time; empty views are skipped.
+
+    Args:
+        views (iterable): (entry name without extension, summary frame, elasticity)
+            triples, e.g. ("2017/West", frame, None); elasticity is passed on to
+            clean_export_frame(). Can be a generator computing each frame lazily.
+        fmt (str): One of EXPORT_FORMATS, used for every entry.
+        directory (str, optional): Where to create the zip (the temp dir by default).
+
+    Returns:
+        str: Path of the zip file; the caller deletes it once delivered.
+    '''
+    fd, path = tempfile.mkstemp(prefix="dashboard-export-", suffix=".zip", dir=directory)
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for name, frame, elasticity in views:
+                clean = clean_export_frame(frame, elasticity)
+                if clean.empty:
+                    continue
+                with archive.open(export_filename(name, fmt), "w") as entry:
+                    for chunk in iter_export_chunks(clean, fmt):
+                        entry.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def iter_file_chunks(path, chunk_bytes=FILE_CHUNK_BYTES, remove=False):
+    '''
+    Stream a file in chunks, optionally deleting it afterwards.
+    '''
+    try:
+        with open(path, "rb") as f:
+            yield from iter(lambda: f.read(chunk_bytes), b"")
+    finally:
+        if remove:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,225 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+logger = logging.getLogger("dashboard.metrics")
+
+METRICS_PATH = "/metrics"
+
+# Upper bounds (seconds) of the histogram buckets, as in the Prometheus client defaults
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Set from the environment at import time, see configure()
+ENABLED = os.environ.get("DASHBOARD_METRICS") == "1"
+SLOW_RENDER_SECONDS = (
+    float(os.environ["DASHBOARD_SLOW_RENDER_MS"]) / 1000 if os.environ.get("DASHBOARD_SLOW_RENDER_MS") else None
+)
+
+_NOOP = nullcontext()
+
+# (stage, seconds) spans of the trace() block currently running, if any
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+# name -> (help, label name, values callable) of the gauges read when /metrics is scraped
+_gauges = {}
+
+
+class Histogram:
+    '''
+    A thread-safe cumulative histogram of durations, one series per stage.
+
+    Args:
+        name (str): Metric name used in the Prometheus output.
+        help (str): Description used in the Prometheus output.
+        buckets (tuple[float]): Bucket upper bounds in seconds; +Inf is implied.
+    '''
+
+    def __init__(self, name, help, buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._series = {}  # stage -> [bucket counts..., count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            series = self._series.get(stage)
+            if series is None:
+                series = self._series[stage] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += seconds
+
+    def snapshot(self):
+        '''
+        Return {stage: {"count": ..., "sum": ..., "buckets": [(bound, cumulative count), ...]}}.
+        '''
+        with self._lock:
+            return {
+                stage: {
+                    "count": series[-2],
+                    "sum": series[-1],
+                    "buckets": list(zip(self.buckets, series[:-2])),
+                }
+                for stage, series in self._series.items()
+            }
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        '''
+        Return the histogram in the Prometheus text exposition format.
+        '''
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for stage, data in sorted(self.snapshot().items()):
+            for bound, count in data["buckets"]:
+                lines.append(f'{self.name}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{stage="{stage}",le="+Inf"}} {data["count"]}')
+            lines.append(f'{self.name}_sum{{stage="{stage}"}} {data["sum"]}')
+            lines.append(f'{self.name}_count{{stage="{stage}"}} {data["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+stage_seconds = Histogram("dashboard_stage_seconds", "Time spent in each stage of loading and rendering the dashboard.")
+
+
+def configure(enabled=None, slow_render_ms=None):
+    '''
+    Turn the instrumentation on or off at runtime (it is read from the environment by default).
+
+    Args:
+        enabled (bool, optional): Record the stage histograms (DASHBOARD_METRICS=1).
+        slow_render_ms (float, optional): Log trace() blocks slower than this, with
+            their parameters and stage timings (DASHBOARD_SLOW_RENDER_MS). 0 or a
+            negative value turns the slow log off.
+    '''
+    global ENABLED, SLOW_RENDER_SECONDS
+    if enabled is not None:
+        ENABLED = enabled
+    if slow_render_ms is not None:
+        SLOW_RENDER_SECONDS = slow_render_ms / 1000 if slow_render_ms > 0 else None
+
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        if ENABLED:
+            stage_seconds.observe(self.stage, seconds)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.append((self.stage, seconds))
+        return False
+
+
+def span(stage):
+    '''
+    Time a block of code as one stage, e.g. `with span("aggregate"): ...`.
+
+    When neither the metrics nor the slow-render log are on, a shared no-op
+    context manager is returned, so an instrumented call costs one function
+    call and two global lookups.
+    '''
+    if not ENABLED and SLOW_RENDER_SECONDS is None:
+        return _NOOP
+    return _Span(stage)
+
+
+@contextmanager
+def trace(stage, **params):
+    '''
+    Time a whole request (e.g. one table render) and log it if it is slow.
+
+    The block is recorded as `stage` like span(); in addition the spans run
+    inside it are collected, and if the block takes longer than
+    SLOW_RENDER_SECONDS a warning is logged with the parameters and the time
+    spent in each stage.
+
+    Args:
+        stage (str): Name of the whole block, e.g. "render".
+        **params: Inputs to report in the slow-render log (year, region, ...).
+    '''
+    if not ENABLED and SLOW_RENDER_SECONDS is None:
+        yield
+        return
+
+    spans = []
+    token = _current_trace.set(spans)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        _current_trace.reset(token)
+        if ENABLED:
+            stage_seconds.observe(stage, seconds)
+        if SLOW_RENDER_SECONDS is not None and seconds > SLOW_RENDER_SECONDS:
+            stages = {}
+            for name, s in spans:
+                stages[name] = stages.get(name, 0) + s
+            logger.warning(
+                "slow %s: %.0fms %s stages=%s",
+                stage, seconds * 1000, params,
+                {name: round(s * 1000, 1) for name, s in stages.items()},
+            )
+
+
+def register_gauge(name, help, label, values):
+    '''
+    Publish a gauge whose values are read each time the metrics are rendered.
+
+    Args:
+        name (str): Metric name, e.g. "dashboard_warmup_views".
+        help (str): Description used in the Prometheus output.
+        label (str): Name of the label telling the series apart, e.g. "state".
+        values (callable): Returns {label value: number}.
+    '''
+    _gauges[name] = (help, label, values)
+
+
+def render_metrics():
+    '''
+    Return every metric in the Prometheus text exposition format.
+    '''
+    parts = [stage_seconds.render()]
+    for name, (help, label, values) in sorted(_gauges.items()):
+        lines = [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+        lines += [f'{name}{{{label}="{key}"}} {value}' for key, value in values().items()]
+        parts.append("\n".join(lines) + "\n")
+    return "".join(parts)
+
+
+async def metrics_endpoint(request):
+    '''
+    Starlette endpoint serving render_metrics().
+    '''
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+def mount_metrics(starlette_app, path=METRICS_PATH):
+    '''
+    Add the metrics route to the Starlette app behind a shiny.App, ahead of its own routes.
+
+    Args:
+        starlette_app (starlette.applications.Starlette): e.g. app.starlette_app.
+        path (str): URL path of the route.
+    '''
+    starlette_app.router.routes.insert(0, Route(path, metrics_endpoint, methods=["GET"]))
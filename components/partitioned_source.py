@@ -0,0 +1,207 @@
+import hashlib
+import os
+from collections import namedtuple
+
+import pandas as pd
+import polars as pl
+import polars.selectors as cs
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from components.cube import add_region_rollup, combine_partials, partial_cube
+
+# Hive-style layout: <root>/Year=2017/Region=West/part-0.parquet
+PARTITION_SCHEMA = pa.schema([("Year", pa.int64()), ("Region", pa.string())])
+PARTITIONING = ds.partitioning(PARTITION_SCHEMA, flavor="hive")
+
+# The raw columns the dashboard reads
+SUMMARY_COLUMNS = [
+    "Order Date", "Year", "Region", "Category", "Sub-Category",
+    "Sales", "Profit", "Discount", "Quantity",
+]
+
+# Merge the partial cubes every this many batches to keep memory bounded
+COMBINE_EVERY = 32
+
+StreamedAggregates = namedtuple("StreamedAggregates", ["cube", "last_order_date", "rows"])
+
+
+def write_partitioned(df, root, format="parquet"):
+    '''
+    Write a dataset as a Year/Region partitioned directory.
+
+    Args:
+        df (pandas.DataFrame): Rows with integer "Year" and string or categorical "Region" columns.
+        root (str): Target directory; existing files of the same partitions are overwritten.
+        format (str): "parquet" or "csv".
+    '''
+    ds.write_dataset(
+        pa.Table.from_pandas(df, preserve_index=False),
+        root,
+        format=format,
+        partitioning=PARTITIONING,
+        existing_data_behavior="delete_matching",
+    )
+
+
+class PartitionedSource:
+    '''
+    A sales history stored as Year/Region partitioned Parquet or CSV files.
+
+    Nothing is loaded up front. Views read only the partitions they filter on,
+    and the aggregates summary() needs are computed in one streaming pass that
+    opens one file at a time, so peak memory depends on the batch and cube
+    sizes rather than on the length of the history.
+
+    Args:
+        root (str): The partitioned directory (see write_partitioned()).
+        format (str): "parquet" or "csv".
+        batch_size (int): Rows aggregated at once in the streaming pass.
+    '''
+
+    def __init__(self, root, format="parquet", batch_size=131_072):
+        self.root = root
+        self.format = format
+        self.batch_size = batch_size
+        # Only the file list and partition keys are kept: a pyarrow Dataset caches
+        # metadata per scanned file, which grows with the length of the history
+        dataset = ds.dataset(root, format=format, partitioning=PARTITIONING)
+        self.partitions = [
+            (fragment.path, ds.get_partition_keys(fragment.partition_expression))
+            for fragment in dataset.get_fragments()
+        ]
+
+    def version(self):
+        '''
+        Return a short identifier of the files in the directory (names, sizes and mtimes).
+        '''
+        digest = hashlib.sha256()
+        for path, _ in sorted(self.partitions):
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return digest.hexdigest()[:16]
+
+    def years(self):
+        '''
+        Return the sorted years present, read from the partition paths only.
+        '''
+        return sorted({keys["Year"] for _, keys in self.partitions})
+
+    def regions(self):
+        '''
+        Return the sorted regions present, read from the partition paths only.
+        '''
+        return sorted({keys["Region"] for _, keys in self.partitions})
+
+    def read_rows(self, years, region="All", columns=SUMMARY_COLUMNS):
+        '''
+        Read the rows of some years (and one region), touching only those partitions.
+
+        Args:
+            years (list[int]): Years to read, e.g. the selected year and the year before.
+            region (str): A region name, or "All" for every region.
+            columns (list[str]): Columns to read.
+
+        Returns:
+            pandas.DataFrame: The matching rows.
+        '''
+        paths = [
+            path for path, keys in self.partitions
+            if keys["Year"] in years and region in ("All", keys["Region"])
+        ]
+        if not paths:
+            return pd.DataFrame(columns=columns)
+        dataset = ds.dataset(
+            paths, format=self.format, partitioning=PARTITIONING, partition_base_dir=self.root
+        )
+        return dataset.to_table(columns=columns).to_pandas()
+
+    def scan_polars(self, columns=SUMMARY_COLUMNS):
+        '''
+        Return the rows as a polars LazyFrame, for the polars summary engine.
+
+        Nothing is read here. The engine's year/region filters are pushed down
+        to pyarrow as partition filters, so each query opens only the files of
+        the years and region it needs.
+
+        Args:
+            columns (list[str]): Columns to expose, partition keys included.
+
+        Returns:
+            polars.LazyFrame: The rows of every partition.
+        '''
+        dataset = ds.dataset(
+            [path for path, _ in self.partitions], format=self.format,
+            partitioning=PARTITIONING, partition_base_dir=self.root,
+        )
+        # Same dtypes as table_logic_polars.rows_frame(): files written from loaded rows
+        # hold categoricals (see components.data_loader.SCHEMA)
+        return pl.scan_pyarrow_dataset(dataset).select(columns).with_columns(
+            cs.categorical().cast(pl.String), cs.float().cast(pl.Float64)
+        )
+
+    def _file_batches(self, path, columns):
+        if self.format == "csv":
+            options = pa_csv.ConvertOptions(include_columns=columns)
+            with pa_csv.open_csv(path, convert_options=options) as reader:
+                yield from reader
+        else:
+            with pq.ParquetFile(path) as parquet_file:
+                yield from parquet_file.iter_batches(
+                    batch_size=self.batch_size, columns=columns, use_threads=False
+                )
+
+    def stream_aggregates(self):
+        '''
+        Build the Region x Year x Category x Sub-Category cube in one streaming pass.
+
+        Files are read one after the other; small batches are gathered up to
+        batch_size rows, aggregated on their own, and the partial cubes are
+        merged regularly. build_trends() can be applied to the result as usual.
+
+        Returns:
+            StreamedAggregates: (cube, last_order_date, rows).
+        '''
+        file_columns = [c for c in SUMMARY_COLUMNS if c not in PARTITION_SCHEMA.names]
+        partials = []
+        pending = []  # (partition keys, batch) waiting to be aggregated together
+        pending_rows = 0
+        last_order_date = None
+        rows = 0
+
+        def flush():
+            nonlocal last_order_date
+            chunks = []
+            for keys, batch in pending:
+                chunk = batch.to_pandas()
+                chunk["Year"] = keys["Year"]
+                chunk["Region"] = keys["Region"]
+                chunks.append(chunk)
+            chunk = pd.concat(chunks, ignore_index=True)
+            partials.append(partial_cube(chunk))
+            chunk_max = chunk["Order Date"].max()
+            if last_order_date is None or chunk_max > last_order_date:
+                last_order_date = chunk_max
+            pending.clear()
+            if len(partials) >= COMBINE_EVERY:
+                partials[:] = [combine_partials(partials)]
+
+        for path, keys in self.partitions:
+            for batch in self._file_batches(path, file_columns):
+                if batch.num_rows == 0:
+                    continue
+                pending.append((keys, batch))
+                pending_rows += batch.num_rows
+                rows += batch.num_rows
+                if pending_rows >= self.batch_size:
+                    flush()
+                    pending_rows = 0
+        if pending_rows:
+            flush()
+
+        if not partials:
+            raise ValueError(f"no rows found in {self.root}")
+        cube = add_region_rollup(combine_partials(partials))
+        return StreamedAggregates(cube, pd.Timestamp(last_order_date), rows)
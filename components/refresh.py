@@ -0,0 +1,235 @@
+import logging
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from components.cube import CUBE_KEYS, add_rows, update_cube, update_trends
+from components.data_loader import CACHE_DIR, DATA_PATH, apply_schema, dataset_version, derive_columns, read_workbook, write_cache
+
+logger = logging.getLogger("dashboard.refresh")
+
+# Identifies an order line across versions of the source
+ROW_KEY = "Row ID"
+
+# Seconds between two checks of the source file
+DEFAULT_INTERVAL = 30.0
+
+DatasetState = namedtuple("DatasetState", ["version", "df", "cube", "trends", "last_order_date"])
+RowChanges = namedtuple("RowChanges", ["appended", "corrected", "removed"])
+
+
+def _comparable(a, b):
+    # Categoricals only compare with the same categories; a re-read brings its own
+    # (e.g. a new sub-category), so both get the union of them
+    if isinstance(a.dtype, pd.CategoricalDtype) and isinstance(b.dtype, pd.CategoricalDtype) and a.dtype != b.dtype:
+        categories = a.categories.union(b.categories)
+        a, b = a.set_categories(categories), b.set_categories(categories)
+    return a, b
+
+
+def _changed(before, after, columns):
+    # Positions whose value differs in any column (two missing values are equal)
+    changed = np.zeros(len(before), dtype=bool)
+    for col in columns:
+        a, b = _comparable(before[col].array, after[col].array)
+        changed |= np.asarray(a != b, dtype=bool) & ~(pd.isna(a) & pd.isna(b))
+    return changed
+
+
+def diff_rows(old, new, key=ROW_KEY):
+    '''
+    Compare two versions of the raw rows, matched on key.
+
+    When the rows of `old` are still the first rows of `new` (orders were
+    only appended, or edited in place) they are compared position by
+    position; otherwise rows are matched through a hash lookup of the keys.
+
+    Args:
+        old (pandas.DataFrame): The rows currently loaded.
+        new (pandas.DataFrame): The rows read from the source again; only the columns
+            of both frames are compared.
+        key (str): Column identifying a row, unique in both frames.
+
+    Returns:
+        RowChanges: Three frames:
+            - "appended": rows of `new` whose key is not in `old`
+            - "corrected": rows of `new` whose key is in `old` with other values
+            - "removed": rows of `old` whose key is not in `new`
+    '''
+    old_keys = pd.Index(old[key])
+    new_keys = pd.Index(new[key])
+    columns = [c for c in new.columns if c in old.columns and c != key]
+
+    n = len(old)
+    if old_keys.equals(new_keys[:n]):
+        before, after = old, new.iloc[:n]
+        appended, removed = new.iloc[n:], old.iloc[:0]
+    else:
+        positions = old_keys.get_indexer(new_keys)
+        matched = positions >= 0
+        before, after = old.take(positions[matched]), new[matched]
+        appended, removed = new[~matched], old[~old_keys.isin(new_keys)]
+
+    return RowChanges(appended, after[_changed(before, after, columns)], removed)
+
+
+def add_years(rows, years, key=ROW_KEY):
+    '''
+    Give rows of the source the "Year" of their key in years.
+
+    The years are looked up, not derived from the order dates again.
+
+    Args:
+        rows (pandas.DataFrame): Source rows without "Year" (see read_workbook()).
+        years (pandas.DataFrame): key and "Year" columns covering every key of rows.
+        key (str): Column identifying a row (see diff_rows()).
+
+    Returns:
+        pandas.DataFrame: The rows, in their order, and their "Year".
+    '''
+    year = pd.Series(years["Year"].to_numpy(), index=years[key])
+    return apply_schema(rows.assign(Year=year.reindex(rows[key]).to_numpy()))
+
+
+def apply_update(state, new, version, key=ROW_KEY):
+    '''
+    Bring a loaded dataset up to date with a new read of its source.
+
+    Only the changed rows are processed: the "Year" column is derived for
+    the appended and corrected rows (the others keep theirs), appended
+    orders are added to the cube cells they fall in, and the (year, region,
+    sub-category) cells that corrected or removed rows leave or enter are
+    aggregated again from their rows (see add_rows() and update_cube()).
+    Trends are recomputed for the sub-categories touched. The new rows keep
+    only the columns of the loaded ones, which must include key.
+
+    Args:
+        state (DatasetState): The dataset currently loaded.
+        new (pandas.DataFrame): The source rows as read_workbook() returns them,
+            without derived columns.
+        version (str): Identifier of the new source contents.
+        key (str): Column identifying a row (see diff_rows()).
+
+    Returns:
+        tuple[DatasetState, RowChanges]: The new state and what changed.
+    '''
+    changes = diff_rows(state.df, new, key)
+    if not (len(changes.appended) or len(changes.corrected) or len(changes.removed)):
+        return state._replace(version=version), changes
+
+    appended = derive_columns(changes.appended.copy())
+    corrected = derive_columns(changes.corrected.copy())
+    previous = state.df[state.df[key].isin(corrected[key]) | state.df[key].isin(changes.removed[key])]
+    derived = pd.concat([appended, corrected])[[key, "Year"]]
+    years = pd.concat([state.df.loc[~state.df[key].isin(derived[key]), [key, "Year"]], derived])
+    df = add_years(new[[c for c in state.df.columns if c != "Year"]], years, key)[state.df.columns]
+
+    # Cells of corrected or removed rows are recomputed, together with the appended
+    # rows sharing their "All" rollup (which is recomputed from all of its rows)
+    cells = pd.MultiIndex.from_frame(pd.concat([previous, corrected])[CUBE_KEYS]).unique()
+    in_rollups = pd.MultiIndex.from_frame(appended[CUBE_KEYS[1:]]).isin(cells.droplevel("Region"))
+    cells = cells.append(pd.MultiIndex.from_frame(appended.loc[in_rollups, CUBE_KEYS])).unique()
+
+    cube = state.cube
+    if len(cells):
+        cube = update_cube(cube, df, cells)
+    if not in_rollups.all():
+        cube = add_rows(cube, appended[~in_rollups])
+
+    touched = pd.concat([previous, corrected, appended])
+    subcategories = pd.MultiIndex.from_frame(touched[CUBE_KEYS[2:]]).unique()
+    trends = update_trends(state.trends, cube, subcategories)
+    return DatasetState(version, df, cube, trends, df["Order Date"].max()), changes
+
+
+class DatasetRefresher:
+    '''
+    Keeps a loaded dataset in step with its source workbook, without a restart.
+
+    A background thread compares the size and mtime of the workbook every
+    `interval` seconds. When they moved, the workbook is read again and
+    applied with apply_update(), and the Arrow cache is rewritten for the
+    next start. The new state replaces the previous one in a single
+    assignment, so readers of `state` always see one consistent version;
+    sessions watch `state.version` to re-render.
+
+    Args:
+        state (DatasetState): The dataset as loaded at start.
+        path (str): Path to the source workbook.
+        interval (float): Seconds between two checks.
+        cache_dir (str): Directory holding the Arrow cache (see load_dataset()).
+    '''
+
+    def __init__(self, state, path=DATA_PATH, interval=DEFAULT_INTERVAL, cache_dir=CACHE_DIR):
+        self.state = state
+        self.path = path
+        self.interval = interval
+        self.cache_dir = cache_dir
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, listener):
+        '''
+        Call listener(state) after every update, from the thread that applied it.
+        '''
+        self._listeners.append(listener)
+
+    def check(self):
+        '''
+        Apply the changes of the source file, if it was modified since the last check.
+
+        Returns:
+            bool: Whether a new version was applied.
+        '''
+        with self._lock:
+            version = dataset_version(self.path)
+            if version == self.state.version:
+                return False
+            rows = read_workbook(self.path)
+            state, changes = apply_update(self.state, rows, version)
+            self.state = state
+            # Every column, for the next start and the columns loaded on demand.
+            # Skipped if the file moved again meanwhile, the next check picks that up
+            if dataset_version(self.path) == version:
+                try:
+                    write_cache(add_years(rows, state.df[[ROW_KEY, "Year"]]), self.path, self.cache_dir)
+                except OSError:
+                    pass
+
+        logger.info(
+            "%s refreshed: %d appended, %d corrected, %d removed rows",
+            self.path, len(changes.appended), len(changes.corrected), len(changes.removed),
+        )
+        for listener in self._listeners:
+            listener(state)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                # e.g. a workbook caught while being written: retried at the next check
+                logger.exception("refreshing %s failed", self.path)
+
+    def start(self):
+        '''
+        Start checking the source in a daemon thread.
+        '''
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="dataset-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        '''
+        Stop the background checks.
+        '''
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
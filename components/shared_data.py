@@ -0,0 +1,292 @@
+import atexit
+import hashlib
+import logging
+import os
+import shutil
+from collections import namedtuple
+from pathlib import Path
+
+import pyarrow as pa
+
+from components.cube import build_cube, build_trends
+from components.data_loader import CACHE_DIR, CACHE_VERSION, DATA_PATH, dataset_version, load_dataset
+from components.refresh import DEFAULT_INTERVAL, DatasetRefresher, DatasetState
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, every worker may build its own copy
+    fcntl = None
+
+# tmpfs when available so the segments live in shared memory, not on disk; each
+# deployment gets its own directory under it (see deployment_dir())
+SHARED_ROOT = os.environ.get(
+    "DASHBOARD_SHARED_DIR",
+    "/dev/shm/discount-dashboard" if os.path.isdir("/dev/shm") else "dataset/.cache/shared",
+)
+CURRENT_FILE = "CURRENT"
+# Every process using a deployment's segments holds a shared lock on this file
+USERS_FILE = ".users"
+
+# The arrays in a shared segment: name -> whether the pandas index is stored too
+SEGMENT_TABLES = {"df": False, "cube": True, "trends": True}
+
+SharedDataset = namedtuple("SharedDataset", ["version", "df", "cube", "trends"])
+
+logger = logging.getLogger("dashboard.shared_data")
+
+# shared_dir -> the open USERS_FILE this process holds its lock through
+_users = {}
+
+
+def _write_table(frame, file, preserve_index):
+    table = pa.Table.from_pandas(frame, preserve_index=preserve_index)
+    with pa.OSFile(str(file), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _map_table(file):
+    # split_blocks keeps every column in its own block so pandas can wrap the
+    # mapped Arrow buffers instead of copying them into consolidated 2D blocks
+    with pa.memory_map(str(file), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def deployment_dir(path=DATA_PATH, root=SHARED_ROOT):
+    '''
+    Return the segment directory of the deployment serving a source file.
+
+    Workers of one deployment read the same workbook and share one directory,
+    root/<hash of the workbook's absolute path>. Other deployments on the host
+    (another checkout or another workbook) get their own directory, with their
+    own CURRENT pointer and segments, so publishing and pruning never touch them.
+    '''
+    digest = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:16]
+    return str(Path(root) / digest)
+
+
+def current_version(shared_dir):
+    '''
+    Return the version currently published in shared_dir, or None.
+    '''
+    try:
+        return (Path(shared_dir) / CURRENT_FILE).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish(df, version, shared_dir, keep=2):
+    '''
+    Write a dataset and its aggregates to a versioned shared segment.
+
+    The dataset, its cube and its trends are written as uncompressed Arrow IPC
+    files to shared_dir/<version>/, then the CURRENT pointer is switched
+    atomically. Only the newest `keep` versions in shared_dir are kept (other
+    deployments have their own directory, see deployment_dir()); removing an
+    older one is safe even while a worker still maps it (the pages stay valid
+    until that worker lets go of them).
+
+    Args:
+        df (pandas.DataFrame): The loaded dataset (see load_dataset()).
+        version (str): Identifier of the dataset contents (see dataset_version()).
+        shared_dir (str): Directory holding the segments, ideally on tmpfs (see deployment_dir()).
+        keep (int): Number of versions to keep.
+
+    Returns:
+        pathlib.Path: The directory of the published segment.
+    '''
+    root = Path(shared_dir)
+    segment = root / version
+    tmp_segment = root / f".{version}.{os.getpid()}.tmp"
+    tmp_segment.mkdir(parents=True, exist_ok=True)
+
+    cube = build_cube(df)
+    frames = {"df": df, "cube": cube, "trends": build_trends(cube)}
+    for name, preserve_index in SEGMENT_TABLES.items():
+        _write_table(frames[name], tmp_segment / f"{name}.arrow", preserve_index)
+
+    if segment.exists():
+        shutil.rmtree(tmp_segment)
+    else:
+        os.replace(tmp_segment, segment)
+
+    pointer = root / f".{CURRENT_FILE}.{os.getpid()}.tmp"
+    pointer.write_text(version)
+    os.replace(pointer, root / CURRENT_FILE)
+
+    versions = sorted(
+        (p for p in root.iterdir() if p.is_dir() and not p.name.startswith(".")),
+        key=lambda p: p.stat().st_mtime,
+    )
+    for old in versions[:-keep]:
+        if old.name != version:
+            shutil.rmtree(old, ignore_errors=True)
+    return segment
+
+
+def attach(shared_dir, version=None):
+    '''
+    Memory-map a published segment read-only.
+
+    Numeric and date columns (and, with pandas >= 3, string columns) wrap the
+    mapped buffers without copying, so every worker attached to the same
+    segment shares one copy of the data in the page cache.
+
+    Args:
+        shared_dir (str): Directory holding the segments.
+        version (str, optional): Segment to attach; the CURRENT one by default.
+
+    Returns:
+        SharedDataset: (version, df, cube, trends).
+    '''
+    version = version or current_version(shared_dir)
+    if version is None:
+        raise FileNotFoundError(f"no dataset published in {shared_dir}")
+
+    segment = Path(shared_dir) / version
+    frames = {name: _map_table(segment / f"{name}.arrow") for name in SEGMENT_TABLES}
+    return SharedDataset(version, frames["df"], frames["cube"], frames["trends"])
+
+
+def shared_version(path=DATA_PATH):
+    '''
+    Return the version of the segment holding the current contents of a source file.
+    '''
+    # The layout version too, so a segment published by an older release is not attached
+    return f"{dataset_version(path)}.{CACHE_VERSION}"
+
+
+def _hold(shared_dir):
+    # Take a shared lock on the users file for the rest of this process; retried when
+    # the last user removed the directory between our open() and flock()
+    if fcntl is None or shared_dir in _users:
+        return
+    while True:
+        Path(shared_dir).mkdir(parents=True, exist_ok=True)
+        users = open(Path(shared_dir) / USERS_FILE, "a")
+        fcntl.flock(users, fcntl.LOCK_SH)
+        try:
+            if os.stat(users.name).st_ino == os.fstat(users.fileno()).st_ino:
+                break
+        except FileNotFoundError:
+            pass
+        users.close()
+    if not _users:
+        atexit.register(release_all)
+    _users[shared_dir] = users
+
+
+def release(shared_dir):
+    '''
+    Stop using the segments of shared_dir; the last process to do so removes them.
+
+    Called for every directory this process attached to when it exits
+    (see release_all()). Workers that still map a removed segment keep
+    their pages until they let go of them.
+
+    Args:
+        shared_dir (str): Directory holding the segments.
+
+    Returns:
+        bool: Whether the directory was removed.
+    '''
+    users = _users.pop(shared_dir, None)
+    if users is None:
+        return False
+    try:
+        # Granted only once no other process holds its shared lock
+        fcntl.flock(users, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        users.close()
+        return False
+    shutil.rmtree(shared_dir, ignore_errors=True)
+    users.close()
+    logger.info("removed the shared segments in %s", shared_dir)
+    return True
+
+
+def release_all():
+    '''
+    release() every directory this process attached to (registered with atexit).
+    '''
+    for shared_dir in list(_users):
+        release(shared_dir)
+
+
+def load_shared(path=DATA_PATH, shared_dir=None, cache_dir=CACHE_DIR):
+    '''
+    Attach to the shared segment of the current source file, building it if needed.
+
+    The first worker to start takes a lock, loads the dataset (through the
+    Arrow cache of load_dataset()) and publishes it; the others wait on the
+    lock and then attach to what it published. Every worker holds the
+    directory until it exits, and the last one to exit removes it (see
+    release()).
+
+    Args:
+        path (str): Path to the source workbook.
+        shared_dir (str, optional): Directory holding the segments; deployment_dir(path) by default.
+        cache_dir (str): Directory holding the Arrow cache (see load_dataset()).
+
+    Returns:
+        SharedDataset: (version, df, cube, trends).
+    '''
+    shared_dir = str(shared_dir or deployment_dir(path))
+    _hold(shared_dir)
+    version = shared_version(path)
+    if current_version(shared_dir) == version:
+        return attach(shared_dir, version)
+
+    Path(shared_dir).mkdir(parents=True, exist_ok=True)
+    with open(Path(shared_dir) / ".lock", "w") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            if current_version(shared_dir) != version:
+                publish(load_dataset(path, cache_dir), version, shared_dir)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+    return attach(shared_dir, version)
+
+
+class SharedDatasetRefresher(DatasetRefresher):
+    '''
+    DatasetRefresher for workers attached to a shared segment (see load_shared()).
+
+    Applying the changes in every worker would leave each one with a private
+    copy of the rows and aggregates. Instead, the first worker to see the
+    workbook change loads and publishes the new version, under the lock of
+    load_shared(), and every worker (that one included) attaches to it.
+
+    Args:
+        state (DatasetState): The dataset as attached at start.
+        path (str): Path to the source workbook.
+        interval (float): Seconds between two checks.
+        cache_dir (str): Directory holding the Arrow cache (see load_dataset()).
+        shared_dir (str, optional): Directory holding the segments; deployment_dir(path) by default.
+    '''
+
+    def __init__(self, state, path=DATA_PATH, interval=DEFAULT_INTERVAL, cache_dir=CACHE_DIR, shared_dir=None):
+        super().__init__(state, path, interval, cache_dir)
+        self.shared_dir = shared_dir
+
+    def check(self):
+        '''
+        Attach to the segment of the source file, if it was modified since the last check.
+
+        Returns:
+            bool: Whether a new version was attached.
+        '''
+        with self._lock:
+            if shared_version(self.path) == self.state.version:
+                return False
+            data = load_shared(self.path, self.shared_dir, self.cache_dir)
+            state = DatasetState(data.version, data.df, data.cube, data.trends, data.df["Order Date"].max())
+            self.state = state
+
+        logger.info("%s refreshed: attached shared segment %s", self.path, data.version)
+        for listener in self._listeners:
+            listener(state)
+        return True
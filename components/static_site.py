@@ -0,0 +1,187 @@
+'''
+Static build of the dashboard for hosts without a Python process (object storage, CDN, GitHub Pages).
+
+Every year x region view of the Year/Region filters is computed at build
+time, spread over worker processes like the sweeps (see components/sweep.py):
+
+    python -m components.static_site --output site --workers 4
+
+The site holds, per view (views/<year>/<region>/):
+  - table.html: the table for the default goal/priority
+  - strategies.json: the "Discount Strategy" cells of all 16 goal/priority
+    pairs (see strategy_cells()); the page patches them into the table, as
+    the Shiny app does on a goal/priority change
+  - one CSV per goal/priority pair, and all-strategies.csv with the 16
+    strategies side by side (see clean_export_frame())
+and index.html, whose sidebar swaps these fragments in the browser. Serve the
+directory with any static file server, e.g. python -m http.server -d site.
+'''
+import argparse
+import json
+import os
+import re
+import shutil
+import string
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from components.assets import CATEGORY_ICONS, ICON_URL_PREFIX, icon_url
+from components.cube import build_cube, build_trends
+from components.data_loader import DATA_PATH, load_dataset
+from components.Discount_logic import COMPANY_GOALS, CUSTOMER_PRIORITIES
+from components.elasticity import build_elasticity, region_estimates
+from components.export import clean_export_frame, iter_export_chunks
+from components.table_logic import DEFAULT_GOAL, DEFAULT_PRIORITY, strategy_view, summary_matrix, view_options
+from components.table_visual import render_table_html, strategy_cells
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+# Page and client script of the site: index.html is a string.Template filled with
+# the manifest of the views; site.js fetches the precomputed fragments of build_site()
+# and patches the strategy column like updateStrategyColumn in navbar-filter.lua
+SITE_DIR = APP_DIR / "static_site"
+
+# Theme and icon font of the rendered dashboard, copied next to index.html
+THEME_FILES = [
+    "Dashboard_files/libs/bootstrap/bootstrap-7bdf1c8e8f98638fa310f44532f0922b.min.css",
+    "Dashboard_files/libs/bootstrap/bootstrap-icons.css",
+    "Dashboard_files/libs/bootstrap/bootstrap-icons.woff",
+    "styles.css",
+    "logo3.png",
+]
+
+EMPTY_VIEW_HTML = (
+    '<div style="text-align: center; padding: 20px; font-size: 16px;">'
+    "No data available for the selected filters.</div>"
+)
+
+
+def pair_slug(goal, priority):
+    '''
+    Return the file name stem of a goal/priority pair, e.g. "revenue-growth_new-customers".
+    '''
+    return "_".join(re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") for text in (goal, priority))
+
+
+def relative_icons(html):
+    # The icons are copied under icons/ next to index.html: no leading slash, so the
+    # site also works from a sub-path of its host
+    return html.replace(f"'{ICON_URL_PREFIX}/", f"'{ICON_URL_PREFIX.lstrip('/')}/")
+
+
+def _write_csv(path, frame, estimates):
+    with open(path, "wb") as f:
+        for chunk in iter_export_chunks(clean_export_frame(frame, estimates), "csv"):
+            f.write(chunk)
+
+
+# Set in each worker process by _init_worker(), so the dataset is sent once per worker
+_worker_data = None
+
+
+def _init_worker(data):
+    global _worker_data
+    _worker_data = data
+
+
+def _build_view(output, year, region):
+    # Table, strategy cells and CSVs of one year/region; returns the bytes written
+    df, cube, trends, elasticity = _worker_data
+    matrix = summary_matrix(df, None, year, region, cube=cube, trends=trends, elasticity=elasticity)
+    folder = Path(output, "views", str(year), region)
+    folder.mkdir(parents=True, exist_ok=True)
+
+    if len(matrix) == 0:
+        (folder / "table.html").write_text(EMPTY_VIEW_HTML, encoding="utf-8")
+        (folder / "strategies.json").write_text("{}", encoding="utf-8")
+    else:
+        table = render_table_html(strategy_view(matrix, DEFAULT_GOAL, DEFAULT_PRIORITY), year, region)
+        (folder / "table.html").write_text(relative_icons(table), encoding="utf-8")
+        estimates = region_estimates(elasticity, region)
+        cells = {}
+        for goal in COMPANY_GOALS:
+            for priority in CUSTOMER_PRIORITIES:
+                df_sum = strategy_view(matrix, goal, priority)
+                cells[pair_slug(goal, priority)] = strategy_cells(df_sum)
+                _write_csv(folder / f"{pair_slug(goal, priority)}.csv", df_sum, estimates)
+        (folder / "strategies.json").write_text(json.dumps(cells), encoding="utf-8")
+        _write_csv(folder / "all-strategies.csv", matrix, estimates)
+    return sum(f.stat().st_size for f in folder.iterdir())
+
+
+def _copy_assets(output):
+    shutil.copy2(SITE_DIR / "site.js", Path(output, "site.js"))
+    for name in THEME_FILES:
+        shutil.copy2(APP_DIR / name, Path(output, Path(name).name))
+    for category, (path, _) in CATEGORY_ICONS.items():
+        target = Path(output, icon_url(category).lstrip("/"))
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(APP_DIR / path, target)
+
+
+def build_site(output, path=DATA_PATH, workers=None):
+    '''
+    Write the static site of every year x region view to a directory.
+
+    Args:
+        output (str | pathlib.Path): Target directory (created; existing view
+            files are overwritten).
+        path (str): Source workbook.
+        workers (int, optional): Worker processes; all cores by default, 1 builds
+            in this process.
+
+    Returns:
+        dict: "views" (number of year/region views) and "bytes" (size of their files).
+    '''
+    df = load_dataset(path)
+    cube = build_cube(df)
+    data = (df, cube, build_trends(cube), build_elasticity(df))
+    regions, years = view_options(cube)
+    views = [(year, region) for year in years for region in regions]
+
+    Path(output).mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(data)
+        sizes = [_build_view(output, year, region) for year, region in views]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(data,)) as pool:
+            sizes = list(pool.map(_build_view, [output] * len(views), *zip(*views)))
+
+    _copy_assets(output)
+    manifest = {
+        "regions": regions,
+        "years": years,
+        "goals": COMPANY_GOALS,
+        "priorities": CUSTOMER_PRIORITIES,
+        "pairs": {goal: {p: pair_slug(goal, p) for p in CUSTOMER_PRIORITIES} for goal in COMPANY_GOALS},
+        "default": {"year": years[-1], "region": regions[0], "goal": DEFAULT_GOAL, "priority": DEFAULT_PRIORITY},
+        "defaultPair": pair_slug(DEFAULT_GOAL, DEFAULT_PRIORITY),
+    }
+    page = string.Template((SITE_DIR / "index.html").read_text(encoding="utf-8"))
+    Path(output, "index.html").write_text(page.substitute(
+        manifest=json.dumps(manifest),
+        last_updated=df["Order Date"].max().strftime("%b %d, %Y"),
+    ), encoding="utf-8")
+    return {"views": len(views), "bytes": sum(sizes)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="site", help="directory to write the site to")
+    parser.add_argument("--path", default=DATA_PATH, help="source workbook")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (all cores by default)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = build_site(args.output, args.path, workers=args.workers)
+    seconds = time.perf_counter() - start
+    print(
+        f"{result['views']} views x {len(COMPANY_GOALS) * len(CUSTOMER_PRIORITIES)} goal/priority pairs "
+        f"written to {args.output} in {seconds:.1f}s ({result['bytes'] / 2**20:.1f}MB)"
+    )
+
+
+if __name__ == "__main__":
+    main()
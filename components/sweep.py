@@ -0,0 +1,257 @@
+'''
+Headless discount-policy sensitivity sweeps.
+
+Evaluates the recommendation of every (region, year, sub-category) cell for
+all 16 goal x priority pairs under a grid of policy/context values, and
+keeps the decisions that differ from the current discount_policy and
+market_context. Policies are scored in blocks of arrays (see
+strategy_score_matrix()) and the blocks are spread over worker processes.
+
+    python -m components.sweep --set high_revenue=50000:90000:5000 \\
+        --set low_profit=2000,4000,6000 --set inflation_rate=0.03:0.09:0.01 \\
+        --output flips.parquet
+
+Grids can also be given as a JSON file of {parameter: [values, ...]}
+(--grid grid.json). The output has one row per flipped decision with the
+policy's parameter values, the cell, the goal/priority pair and the baseline
+and swept decisions; a summary per parameter value is printed.
+'''
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from components.cube import build_cube, discount_mean
+from components.data_loader import DATA_PATH, load_dataset
+from components.Discount_logic import (
+    COMPANY_GOALS, CUSTOMER_PRIORITIES, discount_policy, market_context,
+    strategy_decisions, strategy_score_matrix,
+)
+
+# Every parameter a grid can vary, with its current value
+PARAMETERS = {**discount_policy, **market_context}
+
+DECISIONS = {-1: "reduce", 0: "maintain", 1: "increase"}
+
+# Policies scored at once by a worker
+CHUNK_POLICIES = 256
+
+CELL_KEYS = ["Region", "Year", "Category", "Sub-Category"]
+
+
+def policy_grid(values):
+    '''
+    Expand parameter values into the cartesian product of policies.
+
+    Args:
+        values (dict): {parameter: list of values}; parameters left out keep their
+            current value (see PARAMETERS).
+
+    Returns:
+        pandas.DataFrame: One row per policy, one column per parameter of PARAMETERS.
+    '''
+    unknown = set(values) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"unknown parameters: {', '.join(sorted(unknown))}")
+    axes = {name: values.get(name, [default]) for name, default in PARAMETERS.items()}
+    return pd.DataFrame(list(itertools.product(*axes.values())), columns=list(axes), dtype=float)
+
+
+def score_inputs(cube):
+    '''
+    Return the inputs of the strategy score for every cell of a cube.
+
+    Same values as summary_matrix() computes for a year/region view: revenue,
+    profit, mean discount, and YoY revenue growth against the previous year
+    of the same region and sub-category (rounded to 3 decimals, missing when
+    there is no previous revenue).
+
+    Args:
+        cube (pandas.DataFrame): A cube as returned by build_cube().
+
+    Returns:
+        pandas.DataFrame: Indexed by (Region, Year, Category, Sub-Category) with
+        "Revenue", "Profit", "YoY Revenue %" and "Discount" columns.
+    '''
+    cells = cube.reset_index()
+    prev = cells[CELL_KEYS + ["Sales"]].rename(columns={"Sales": "Revenue_prev"})
+    prev["Year"] = prev["Year"] + 1
+    cells = cells.merge(prev, on=CELL_KEYS, how="left")
+
+    yoy = ((cells["Sales"] - cells["Revenue_prev"]) / cells["Revenue_prev"]).round(3)
+    return pd.DataFrame({
+        "Revenue": cells["Sales"],
+        "Profit": cells["Profit"],
+        "YoY Revenue %": yoy.where(cells["Revenue_prev"] > 0),
+        "Discount": discount_mean(cells),
+    }).set_index(pd.MultiIndex.from_frame(cells[CELL_KEYS]))
+
+
+def evaluate(inputs, grid):
+    '''
+    Compute the decision of every cell and goal/priority pair under every policy.
+
+    Args:
+        inputs (pandas.DataFrame): A score_inputs() result.
+        grid (pandas.DataFrame): A policy_grid() result (or any subset of its rows).
+
+    Returns:
+        numpy.ndarray: int8 decision codes (see strategy_decisions()) of shape
+        (policies, 16 pairs, cells), pairs in COMPANY_GOALS x CUSTOMER_PRIORITIES order.
+    '''
+    params = {name: grid[name].to_numpy()[:, None] for name in PARAMETERS}
+    policy = {name: params[name] for name in discount_policy}
+    context = {name: params[name] for name in market_context}
+    scores = strategy_score_matrix(inputs, policy, context)
+    shape = (len(grid), len(inputs))
+    return np.stack([strategy_decisions(np.broadcast_to(s, shape)) for s in scores.values()], axis=1)
+
+
+# Set in each worker process by _init_worker(), so the inputs are sent once per worker
+_worker_inputs = None
+_worker_baseline = None
+
+
+def _init_worker(inputs, baseline):
+    global _worker_inputs, _worker_baseline
+    _worker_inputs, _worker_baseline = inputs, baseline
+
+
+def _chunk_flips(grid, offset):
+    # Positions (policy, pair, cell) whose decision differs from the baseline
+    decisions = evaluate(_worker_inputs, grid)
+    policy, pair, cell = np.nonzero(decisions != _worker_baseline)
+    return (policy + offset).astype(np.int32), pair.astype(np.int8), cell.astype(np.int32), decisions[policy, pair, cell]
+
+
+def sweep(inputs, grid, workers=None, chunk_size=CHUNK_POLICIES):
+    '''
+    Evaluate a policy grid and return the decisions that flip.
+
+    Args:
+        inputs (pandas.DataFrame): A score_inputs() result.
+        grid (pandas.DataFrame): A policy_grid() result.
+        workers (int, optional): Worker processes; all cores by default, 1 runs in
+            this process.
+        chunk_size (int): Policies scored at once by a worker.
+
+    Returns:
+        pandas.DataFrame: One row per (policy, cell, goal, priority) whose decision
+        differs from the current policy, with the policy's parameter values,
+        "Region", "Year", "Category", "Sub-Category", "Goal", "Priority",
+        "Baseline" and "Decision" columns. Policies without any flip do not appear.
+    '''
+    current = pd.DataFrame([PARAMETERS], dtype=float)
+    baseline = evaluate(inputs, current)[0]
+    chunks = [(grid.iloc[start:start + chunk_size], start) for start in range(0, len(grid), chunk_size)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) == 1:
+        _init_worker(inputs, baseline)
+        results = [_chunk_flips(*chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(inputs, baseline)) as pool:
+            results = list(pool.map(_chunk_flips, *zip(*chunks)))
+
+    policy, pair, cell, decision = (
+        np.concatenate([r[i] for r in results]) if results else np.empty(0, dtype=np.int32) for i in range(4)
+    )
+    pairs = pd.MultiIndex.from_product([COMPANY_GOALS, CUSTOMER_PRIORITIES], names=["Goal", "Priority"])
+    labels = list(DECISIONS.values())
+
+    flips = grid.iloc[policy].reset_index(names="Policy")
+    flips = pd.concat([
+        flips,
+        inputs.index[cell].to_frame(index=False),
+        pairs[pair].to_frame(index=False),
+    ], axis=1)
+    flips["Baseline"] = pd.Categorical.from_codes(baseline[pair, cell] + 1, labels)
+    flips["Decision"] = pd.Categorical.from_codes(decision + 1, labels)
+    return flips
+
+
+def flip_summary(flips, grid):
+    '''
+    Count the flipped decisions per parameter value, for the parameters the grid varies.
+
+    Returns:
+        pandas.DataFrame: "Parameter", "Value", "Policies", "Flips" and "Flips per policy" columns.
+    '''
+    rows = []
+    for name in PARAMETERS:
+        values = grid[name].unique()
+        if len(values) < 2:
+            continue
+        policies = grid[name].value_counts()
+        counts = flips[name].value_counts().reindex(policies.index, fill_value=0)
+        for value in sorted(values):
+            rows.append({
+                "Parameter": name,
+                "Value": value,
+                "Policies": int(policies[value]),
+                "Flips": int(counts[value]),
+                "Flips per policy": counts[value] / policies[value],
+            })
+    return pd.DataFrame(rows, columns=["Parameter", "Value", "Policies", "Flips", "Flips per policy"])
+
+
+def parse_values(text):
+    '''
+    Parse "0.03,0.06,0.09" or an inclusive range "start:stop:step" into a list of floats.
+    '''
+    if ":" in text:
+        start, stop, step = (float(part) for part in text.split(":"))
+        return list(np.round(np.arange(start, stop + step / 2, step), 12))
+    return [float(part) for part in text.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUES",
+                        help=f"values of one parameter ({', '.join(PARAMETERS)})")
+    parser.add_argument("--grid", help="JSON file of {parameter: [values, ...]}")
+    parser.add_argument("--path", default=DATA_PATH, help="source workbook")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (all cores by default)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_POLICIES, help="policies scored at once by a worker")
+    parser.add_argument("--output", help="write the flipped decisions to this .parquet or .csv file")
+    args = parser.parse_args()
+
+    values = {}
+    if args.grid:
+        with open(args.grid) as f:
+            values.update(json.load(f))
+    for item in args.set:
+        name, _, text = item.partition("=")
+        values[name] = parse_values(text)
+    try:
+        grid = policy_grid(values)
+    except ValueError as e:
+        parser.error(str(e))
+
+    inputs = score_inputs(build_cube(load_dataset(args.path)))
+    start = time.perf_counter()
+    flips = sweep(inputs, grid, workers=args.workers, chunk_size=args.chunk_size)
+    seconds = time.perf_counter() - start
+
+    decisions = len(grid) * len(inputs) * len(COMPANY_GOALS) * len(CUSTOMER_PRIORITIES)
+    print(f"{len(grid):,} policies x {len(inputs):,} cells x 16 goal/priority pairs = {decisions:,} decisions in {seconds:.1f}s")
+    print(f"{len(flips):,} differ from the current policy ({len(flips) / decisions:.2%})")
+    summary = flip_summary(flips, grid)
+    if not summary.empty:
+        print(summary.to_string(index=False))
+
+    if args.output:
+        if args.output.endswith(".csv"):
+            flips.to_csv(args.output, index=False)
+        else:
+            flips.to_parquet(args.output, index=False)
+        print(f"flipped decisions written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,103 +1,162 @@
 import pandas as pd
 import numpy as np
-import base64
-from components.Discount_logic import discount_strategy
+from components.Discount_logic import strategy_column, strategy_matrix
+from components.cube import MEAN_DECIMALS, SUM_DECIMALS, build_cube, build_trends, cube_slice, discount_mean
+from components.elasticity import region_notes
+from components.assets import icon_map
+from components.metrics import span
 
-def summary(df, filtered, year, region,  company_goal, customer_priority ):
+DISPLAY_COLUMNS = [
+    "Category_Display", "Sub-Category", "Rank", "Revenue", "Quantity", "Profit",
+    "YoY Revenue %", "Revenue Trend (All Years)", "Discount", "Elasticity Proxy", "Discount Strategy"
+]
+
+# Goal/priority a dashboard (app or static site) opens with
+DEFAULT_GOAL, DEFAULT_PRIORITY = "Revenue Growth", "New Customers"
+
+
+def view_options(cube):
+    '''
+    Return the region choices ("All" first) and year choices of the filters.
+
+    The first year has no YoY and is left out.
+
+    Args:
+        cube (pandas.DataFrame): The cube built by build_cube().
+
+    Returns:
+        tuple: The region names (list of str) and the years (list of int).
+    '''
+    regions = ["All"] + sorted(r for r in cube.index.unique("Region") if r != "All")
+    years = sorted(int(y) for y in cube.index.unique("Year"))[1:]
+    return regions, years
+
+
+def summary(df, filtered, year, region,  company_goal, customer_priority, cube=None, trends=None, embed_icons=False):
     '''
     Aggregate and summarize sales data to provide actionable insights for discount strategies.
 
-    This function processes filtered sales data (from year and region dropdown in Dashboard.qmd file) to compute key metrics. 
-    It incorporates company goals and customer priorities to tailor recommendations, with visual
-    enhancements like icons and HTML formatting.
+    Shortcut for strategy_view(summary_matrix(...), company_goal, customer_priority).
 
     Args:
         df (pandas.DataFrame): The full dataset containing sales data
-        filtered (pandas.DataFrame): A subset of df filtered by user selections.
-        year (str): The selected year for analysis.
+        filtered (pandas.DataFrame, optional): A subset of df filtered by user selections,
+            or None (see summary_matrix()).
+        year (int): The selected year for analysis.
         region (str): The selected region (e.g., "All" or specific region).
         company_goal (str): The company's strategic focus 
         customer_priority (str): The target customer segment 
+        cube (pandas.DataFrame, optional): The cube built by build_cube(df) at load time.
+            Built from df on the fly when omitted.
+        trends (pandas.DataFrame, optional): The result of build_trends(cube), computed
+            once per dataset. Built from the cube on the fly when omitted.
+        embed_icons (bool, optional): Inline the category icons as base64 data URIs
+            instead of referencing the static /icons URLs served by the app.
     Returns:
         pandas.DataFrame: A summarized DataFrame with Total row 
 
     '''
-    filtered_data = filtered
-    if filtered_data.empty:
+    matrix = summary_matrix(df, filtered, year, region, cube=cube, trends=trends, embed_icons=embed_icons)
+    return strategy_view(matrix, company_goal, customer_priority)
+
+
+def strategy_view(matrix, company_goal, customer_priority):
+    '''
+    Select one goal/priority pair out of a summary_matrix() result.
+
+    Only picks an already computed column, so it is cheap enough to run on
+    every radio-button change.
+
+    Args:
+        matrix (pandas.DataFrame): The result of summary_matrix().
+        company_goal (str): The company's strategic focus 
+        customer_priority (str): The target customer segment 
+    Returns:
+        pandas.DataFrame: The summary table with a single "Discount Strategy" column.
+    '''
+    if matrix.empty:
         return pd.DataFrame()
 
+    view = matrix[DISPLAY_COLUMNS[:-1]].copy()
+    view["Discount Strategy"] = matrix[strategy_column(company_goal, customer_priority)]
+    return view
+
+
+def summary_matrix(df, filtered, year, region, cube=None, trends=None, embed_icons=False, elasticity=None):
+    '''
+    Aggregate and summarize sales data for every goal/priority pair at once.
+
+    This function processes filtered sales data (from year and region dropdown in Dashboard.qmd file) to compute key metrics. 
+    The discount strategy is computed for all 16 company goal x customer priority pairs
+    (one column each, see strategy_matrix()), with visual enhancements like icons and HTML formatting.
+
+    All sums and means are read from the pre-aggregated cube (see components/cube.py)
+    instead of the raw rows, so a render only touches a few hundred cells.
+
+    Args:
+        df (pandas.DataFrame): The full dataset containing sales data
+        filtered (pandas.DataFrame, optional): A subset of df filtered by user selections.
+            Not read: whether the view is empty is decided from the cube, so None can be
+            passed instead of reading the rows of the view.
+        year (int): The selected year for analysis.
+        region (str): The selected region (e.g., "All" or specific region).
+        cube (pandas.DataFrame, optional): The cube built by build_cube(df) at load time.
+            Built from df on the fly when omitted.
+        trends (pandas.DataFrame, optional): The result of build_trends(cube), computed
+            once per dataset. Built from the cube on the fly when omitted.
+        embed_icons (bool, optional): Inline the category icons as base64 data URIs
+            instead of referencing the static /icons URLs served by the app.
+        elasticity (pandas.DataFrame, optional): Monthly (or weekly) estimates from
+            components.elasticity.build_elasticity(); the note of the selected region
+            becomes the tooltip of each Elasticity Proxy cell.
+    Returns:
+        pandas.DataFrame: A summarized DataFrame with Total row, with the 16 strategy
+        columns in place of "Discount Strategy"
+
+    '''
     # --- Base aggregation ---
-    sub = (
-        filtered_data.groupby(["Category", "Sub-Category"], as_index=False)
-        .agg(
-            Revenue=("Sales", "sum"),
-            Profit=("Profit", "sum"),
-            Discount=("Discount", "mean"),
-            Quantity=("Quantity", "sum")
-        )
-    )
+    with span("aggregate"):
+        if cube is None:
+            cube = build_cube(df)
+
+        # The cube has a cell for every (region, year, sub-category) with rows
+        cells = cube_slice(cube, year, region)
+        if cells.empty:
+            return pd.DataFrame()
+        if trends is None:
+            trends = build_trends(cube)
+
+        sub = pd.DataFrame({
+            "Category": cells["Category"],
+            "Sub-Category": cells["Sub-Category"],
+            "Revenue": cells["Sales"],
+            "Profit": cells["Profit"],
+            "Discount": discount_mean(cells),
+            "Quantity": cells["Quantity"],
+        })
 
     # --- YoY Revenue ---
-    prev_year = str(int(year) - 1)
-    prev_f = df[df["Year"] == prev_year]
-    if region != "All":
-        prev_f = prev_f[prev_f["Region"] == region]
-
-    prev = (
-        prev_f.groupby(["Category", "Sub-Category"], as_index=False)
-        .agg(Revenue_prev=("Sales", "sum"))
-    )
-    sub = sub.merge(prev, on=["Category", "Sub-Category"], how="left")
-
-    sub["YoY Revenue %"] = np.where(
-        sub["Revenue_prev"] > 0,
-        ((sub["Revenue"] - sub["Revenue_prev"]) / sub["Revenue_prev"]).round(3),
-        None
-    )
-    sub.drop(columns=["Revenue_prev"], inplace=True)
-
-
-    # --- Revenue Trend (numeric list for gt sparklines) ---
-    trend_data = (
-        df.groupby(["Category", "Sub-Category", "Year"], as_index=False).agg(
-            Revenue=("Sales", "sum"),
-            Discount=("Discount", "mean")
+    with span("yoy"):
+        prev_year = year - 1
+        prev = cube_slice(cube, prev_year, region)
+        prev = prev[["Category", "Sub-Category", "Sales"]].rename(columns={"Sales": "Revenue_prev"})
+        sub = sub.merge(prev, on=["Category", "Sub-Category"], how="left")
+
+        sub["YoY Revenue %"] = np.where(
+            sub["Revenue_prev"] > 0,
+            ((sub["Revenue"] - sub["Revenue_prev"]) / sub["Revenue_prev"]).round(3),
+            None
         )
-    )
-    trend_data["Year"] = trend_data["Year"].astype(int) # for sorting
-
-    def build_trend(cat, subcat):
-        series = trend_data[
-            (trend_data["Category"] == cat) & (trend_data["Sub-Category"] == subcat)
-        ].sort_values("Year")
-        
-        # Convert the revenue values to a space-separated list
-        trend_values = series["Revenue"].tolist()
-                
-        # Filter out NaN values and convert to string
-        valid_values = [str(v) for v in trend_values if not pd.isna(v)]
-        
-        # Return as space-separated string
-        return " ".join(valid_values)
-
-    sub["Revenue Trend (All Years)"] = sub.apply(
-        lambda r: build_trend(r["Category"], r["Sub-Category"]), axis=1
-    )
-
-
-    # --- Elasticity Proxy (Discount vs Revenue correlation) ---
-    def calc_elasticity(cat, subcat):
-        series = trend_data[
-            (trend_data["Category"] == cat) & (trend_data["Sub-Category"] == subcat)
-        ]
-        if len(series) >= 3:  # need at least 3 years to measure correlation
-            corr = series["Discount"].corr(series["Revenue"])
-            return round(corr, 2) if pd.notna(corr) else 0
-        return 0
-
-    sub["Elasticity Proxy"] = sub.apply(
-        lambda r: calc_elasticity(r["Category"], r["Sub-Category"]), axis=1
-    )
+        sub.drop(columns=["Revenue_prev"], inplace=True)
+
+
+    # --- Revenue Trend (numeric list for gt sparklines) and Elasticity Proxy ---
+    # (Discount vs Revenue correlation), both precomputed once per dataset
+    with span("trend"):
+        sub = sub.merge(trends.reset_index(), on=["Category", "Sub-Category"], how="left")
+        sub["Revenue Trend (All Years)"] = sub["Revenue Trend (All Years)"].fillna("")
+        sub["Elasticity Proxy"] = sub["Elasticity Proxy"].fillna(0)
+
     # Adding icon next to the elasticity number with specific class
     def format_elasticity(value):
         if value > 0.5:
@@ -107,68 +166,60 @@ def summary(df, filtered, year, region,  company_goal, customer_priority ):
         else:
             return f'<span class="elasticity-neutral">●</span> {value}'
 
-    sub["Elasticity Proxy"] = sub.apply(
-        lambda r: format_elasticity(r["Elasticity Proxy"]), axis=1
-    )
-
-
-    # --- Rank ---
-    sub["Rank"] = sub.groupby("Category")["Revenue"].rank(method="dense", ascending=False).astype(int)
-
-
-    # --- Discount Strategy ---
-    sub["Discount Strategy"] = sub.apply(
-        lambda row: discount_strategy(row, company_goal, customer_priority), # applying the discount strategy function that we imported
-        axis=1
-    )
-
-
-    # --- Category Icons ---
-    def img_to_base64(path):
-        with open(path, "rb") as f:
-            encoded = base64.b64encode(f.read()).decode("utf-8")
-        return f"data:image/png;base64,{encoded}"
-
-    icon_map = {
-    "Furniture": f"<img src='{img_to_base64('images/icons8_wing_chair_1.png')}' style='width:26px;height:26px;vertical-align:middle;margin-right:4px;'/> Furniture",
-    "Office Supplies": f"<img src='{img_to_base64('images/icons8_print _1.png')}' style='width:26px;height:26px;vertical-align:middle;margin-right:4px;'/> Office Supplies",
-    "Technology": f"<img src='{img_to_base64('images/icons8_server_1.png')}' style='width:24px;height:24px;vertical-align:middle;margin-right:4px;'/> Technology"
-    }
-
-
-    sub = sub.sort_values(by=["Category", "Rank"], ascending= True)
-    rows = []
-    cats = list(sub["Category"].unique())
-    for cat in cats:
-        cat_df = sub[sub["Category"] == cat].copy()
-        cat_df["Category_Display"] = ""
-        if len(cat_df) > 0:
-            cat_df.iloc[0, cat_df.columns.get_loc("Category_Display")] = icon_map.get(cat, cat)
-
-        display_cols = [
-            "Category_Display", "Sub-Category", "Rank", "Revenue", "Quantity", "Profit",
-            "YoY Revenue %", "Revenue Trend (All Years)", "Discount", "Elasticity Proxy", "Discount Strategy"
-        ]
-        rows.append(cat_df[display_cols])
-
-        # Totals row
-        total_row = {
-            "Category_Display": "Total",
-            "Sub-Category": np.nan,
-            "Rank": np.nan,
-            "Revenue": cat_df["Revenue"].sum(),
-            "Quantity": cat_df["Quantity"].sum(),
-            "Profit": cat_df["Profit"].sum(),
-            "YoY Revenue %": np.nan,
-            "Revenue Trend (All Years)": " ",
-            "Discount": cat_df["Discount"].mean(),
-            "Elasticity Proxy": np.nan,
-            "Discount Strategy": np.nan,
-        }
-        rows.append(pd.DataFrame([total_row], columns=display_cols))
-
-    final_df = pd.concat(rows, ignore_index=True)
-
-    final_df["Category_Display"] = final_df["Category_Display"].astype(str)
+    with span("elasticity"):
+        sub["Elasticity Proxy"] = sub.apply(
+            lambda r: format_elasticity(r["Elasticity Proxy"]), axis=1
+        )
+        if elasticity is not None:
+            notes = region_notes(elasticity, region).reset_index()
+            sub = sub.merge(notes, on=["Category", "Sub-Category"], how="left")
+            sub["Elasticity Proxy"] = sub["Elasticity Proxy"].where(
+                sub["Note"].isna(), '<span title="' + sub["Note"] + '">' + sub["Elasticity Proxy"] + "</span>"
+            )
+            sub.drop(columns=["Note"], inplace=True)
+
+
+    # --- Rank and Discount Strategy ---
+    with span("strategy"):
+        sub["Rank"] = sub.groupby("Category")["Revenue"].rank(method="dense", ascending=False).astype(int)
+        matrix = strategy_matrix(sub) # every goal/priority pair in one pass
+        sub = pd.concat([sub, matrix], axis=1)
+
+
+    # --- Category Icons and Totals rows ---
+    with span("totals"):
+        icons = icon_map(embed=embed_icons)
+
+        sub = sub.sort_values(by=["Category", "Rank"], ascending= True)
+        rows = []
+        cats = list(sub["Category"].unique())
+        for cat in cats:
+            cat_df = sub[sub["Category"] == cat].copy()
+            cat_df["Category_Display"] = ""
+            if len(cat_df) > 0:
+                cat_df.iloc[0, cat_df.columns.get_loc("Category_Display")] = icons.get(cat, cat)
+
+            display_cols = DISPLAY_COLUMNS[:-1] + list(matrix.columns)
+            rows.append(cat_df[display_cols])
+
+            # Totals row
+            total_row = {
+                "Category_Display": "Total",
+                "Sub-Category": np.nan,
+                "Rank": np.nan,
+                "Revenue": round(cat_df["Revenue"].sum(), SUM_DECIMALS),
+                "Quantity": cat_df["Quantity"].sum(),
+                "Profit": round(cat_df["Profit"].sum(), SUM_DECIMALS),
+                "YoY Revenue %": np.nan,
+                "Revenue Trend (All Years)": " ",
+                "Discount": round(cat_df["Discount"].sum(), MEAN_DECIMALS) / cat_df["Discount"].count(),
+                "Elasticity Proxy": np.nan,
+                **{col: np.nan for col in matrix.columns},
+            }
+            rows.append(pd.DataFrame([total_row], columns=display_cols))
+
+        final_df = pd.concat(rows, ignore_index=True)
+
+        final_df["Category_Display"] = final_df["Category_Display"].astype(str)
 
     return final_df
@@ -0,0 +1,229 @@
+import polars as pl
+import polars.selectors as cs
+from components.Discount_logic import strategy_column, strategy_matrix_arrays
+from components.cube import ALL_REGIONS, MEAN_DECIMALS, SUM_DECIMALS
+from components.assets import icon_map
+from components.table_logic import DISPLAY_COLUMNS
+from components.metrics import span
+
+# The raw columns the polars engine reads
+ROW_COLUMNS = ["Year", "Region", "Category", "Sub-Category", "Sales", "Profit", "Discount", "Quantity"]
+
+KEYS = ["Category", "Sub-Category"]
+
+
+def _sum(col):
+    # Rounded like the sums of the cube (see components.cube.SUM_DECIMALS), so both
+    # engines give the same values whatever order polars adds the rows up in
+    return pl.col(col).sum().round(SUM_DECIMALS)
+
+
+def _mean(col):
+    # Same as components.cube.discount_mean(): the rounded sum over the count
+    return (_sum(col) / pl.col(col).count()).round(MEAN_DECIMALS)
+
+
+def rows_frame(df):
+    '''
+    Convert loaded pandas rows (see components.data_loader.load_dataset()) to the engine's input.
+
+    Only ROW_COLUMNS are kept, categorical columns become strings so that
+    they join with the trends and elasticity frames, and float measures
+    are summed as Float64 like the pandas engine does.
+    '''
+    return pl.from_pandas(df[ROW_COLUMNS]).with_columns(
+        cs.categorical().cast(pl.String), cs.float().cast(pl.Float64)
+    )
+
+
+def build_trends(rows):
+    '''
+    Compute the revenue sparkline and elasticity proxy of every Category/Sub-Category.
+
+    Polars counterpart of components.cube.build_trends(), computed straight from
+    the raw rows (all years, all regions).
+
+    Args:
+        rows (polars.DataFrame | polars.LazyFrame): The raw rows (see ROW_COLUMNS).
+
+    Returns:
+        polars.DataFrame: "Category", "Sub-Category", "Revenue Trend (All Years)" and
+        "Elasticity Proxy" columns, one row per Category/Sub-Category.
+    '''
+    return _trends_plan(rows.lazy()).collect()
+
+
+def _trends_plan(rows):
+    yearly = (
+        rows.group_by([*KEYS, "Year"])
+        .agg(Revenue=_sum("Sales"), Discount=_mean("Discount"))
+        .sort([*KEYS, "Year"])
+    )
+    return yearly.group_by(KEYS, maintain_order=True).agg(
+        pl.col("Revenue").drop_nulls().cast(pl.String).str.join(" ").alias("Revenue Trend (All Years)"),
+        # need at least 3 years to measure correlation
+        pl.when(pl.len() >= 3)
+        .then(pl.corr("Discount", "Revenue").round(2).fill_nan(0).fill_null(0))
+        .otherwise(0.0)
+        .alias("Elasticity Proxy"),
+    )
+
+
+def summary(rows, year, region, company_goal, customer_priority, trends=None, embed_icons=False):
+    '''
+    Polars counterpart of components.table_logic.summary().
+
+    Shortcut for strategy_view(summary_matrix(...), company_goal, customer_priority).
+    '''
+    matrix = summary_matrix(rows, year, region, trends=trends, embed_icons=embed_icons)
+    return strategy_view(matrix, company_goal, customer_priority)
+
+
+def strategy_view(matrix, company_goal, customer_priority):
+    '''
+    Select one goal/priority pair out of a summary_matrix() result.
+
+    Args:
+        matrix (polars.DataFrame): The result of summary_matrix().
+        company_goal (str): The company's strategic focus
+        customer_priority (str): The target customer segment
+    Returns:
+        polars.DataFrame: The summary table with a single "Discount Strategy" column.
+    '''
+    if matrix.is_empty():
+        return pl.DataFrame()
+
+    return matrix.select(
+        *DISPLAY_COLUMNS[:-1],
+        pl.col(strategy_column(company_goal, customer_priority)).alias("Discount Strategy"),
+    )
+
+
+def summary_matrix(rows, year, region, trends=None, embed_icons=False, elasticity=None):
+    '''
+    Aggregate and summarize sales data for every goal/priority pair, with polars.
+
+    Same table as components.table_logic.summary_matrix(), built as one lazy
+    query over the raw rows: the year/region filter, the groupby, the
+    previous-year join, the trend lookup and the rank are planned together so
+    polars only reads the rows and columns it needs. The result stays an
+    Arrow-backed polars frame all the way to table_display(), with numeric
+    "YoY Revenue %" values.
+
+    Args:
+        rows (polars.DataFrame | polars.LazyFrame): The raw rows (see ROW_COLUMNS),
+            with an integer "Year" column.
+        year (int): The selected year for analysis.
+        region (str): The selected region (e.g., "All" or specific region).
+        trends (polars.DataFrame, optional): The result of build_trends(rows), or
+            components.cube.build_trends(cube) with its index reset. Computed within
+            the query when omitted.
+        embed_icons (bool, optional): Inline the category icons as base64 data URIs
+            instead of referencing the static /icons URLs served by the app.
+        elasticity (polars.DataFrame, optional): components.elasticity.build_elasticity()
+            with its index reset; the note of the selected region becomes the tooltip
+            of each Elasticity Proxy cell.
+    Returns:
+        polars.DataFrame: The summary with Total rows and the 16 strategy columns in
+        place of "Discount Strategy"; empty if the selection has no rows.
+    '''
+    rows = rows.lazy()
+    prev_year = year - 1
+    trends = _trends_plan(rows) if trends is None else trends.lazy()
+
+    selected = rows.filter(pl.col("Year").is_in([year, prev_year]))
+    if region != ALL_REGIONS:
+        selected = selected.filter(pl.col("Region") == region)
+
+    # --- Base aggregation ---
+    by_year = selected.group_by(["Year", *KEYS]).agg(
+        Revenue=_sum("Sales"),
+        Profit=_sum("Profit"),
+        Discount=_mean("Discount"),
+        Quantity=pl.col("Quantity").sum(),
+    )
+    prev = by_year.filter(pl.col("Year") == prev_year).select(*KEYS, Revenue_prev=pl.col("Revenue"))
+
+    # The whole plan runs on collect(), so "aggregate" also covers yoy, trend and rank
+    with span("aggregate"):
+        sub = (
+            by_year.filter(pl.col("Year") == year)
+            # --- YoY Revenue ---
+            .join(prev, on=KEYS, how="left")
+            .with_columns(
+                pl.when(pl.col("Revenue_prev") > 0)
+                .then(((pl.col("Revenue") - pl.col("Revenue_prev")) / pl.col("Revenue_prev")).round(3))
+                .alias("YoY Revenue %")
+            )
+            # --- Revenue Trend and Elasticity Proxy (precomputed per dataset) ---
+            .join(trends.select(*KEYS, "Revenue Trend (All Years)", "Elasticity Proxy"), on=KEYS, how="left")
+            .with_columns(
+                pl.col("Revenue Trend (All Years)").fill_null(""),
+                pl.col("Elasticity Proxy").cast(pl.Float64).fill_null(0.0),
+            )
+            # --- Rank ---
+            .with_columns(
+                pl.col("Revenue").rank("dense", descending=True).over("Category").cast(pl.Float64).alias("Rank")
+            )
+            .sort(["Category", "Rank", "Sub-Category"])
+        ).collect()
+
+    if sub.is_empty():
+        return pl.DataFrame()
+
+    # Adding icon next to the elasticity number with specific class
+    proxy = pl.col("Elasticity Proxy")
+    with span("elasticity"):
+        sub = sub.with_columns(
+            pl.format(
+                '<span class="elasticity-{}">●</span> {}',
+                pl.when(proxy > 0.5).then(pl.lit("positive"))
+                .when(proxy < -0.5).then(pl.lit("negative"))
+                .otherwise(pl.lit("neutral")),
+                proxy.cast(pl.String),
+            ).alias("Elasticity Proxy")
+        )
+        if elasticity is not None:
+            notes = elasticity.filter(pl.col("Region") == region).select(*KEYS, "Note")
+            sub = sub.join(notes, on=KEYS, how="left", maintain_order="left").with_columns(
+                pl.when(pl.col("Note").is_not_null())
+                .then(pl.format('<span title="{}">{}</span>', "Note", "Elasticity Proxy"))
+                .otherwise(pl.col("Elasticity Proxy"))
+                .alias("Elasticity Proxy")
+            ).drop("Note")
+
+    # --- Discount Strategy ---
+    # every goal/priority pair in one pass; the scoring itself is shared with the pandas engine
+    with span("strategy"):
+        strategies = strategy_matrix_arrays(sub)
+        sub = sub.with_columns(pl.Series(name, labels, dtype=pl.String) for name, labels in strategies.items())
+
+    # --- Category Icons (first row of each category) ---
+    with span("totals"):
+        icons = icon_map(embed=embed_icons)
+        sub = sub.with_columns(
+            pl.when(pl.int_range(pl.len()).over("Category") == 0)
+            .then(pl.col("Category").replace_strict(icons, default=pl.col("Category"), return_dtype=pl.String))
+            .otherwise(pl.lit(""))
+            .alias("Category_Display")
+        )
+
+        # --- Totals rows ---
+        totals = sub.group_by("Category", maintain_order=True).agg(
+            pl.lit("Total").alias("Category_Display"),
+            _sum("Revenue"),
+            pl.col("Quantity").sum(),
+            _sum("Profit"),
+            pl.lit(" ").alias("Revenue Trend (All Years)"),
+            (pl.col("Discount").sum().round(MEAN_DECIMALS) / pl.col("Discount").count()).alias("Discount"),
+        )
+
+        display_cols = DISPLAY_COLUMNS[:-1] + list(strategies)
+        return (
+            pl.concat(
+                [sub.with_columns(_total=pl.lit(False)), totals.with_columns(_total=pl.lit(True))],
+                how="diagonal_relaxed",
+            )
+            .sort(["Category", "_total"], maintain_order=True)
+            .select(display_cols)
+        )
@@ -1,8 +1,44 @@
+import hashlib
+
 from great_tables import GT, style, loc, md, nanoplot_options
+from great_tables._utils_render_html import create_body_component_h
 from shiny import ui
+import pandas as pd
 import polars as pl
+from components.cache import LRUCache
+from components.metrics import span
+
+# Rendered tables shared by every session, bounded by the total size of the HTML
+RENDER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+render_cache = LRUCache(maxsize=256, maxweight=RENDER_CACHE_MAX_BYTES, weigher=len)
+
+# Text colors of the "Discount Strategy" cells
+STRATEGY_DEFAULT_COLOR = "#A5A5A5"
+STRATEGY_COLORS = {
+    "Reduce discount": "red",
+    "Increase discount": "green",
+}
+
+
+def frame_fingerprint(df):
+    '''
+    Return a cheap content hash of a DataFrame (values, index, column names and dtypes).
 
-def table_display(df_sum, year, region):
+    Two frames with the same fingerprint render to the same table, so it can be
+    used as a cache key without keeping the frame itself around. Accepts pandas
+    and polars frames (the polars row hashes are only stable within a process,
+    which is all the render cache needs).
+    '''
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((type(df).__name__, list(df.columns), [str(t) for t in df.dtypes])).encode())
+    if isinstance(df, pl.DataFrame):
+        digest.update(df.hash_rows(seed=0).to_numpy().tobytes())
+    else:
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def table_display(df_sum, year, region, use_cache=True, page_rows=None):
     '''
     Render an interactive table displaying summarized sales data with enhanced styling and visualizations.
 
@@ -12,9 +48,14 @@ def table_display(df_sum, year, region):
     and ensures a clean, responsive layout focused on usability.
 
     Args:
-        df_sum (pandas.DataFrame): A summarized DataFrame 
-        year (str): The selected year for the analysis.
+        df_sum (pandas.DataFrame | polars.DataFrame): A summarized DataFrame, from
+            either summary engine (polars frames are used as they are)
+        year (int): The selected year for the analysis.
         region (str): The selected region (e.g., "All" or a specific region).
+        use_cache (bool, optional): Reuse the HTML of an earlier render of the same
+            content (see frame_fingerprint()) instead of building the table again.
+        page_rows (int, optional): Render only this many rows of a longer summary;
+            the others are rendered by table_rows_html() as the table is scrolled.
 
     Returns:
         shiny.ui.HTML: An HTML-rendered table object for display in a Shiny application.
@@ -24,34 +65,81 @@ def table_display(df_sum, year, region):
         # Returns HTML table with styled metrics
     '''
 
-    if df_sum.empty:
+    if len(df_sum) == 0:
         return ui.div(
             "No data available for the selected filters.",
             style="text-align: center; padding: 20px; font-size: 16px;"
         )
-    
-    # Convert Pandas to Polars
-    df_polars = pl.from_pandas(df_sum)
 
-    # Preprocess the data to add symbols (adding '%' to YoY Revenue % column)
-    df_polars = df_polars.with_columns(
-        (pl.col("YoY Revenue %") * 100).round(1).cast(pl.Utf8) + "%"
-    )
-    
-    # Adding conditional up and down arrows to the YoY Revenue % column
+    domain = None
+    if page_rows is not None and len(df_sum) > page_rows:
+        # First page only, colored on the profit range of the whole summary
+        domain = profit_domain(df_sum)
+        df_sum = df_sum[:page_rows]
+
+    if not use_cache:
+        return ui.HTML(render_table_html(df_sum, year, region, domain))
+
+    key = (frame_fingerprint(df_sum), year, region, domain)
+    return ui.HTML(render_cache.get_or_compute(key, lambda: render_table_html(df_sum, year, region, domain)))
+
+
+def render_table_html(df_sum, year, region, domain=None):
+    '''
+    Build the Great Tables object for a non-empty summary and serialize it to HTML.
+
+    Args:
+        df_sum (pandas.DataFrame | polars.DataFrame): A summarized DataFrame
+        year (int): The selected year for the analysis.
+        region (str): The selected region (e.g., "All" or a specific region).
+        domain (tuple, optional): Profit range of the color gradient (see
+            profit_domain()); that of df_sum by default.
+
+    Returns:
+        str: The table HTML.
+    '''
+    with span("gt_build"):
+        tbl = build_table(df_sum, year, region, domain)
+    with span("gt_html"):
+        return tbl._repr_html_()
+
+
+def profit_domain(df_sum):
+    '''
+    Return the (min, max) profit of the non-total rows, the range of the Profit color gradient.
+
+    A page of a longer summary is colored on the range of the whole summary, so
+    a row has the same color on whichever page it is rendered.
+    '''
+    frame = df_sum if isinstance(df_sum, pl.DataFrame) else pl.from_pandas(df_sum[["Category_Display", "Profit"]])
+    profits = frame.filter(pl.col("Category_Display") != "Total")["Profit"] # making sure to not include the total row
+    return profits.min(), profits.max()
+
+
+def build_table(df_sum, year, region, domain=None):
+    '''
+    Build the styled Great Tables object of a non-empty summary (see render_table_html()).
+
+    Returns:
+        great_tables.GT: The table, not rendered yet.
+    '''
+    # Convert Pandas to Polars (the polars engine hands its Arrow-backed frame over as is)
+    df_polars = df_sum if isinstance(df_sum, pl.DataFrame) else pl.from_pandas(df_sum)
+
+    # Adding conditional up and down arrows and '%' to the YoY Revenue % column,
+    # choosing the arrow on the numeric value before it becomes text
+    yoy = pl.col("YoY Revenue %").cast(pl.Float64)
     df_polars = df_polars.with_columns(
-        pl.when(pl.col("YoY Revenue %").str.replace("%", "").cast(pl.Float64) > 0)
-        .then("▲ " + pl.col("YoY Revenue %") )
-        .otherwise( "▼" + pl.col("YoY Revenue %") )
-        .alias("YoY Revenue %")
+        (
+            pl.when(yoy > 0).then(pl.lit("▲ ")).otherwise(pl.lit("▼"))
+            + (yoy * 100).round(1).cast(pl.Utf8) + "%"
+        ).alias("YoY Revenue %")
     )
     
     region_display = region if region != "All" else "All Regions"
 
     # Calculate profit min/max 
-    non_total_profits = df_polars.filter(pl.col("Category_Display") != "Total")["Profit"] # making sure to not include the total row
-    profit_min = non_total_profits.min() 
-    profit_max = non_total_profits.max() 
+    profit_min, profit_max = domain if domain is not None else profit_domain(df_polars)
 
     # Create the table with enhanced styling
     tbl = (
@@ -150,16 +238,16 @@ def table_display(df_sum, year, region):
         
         # Discount Strategy column styling
         .tab_style(
-            style=style.text(color="#A5A5A5", weight="bold"), #for maintain discount
+            style=style.text(color=STRATEGY_DEFAULT_COLOR, weight="bold"), #for maintain discount
             locations=loc.body(columns=["Discount Strategy"])
         )
         .tab_style(
-            style=style.text(color="red"),
+            style=style.text(color=STRATEGY_COLORS["Reduce discount"]),
             locations=loc.body(columns=["Discount Strategy"], 
                              rows=pl.col("Discount Strategy").str.contains("Reduce discount"))
         )
         .tab_style(
-            style=style.text(color="green"),
+            style=style.text(color=STRATEGY_COLORS["Increase discount"]),
             locations=loc.body(columns=["Discount Strategy"], 
                              rows=pl.col("Discount Strategy").str.contains("Increase discount"))
         )
@@ -200,4 +288,87 @@ def table_display(df_sum, year, region):
         )
     )
 
-    return ui.HTML(tbl._repr_html_())
\ No newline at end of file
+    return tbl
+
+
+def table_rows_html(df_sum, year, region, start, stop):
+    '''
+    Render rows [start, stop) of a paged table (see table_display()), to append to its body.
+
+    Only those rows are built, so the time and size of a page do not grow with
+    the summary. Total rows are rows of the summary like any other: a category
+    total is the same on whichever page it falls.
+
+    Args:
+        df_sum (pandas.DataFrame | polars.DataFrame): The whole non-empty summary.
+        year (int): The selected year for the analysis.
+        region (str): The selected region (e.g., "All" or a specific region).
+        start (int): First row of the page.
+        stop (int): Row after the last one of the page.
+
+    Returns:
+        str: A <tbody> holding the rows (see body_html()); the client moves them into the table's body.
+    '''
+    page, domain = df_sum[start:stop], profit_domain(df_sum)
+
+    def render():
+        with span("gt_html"):
+            return body_html(build_table(page, year, region, domain))
+
+    return render_cache.get_or_compute((frame_fingerprint(page), "rows", domain), render)
+
+
+def product_rows_html(df_sum, node):
+    '''
+    Render the product rows of an expanded sub-category, to insert below its row.
+
+    The rows are the body of a table built like the main one (see build_table()),
+    so they share its formats and cell styling. The client gives each <tr> the
+    class "product-row" and a data-node attribute naming the sub-category.
+
+    Args:
+        df_sum (pandas.DataFrame): A non-empty strategy_view() of a product_matrix() (see components/drilldown.py).
+        node (str): The expanded sub-category.
+
+    Returns:
+        str: A <tbody> holding the rows (see body_html()).
+    '''
+    def render():
+        with span("gt_html"):
+            return body_html(build_table(df_sum, "", ""))
+
+    return render_cache.get_or_compute((frame_fingerprint(df_sum), "products", node), render)
+
+
+def body_html(tbl):
+    '''
+    Render only the body of a Great Tables object: its <tbody class="gt_table_body"> element.
+
+    Uses the body renderer of great_tables itself, so the rows are exactly
+    those of the full table, without building its header, footer and CSS.
+    That renderer is private to great_tables: requirements.txt pins the
+    releases it was tested with (tests/test_table_visual.py compares the
+    result with the body of the full table).
+    '''
+    return create_body_component_h(tbl._build_data(context="html"))
+
+
+def strategy_cells(df_sum):
+    '''
+    Return the content and text color of every "Discount Strategy" cell, in row order.
+
+    Lets the client swap in the strategy column for another goal/priority pair
+    without receiving the whole table again; colors match the table styling.
+
+    Args:
+        df_sum (pandas.DataFrame | polars.DataFrame): A summarized DataFrame (same rows as the rendered table).
+
+    Returns:
+        list[dict]: {"html": ..., "color": ...} per row; total rows have empty html.
+    '''
+    cells = []
+    for label in df_sum["Discount Strategy"].to_list():
+        content = label if isinstance(label, str) else ""
+        color = next((c for text, c in STRATEGY_COLORS.items() if text in content), STRATEGY_DEFAULT_COLOR)
+        cells.append({"html": content, "color": color})
+    return cells
@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger("dashboard.warmup")
+
+# A view is only warmed once no request started for this long
+IDLE_SECONDS = 0.5
+
+WarmupProgress = namedtuple("WarmupProgress", ["done", "failed", "total", "seconds", "running"])
+
+
+class Warmup:
+    '''
+    Precomputes views in the background so that first clicks hit warm caches.
+
+    Views are warmed by plain threads in this process, as the caches they
+    fill (summaries and rendered tables) live in this process's memory.
+    Requests always come first: before each view the threads wait until no
+    request was noted for `idle_seconds` (see note_activity()), so at most
+    the view already in progress overlaps with a request, and a request for
+    that very view waits on it instead of computing it again.
+
+    Args:
+        views (callable): Returns the views to warm, e.g. [(year, region), ...], in
+            the order to warm them; called at the start of each run.
+        warm (callable): warm(*view) computes and caches one view.
+        workers (int): Number of threads warming views at the same time.
+        idle_seconds (float): Quiet time required before each view.
+    '''
+
+    def __init__(self, views, warm, workers=1, idle_seconds=IDLE_SECONDS):
+        self.views = views
+        self.warm = warm
+        self.workers = workers
+        self.idle_seconds = idle_seconds
+        self.last_activity = time.monotonic()
+        self._run_id = 0
+        self._lock = threading.Lock()
+        self._progress = WarmupProgress(0, 0, 0, 0.0, False)
+
+    def note_activity(self):
+        '''
+        Record that a request is being served; warming pauses until it is quiet again.
+        '''
+        self.last_activity = time.monotonic()
+
+    def progress(self):
+        '''
+        Return the progress of the latest run as WarmupProgress(done, failed, total, seconds, running).
+        '''
+        return self._progress
+
+    def start(self):
+        '''
+        Start warming every view in the background; an earlier run still going is abandoned.
+        '''
+        with self._lock:
+            self._run_id += 1
+            run_id = self._run_id
+        threading.Thread(target=self._run, args=(run_id,), name="warmup", daemon=True).start()
+
+    def _current(self, run_id):
+        return run_id == self._run_id
+
+    def _wait_until_idle(self, run_id):
+        while self._current(run_id):
+            quiet = time.monotonic() - self.last_activity
+            if quiet >= self.idle_seconds:
+                return True
+            time.sleep(self.idle_seconds - quiet)
+        return False
+
+    def _warm_one(self, run_id, view):
+        if not self._wait_until_idle(run_id):
+            return None  # superseded by a newer run
+        try:
+            self.warm(*view)
+            return True
+        except Exception:
+            logger.exception("warm-up of %s failed", view)
+            return False
+
+    def _run(self, run_id):
+        views = list(self.views())
+        start = time.perf_counter()
+        done = failed = 0
+        self._progress = WarmupProgress(0, 0, len(views), 0.0, True)
+        logger.info("warm-up of %d views started", len(views))
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="warmup") as pool:
+            for view, ok in zip(views, pool.map(lambda view: self._warm_one(run_id, view), views)):
+                if ok is None:
+                    logger.info("warm-up abandoned after %d/%d views", done + failed, len(views))
+                    return
+                done += ok
+                failed += not ok
+                seconds = time.perf_counter() - start
+                self._progress = WarmupProgress(done, failed, len(views), seconds, done + failed < len(views))
+                logger.info("warm-up %d/%d: %s (%.1fs)", done + failed, len(views), view, seconds)
+
+        logger.info("warm-up finished: %d views in %.1fs, %d failed", done, time.perf_counter() - start, failed)
+
+    def metric_values(self):
+        '''
+        Return the progress as {state: views} for a gauge (see components/metrics.py).
+        '''
+        progress = self._progress
+        return {"done": progress.done, "failed": progress.failed, "total": progress.total}
+
+
+def run_after_startup(starlette_app, fn):
+    '''
+    Call fn() once the ASGI server has started, right before it accepts connections.
+
+    Wraps the lifespan of the Starlette app behind a shiny.App, e.g.
+    run_after_startup(app.starlette_app, warmup.start). fn() must return
+    quickly, e.g. by starting a thread.
+    '''
+    lifespan = starlette_app.router.lifespan_context
+
+    @asynccontextmanager
+    async def with_startup_hook(app):
+        async with lifespan(app) as state:
+            fn()
+            yield state
+
+    starlette_app.router.lifespan_context = with_startup_hook
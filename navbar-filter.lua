@@ -39,6 +39,149 @@ function handleExport() {
 }
 
 
+// Goal/priority changes only resend the "Discount Strategy" column
+// (see push_strategy_column in Dashboard.qmd); patch it into the table
+function patchStrategyCells(rows, cells) {
+  cells.forEach(function(cell, i) {
+    var td = rows[i] && rows[i].lastElementChild;
+    if (td) {
+      td.innerHTML = cell.html;
+      td.style.color = cell.color;
+    }
+  });
+}
+
+function productRows(table, node) {
+  return Array.prototype.filter.call(table.querySelectorAll('tr.product-row'), function(tr) {
+    return tr.dataset.node === node;
+  });
+}
+
+function updateStrategyColumn(msg) {
+  var table = document.querySelector('#render_table_ui .strategy-table[data-view="' + msg.view + '"]');
+  if (!table) {
+    return; // a newer table is on its way and already has the right column
+  }
+  patchStrategyCells(table.querySelectorAll('tbody.gt_table_body > tr:not(.product-row)'), msg.cells);
+  Object.keys(msg.products || {}).forEach(function(node) {
+    patchStrategyCells(productRows(table, node), msg.products[node]);
+  });
+}
+
+// Clicking a sub-category expands its products below it, aggregated on demand
+// (see expand_node in Dashboard.qmd); clicking it again collapses them
+function toggleProductRows(event) {
+  var td = event.target.closest('#render_table_ui .strategy-table tbody.gt_table_body > tr:not(.product-row) > td:nth-child(2)');
+  var node = td && td.textContent.trim();
+  if (!node || !window.Shiny) {
+    return; // total rows have no sub-category
+  }
+  var tr = td.parentElement;
+  var table = tr.closest('.strategy-table');
+  var open = !tr.classList.contains('expanded');
+  tr.classList.toggle('expanded', open);
+  tr.dataset.node = node;
+  if (!open) {
+    productRows(table, node).forEach(function(row) { row.remove(); });
+  }
+  Shiny.setInputValue('expand_node', {view: table.dataset.view, node: node, open: open}, {priority: 'event'});
+}
+
+// The <tr> elements of a <tbody> rendered by the server (see body_html() in
+// components/table_visual.py), parsed apart from the page
+function bodyRows(html) {
+  var template = document.createElement('template');
+  template.innerHTML = html;
+  var body = template.content.querySelector('tbody');
+  return body ? Array.prototype.slice.call(body.children) : [];
+}
+
+function insertProductRows(msg) {
+  var table = document.querySelector('#render_table_ui .strategy-table[data-view="' + msg.view + '"]');
+  var tr = table && Array.prototype.find.call(table.querySelectorAll('tr.expanded'), function(row) {
+    return row.dataset.node === msg.node;
+  });
+  if (!tr || productRows(table, msg.node).length) {
+    return; // collapsed (or replaced) meanwhile
+  }
+  var next = tr.nextSibling;
+  bodyRows(msg.html).forEach(function(row) {
+    row.classList.add('product-row');
+    row.dataset.node = msg.node;
+    tr.parentNode.insertBefore(row, next);
+  });
+}
+
+document.addEventListener('click', toggleProductRows);
+
+// Long tables arrive a page of rows at a time (see send_table_page in Dashboard.qmd):
+// the next page is asked for when the end of the table comes near the viewport
+function requestTablePage() {
+  var table = document.querySelector('#render_table_ui .strategy-table');
+  if (!table || !window.Shiny || table.dataset.pending || Number(table.dataset.rows) >= Number(table.dataset.total)) {
+    return;
+  }
+  if (table.getBoundingClientRect().bottom > window.innerHeight + 600) {
+    return;
+  }
+  table.dataset.pending = table.dataset.rows;
+  Shiny.setInputValue('table_page', {view: table.dataset.view, start: Number(table.dataset.rows)}, {priority: 'event'});
+}
+
+function appendTableRows(msg) {
+  var table = document.querySelector('#render_table_ui .strategy-table[data-view="' + msg.view + '"]');
+  if (!table || Number(table.dataset.rows) !== msg.start) {
+    return; // replaced meanwhile
+  }
+  var body = table.querySelector('tbody.gt_table_body');
+  bodyRows(msg.html).forEach(function(row) { body.appendChild(row); });
+  table.dataset.rows = msg.start + msg.count;
+  delete table.dataset.pending;
+  delete table.dataset.failures;
+  requestTablePage(); // the viewport may not be filled yet
+}
+
+// The page could not be rendered: it is asked for again after a pause, a few times
+// at most (scrolling asks for it again too)
+function tableRowsFailed(msg) {
+  var table = document.querySelector('#render_table_ui .strategy-table[data-view="' + msg.view + '"]');
+  if (!table || table.dataset.pending !== String(msg.start)) {
+    return; // replaced meanwhile
+  }
+  delete table.dataset.pending;
+  var failures = Number(table.dataset.failures || 0) + 1;
+  table.dataset.failures = failures;
+  if (failures <= 3) {
+    setTimeout(requestTablePage, 1000 * failures);
+  }
+}
+
+document.addEventListener('scroll', requestTablePage, true);
+
+// The bulk zip is built in the background (see bulk_export_task in Dashboard.qmd);
+// start its download once it is ready
+function downloadBulkExport(msg) {
+  var link = document.getElementById(msg.id);
+  if (link) {
+    link.click();
+  }
+}
+
+if (window.Shiny) {
+  Shiny.addCustomMessageHandler('strategy_column', updateStrategyColumn);
+  Shiny.addCustomMessageHandler('bulk_export_ready', downloadBulkExport);
+  Shiny.addCustomMessageHandler('product_rows', insertProductRows);
+  Shiny.addCustomMessageHandler('table_rows', appendTableRows);
+  Shiny.addCustomMessageHandler('table_rows_failed', tableRowsFailed);
+  // A new table may be shorter than the viewport: fill it without waiting for a scroll
+  $(document).on('shiny:value', function(event) {
+    if (event.name === 'render_table_ui') {
+      setTimeout(requestTablePage, 0);
+    }
+  });
+}
+
+
 
 function handleInfo() {
   if (!document.getElementById('infoModal')) {
@@ -0,0 +1,26 @@
+'''
+Entry point of the dashboard server: `shiny run serve.py` (or `uvicorn serve:app`).
+
+app.py is generated from Dashboard.qmd by quarto and ends with a plain
+shiny.App built from the rendered page. The routes and hooks of the
+components are added to that App here:
+  - the category icons under content-hashed /icons URLs with long-lived
+    cache headers (see components/assets.py)
+  - the stage timing histograms in Prometheus text format at /metrics, with
+    DASHBOARD_METRICS=1 (see components/metrics.py)
+  - the warm-up of every region x year view once the server is up, with
+    DASHBOARD_WARMUP=1 (see components/warmup.py)
+'''
+import os
+from pathlib import Path
+
+from app import app, dashboard
+from components.assets import mount_icons
+from components.metrics import mount_metrics
+from components.warmup import run_after_startup
+
+mount_icons(app.starlette_app, Path(__file__).parent)
+if os.environ.get("DASHBOARD_METRICS") == "1":
+    mount_metrics(app.starlette_app)
+if dashboard.warmup_enabled:
+    run_after_startup(app.starlette_app, dashboard.warmup.start)
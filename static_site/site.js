@@ -0,0 +1,77 @@
+var strategies = {};
+
+function viewPath(year, region) {
+  return 'views/' + year + '/' + encodeURIComponent(region) + '/';
+}
+
+function fillSelect(id, values, selected) {
+  var select = document.getElementById(id);
+  values.forEach(function(value) {
+    select.add(new Option(value, value, false, String(value) === String(selected)));
+  });
+  return select;
+}
+
+function selectedPair() {
+  var goal = document.getElementById('company_goal').value;
+  return SITE.pairs[goal][document.getElementById('customer_priority').value];
+}
+
+function updateExportLink() {
+  var view = viewPath(document.getElementById('year').value, document.getElementById('region').value);
+  var all = document.getElementById('export_matrix').checked;
+  var link = document.getElementById('export');
+  link.href = view + (all ? 'all-strategies' : selectedPair()) + '.csv';
+  link.download = 'export_' + document.getElementById('region').value + '_' + document.getElementById('year').value + '.csv';
+}
+
+function patchStrategyColumn() {
+  var table = document.querySelector('#render_table_ui .strategy-table');
+  var cells = table && strategies[table.dataset.view];
+  if (!cells || !cells[selectedPair()]) {
+    return; // not loaded yet, or a view without data
+  }
+  var rows = table.querySelectorAll('tbody.gt_table_body > tr');
+  cells[selectedPair()].forEach(function(cell, i) {
+    var td = rows[i] && rows[i].lastElementChild;
+    if (td) {
+      td.innerHTML = cell.html;
+      td.style.color = cell.color;
+    }
+  });
+}
+
+function loadView() {
+  var view = viewPath(document.getElementById('year').value, document.getElementById('region').value);
+  updateExportLink();
+  Promise.all([
+    fetch(view + 'table.html').then(function(response) { return response.text(); }),
+    strategies[view] ? strategies[view] : fetch(view + 'strategies.json').then(function(response) { return response.json(); })
+  ]).then(function(results) {
+    strategies[view] = results[1];
+    if (view !== viewPath(document.getElementById('year').value, document.getElementById('region').value)) {
+      return; // the filters moved on meanwhile
+    }
+    var container = document.getElementById('render_table_ui');
+    container.innerHTML = '<div class="strategy-table"></div>';
+    container.firstChild.dataset.view = view;
+    container.firstChild.innerHTML = results[0];
+    if (selectedPair() !== SITE.defaultPair) {
+      patchStrategyColumn();
+    }
+  });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+  fillSelect('region', SITE.regions, SITE.default.region).addEventListener('change', loadView);
+  fillSelect('year', SITE.years, SITE.default.year).addEventListener('change', loadView);
+  ['company_goal', 'customer_priority'].forEach(function(id, i) {
+    var values = i ? SITE.priorities : SITE.goals;
+    fillSelect(id, values, i ? SITE.default.priority : SITE.default.goal).addEventListener('change', function() {
+      patchStrategyColumn();
+      updateExportLink();
+    });
+  });
+  document.getElementById('export_matrix').addEventListener('change', updateExportLink);
+  loadView();
+});
@@ -0,0 +1,17 @@
+import pytest
+
+from components.data_loader import DATA_PATH, load_dataset
+
+
+@pytest.fixture(scope="session")
+def sample_rows(tmp_path_factory):
+    # Every column of the bundled workbook, laid out like load_dataset() (parsed once)
+    return load_dataset(DATA_PATH, cache_dir=tmp_path_factory.mktemp("cache"), columns=None)
+
+
+@pytest.fixture(scope="session")
+def sample_views(sample_rows):
+    # Every (year, region) the dashboard offers: the first year has no YoY, so is left out
+    years = sorted(sample_rows["Year"].unique())[1:]
+    regions = ["All"] + sorted(sample_rows["Region"].dropna().unique())
+    return [(int(year), region) for year in years for region in regions]
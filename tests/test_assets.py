@@ -0,0 +1,77 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from components.assets import CATEGORY_ICONS, ICON_CACHE_CONTROL, ICON_URL_PREFIX, icon_url, mount_icons
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+
+async def _page(request):
+    return PlainTextResponse("page", headers={"Cache-Control": "no-store"})
+
+
+@pytest.fixture(scope="module")
+def app():
+    app = Starlette(routes=[Route("/", _page)])
+    mount_icons(app, APP_DIR)
+    return app
+
+
+def _get(app, path):
+    # One GET through the ASGI app: (status, headers, body)
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http", "path": path,
+        "raw_path": path.encode(), "root_path": "", "query_string": b"", "headers": [],
+        "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+    }
+    messages = []
+
+    async def run():
+        requested, done = False, asyncio.Event()
+
+        async def receive():
+            # The request, then a disconnect once the response is sent (Starlette listens for it)
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                done.set()
+
+        await app(scope, receive, send)
+
+    asyncio.run(run())
+    start = messages[0]
+    headers = {}
+    for name, value in start["headers"]:
+        headers.setdefault(name.decode().lower(), []).append(value.decode())
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    return start["status"], headers, body
+
+
+@pytest.mark.parametrize("category", list(CATEGORY_ICONS))
+def test_icons_served_with_long_lived_cache_headers(app, category):
+    status, headers, body = _get(app, icon_url(category))
+    assert status == 200
+    assert headers["cache-control"] == [ICON_CACHE_CONTROL]
+    assert body == (APP_DIR / CATEGORY_ICONS[category][0]).read_bytes()
+
+
+def test_other_paths_keep_their_headers(app):
+    status, headers, body = _get(app, "/")
+    assert (status, body) == (200, b"page")
+    assert headers["cache-control"] == ["no-store"]
+
+    status, headers, _ = _get(app, f"{ICON_URL_PREFIX}/00000000/missing.png")
+    assert status == 404
+    assert headers["cache-control"] == [ICON_CACHE_CONTROL]
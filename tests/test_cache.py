@@ -0,0 +1,125 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from components.cache import LRUCache, register_cache_gauges
+from components.metrics import render_metrics
+
+CALLERS = 8
+
+
+def _wait_until(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_concurrent_callers_compute_once():
+    cache = LRUCache(maxsize=4)
+    calls = []
+    waiting = threading.Barrier(CALLERS)
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(10)
+        return object()
+
+    def get():
+        waiting.wait(10)
+        return cache.get_or_compute("view", compute)
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        results = [pool.submit(get) for _ in range(CALLERS)]
+        # Every caller has asked (one computing, the others waiting on it) before the value is ready
+        _wait_until(lambda: cache.stats()["misses"] + cache.stats()["coalesced"] == CALLERS)
+        release.set()
+        values = [r.result(10) for r in results]
+
+    assert len(calls) == 1
+    assert all(v is values[0] for v in values)
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["coalesced"] == CALLERS - 1
+
+
+def test_failed_computation_reaches_every_waiter_and_is_not_cached():
+    cache = LRUCache()
+    started, release = threading.Event(), threading.Event()
+
+    def compute():
+        started.set()
+        release.wait(10)
+        raise ValueError("failed")
+
+    with ThreadPoolExecutor(2) as pool:
+        owner = pool.submit(cache.get_or_compute, "view", compute)
+        started.wait(10)
+        waiter = pool.submit(cache.get_or_compute, "view", lambda: "not called")
+        _wait_until(lambda: cache.stats()["coalesced"] == 1)
+        release.set()
+        for future in (owner, waiter):
+            with pytest.raises(ValueError):
+                future.result(10)
+    assert cache.get_or_compute("view", lambda: "retried") == "retried"
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(maxsize=2)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    cache.get_or_compute("a", lambda: 0)  # a hit: "b" is now the least recently used
+    cache.get_or_compute("c", lambda: 3)
+
+    assert len(cache) == 2
+    assert cache.get_or_compute("a", lambda: 0) == 1
+    assert cache.get_or_compute("b", lambda: 20) == 20
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 4, 2)
+
+
+def test_weight_bound_evicts_oldest_entries():
+    cache = LRUCache(maxsize=10, maxweight=10, weigher=len)
+    for key in "abc":
+        cache.get_or_compute(key, lambda: "x" * 4)
+    assert len(cache) == 2
+    assert cache.weight == 8
+    assert cache.get_or_compute("a", lambda: "recomputed") == "recomputed"
+
+
+def test_clear_drops_entries_and_results_in_flight():
+    cache = LRUCache()
+    cache.get_or_compute("a", lambda: 1)
+    started, release = threading.Event(), threading.Event()
+
+    def compute():
+        started.set()
+        release.wait(10)
+        return "stale"
+
+    with ThreadPoolExecutor(1) as pool:
+        pending = pool.submit(cache.get_or_compute, "b", compute)
+        started.wait(10)
+        cache.clear()
+        release.set()
+        # The caller still gets its value, but it was computed before clear(): not stored
+        assert pending.result(10) == "stale"
+
+    assert len(cache) == 0
+    assert cache.get_or_compute("a", lambda: 10) == 10
+    assert cache.get_or_compute("b", lambda: "fresh") == "fresh"
+
+
+def test_counters_exported_as_gauges():
+    cache = LRUCache(maxsize=1)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    register_cache_gauges({"test_views": cache})
+
+    lines = render_metrics().splitlines()
+    assert "# TYPE dashboard_cache_hits gauge" in lines
+    for counter, value in [("hits", 1), ("misses", 2), ("evictions", 1), ("coalesced", 0), ("size", 1)]:
+        assert f'dashboard_cache_{counter}{{cache="test_views"}} {value}' in lines
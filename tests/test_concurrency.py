@@ -0,0 +1,134 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import pytest
+import uvicorn
+import websockets
+
+from app import app, dashboard, region_options, year_options
+from components.table_logic import DEFAULT_PRIORITY
+
+GOALS = ["Revenue Growth", "Profit Protection"]
+
+# Goal toggles session B must get answered while session A's view is computing
+TOGGLES = 5
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def port():
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    yield port
+    server.should_exit = True
+    thread.join()
+
+
+async def _receive(ws, predicate, timeout):
+    async def receive():
+        while True:
+            message = json.loads(await ws.recv())
+            if predicate(message):
+                return message
+    return await asyncio.wait_for(receive(), timeout)
+
+
+def _has_table(message):
+    return "render_table_ui" in message.get("values", {})
+
+
+async def _connect(port):
+    ws = await websockets.connect(f"ws://127.0.0.1:{port}/websocket/", max_size=None)
+    inputs = {
+        "region": "All", "year": str(year_options[-1]),
+        "company_goal": GOALS[0], "customer_priority": DEFAULT_PRIORITY,
+        "export_matrix": False, "export_format": "csv", "export_all:shiny.action": 0,
+        ".clientdata_output_render_table_ui_hidden": False,
+    }
+    await ws.send(json.dumps({"method": "init", "data": inputs}))
+    await _receive(ws, _has_table, timeout=30)
+    return ws
+
+
+def test_session_responsive_while_another_renders(port, monkeypatch):
+    # Session A's view blocks in its render thread until session B is done toggling
+    view = (year_options[0], region_options[-1])
+    release = threading.Event()
+    compute_view = dashboard.compute_view
+
+    def blocked_compute_view(data, *args):
+        if tuple(args[:2]) == view:
+            release.wait(30)
+        return compute_view(data, *args)
+
+    monkeypatch.setattr(dashboard, "compute_view", blocked_compute_view)
+
+    async def run():
+        session_a = await _connect(port)
+        session_b = await _connect(port)
+        try:
+            await session_a.send(json.dumps({"method": "update", "data": {"year": str(view[0]), "region": view[1]}}))
+            rendered = asyncio.ensure_future(_receive(session_a, _has_table, timeout=60))
+
+            for i in range(TOGGLES):
+                await session_b.send(json.dumps({"method": "update", "data": {"company_goal": GOALS[(i + 1) % 2]}}))
+                await _receive(session_b, lambda m: "strategy_column" in m.get("custom", {}), timeout=5)
+                assert not rendered.done()
+
+            release.set()
+            await rendered
+        finally:
+            release.set()
+            await session_a.close()
+            await session_b.close()
+
+    asyncio.run(run())
+
+
+def test_failed_page_is_answered(port, monkeypatch):
+    # Pages of 5 rows, and the second page fails to render once
+    monkeypatch.setattr(dashboard, "page_rows", 5)
+    compute_page = dashboard.compute_page
+    failures = [RuntimeError("render failed")]
+
+    def failing_compute_page(*args):
+        if failures:
+            raise failures.pop()
+        return compute_page(*args)
+
+    monkeypatch.setattr(dashboard, "compute_page", failing_compute_page)
+
+    async def run():
+        ws = await websockets.connect(f"ws://127.0.0.1:{port}/websocket/", max_size=None)
+        try:
+            inputs = {
+                "region": "All", "year": str(year_options[-2]),
+                "company_goal": GOALS[0], "customer_priority": DEFAULT_PRIORITY,
+                "export_matrix": False, "export_format": "csv", "export_all:shiny.action": 0,
+                ".clientdata_output_render_table_ui_hidden": False,
+            }
+            await ws.send(json.dumps({"method": "init", "data": inputs}))
+            table = (await _receive(ws, _has_table, timeout=30))["values"]["render_table_ui"]["html"]
+            view = table.split('data-view="', 1)[1].split('"', 1)[0]
+
+            for attempt, expected in enumerate(["table_rows_failed", "table_rows"]):
+                await ws.send(json.dumps({"method": "update", "data": {"table_page": {"view": view, "start": 5, "attempt": attempt}}}))
+                message = await _receive(ws, lambda m: set(m.get("custom", {})) & {"table_rows", "table_rows_failed"}, timeout=10)
+                assert list(message["custom"]) == [expected]
+                assert message["custom"][expected]["start"] == 5
+        finally:
+            await ws.close()
+
+    asyncio.run(run())
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.cube import build_cube, build_trends
+from components.Discount_logic import (
+    COMPANY_GOALS, CUSTOMER_PRIORITIES, discount_policy, discount_strategy, discount_strategy_frame,
+    strategy_column,
+)
+from components.table_logic import summary_matrix
+
+PAIRS = [(goal, priority) for goal in COMPANY_GOALS for priority in CUSTOMER_PRIORITIES]
+
+
+def _around(value):
+    # The value and its neighbours a few ulps away, as sums in another order give them
+    return [value, np.nextafter(value, -np.inf), np.nextafter(value, np.inf), value + 1e-12, value - 1e-12]
+
+
+@pytest.fixture(scope="module")
+def boundary_frame():
+    # Inputs on, around and away from every threshold the scores compare against
+    rng = np.random.default_rng(0)
+    revenue = _around(discount_policy["high_revenue"]) + _around(discount_policy["low_revenue"]) + [50000.0]
+    profit = _around(discount_policy["high_profit"]) + _around(discount_policy["low_profit"]) + [-500.0]
+    discount = (
+        _around(discount_policy["min_discount"]) + _around(discount_policy["max_discount"]) + _around(0.15) + [0.2000000030]
+    )
+    yoy = _around(0.0) + [0.25, -0.25, np.nan]
+    n = 2000
+    return pd.DataFrame({
+        "Revenue": rng.choice(revenue, n),
+        "Profit": rng.choice(profit, n),
+        "YoY Revenue %": rng.choice(yoy, n),
+        "Discount": rng.choice(discount, n),
+    })
+
+
+@pytest.mark.parametrize("goal, priority", PAIRS)
+def test_frame_matches_row_wise_on_thresholds(boundary_frame, goal, priority):
+    expected = [discount_strategy(row, goal, priority) for _, row in boundary_frame.iterrows()]
+    assert discount_strategy_frame(boundary_frame, goal, priority).tolist() == expected
+
+
+def test_matrix_matches_row_wise_for_every_view(sample_rows, sample_views):
+    cube = build_cube(sample_rows)
+    trends = build_trends(cube)
+    for year, region in sample_views:
+        filtered = sample_rows[sample_rows["Year"] == year]
+        if region != "All":
+            filtered = filtered[filtered["Region"] == region]
+        matrix = summary_matrix(sample_rows, filtered, year, region, cube=cube, trends=trends)
+        rows = matrix[matrix["Category_Display"] != "Total"]
+        for goal, priority in PAIRS:
+            expected = [discount_strategy(row, goal, priority) for _, row in rows.iterrows()]
+            assert rows[strategy_column(goal, priority)].tolist() == expected, (year, region, goal, priority)
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.cube import SUM_DECIMALS
+from components.Discount_logic import DECISION_LABELS
+from components.drilldown import PRODUCT_KEYS, build_row_index, node_rows, product_matrix
+
+
+@pytest.fixture(scope="module")
+def row_index(sample_rows):
+    return build_row_index(sample_rows)
+
+
+def _mask_rows(rows, year, region, subcategory):
+    # The rows of a node from a scan of every row
+    mask = (rows["Year"] == year) & (rows["Sub-Category"] == subcategory)
+    if region != "All":
+        mask &= rows["Region"] == region
+    return rows[mask]
+
+
+def _triples(names, revenue, yoy):
+    yoy = pd.Series(yoy, dtype=float).to_numpy()
+    return sorted(
+        (name, float(rev), None if np.isnan(y) else float(y))
+        for name, rev, y in zip(names, revenue, yoy)
+    )
+
+
+def test_node_rows_match_a_mask_scan(sample_rows, row_index):
+    years = sorted(sample_rows["Year"].unique())
+    regions = ["All"] + sorted(sample_rows["Region"].unique())
+    for year in years:
+        for region in regions:
+            for subcategory in sample_rows["Sub-Category"].unique():
+                got = node_rows(sample_rows, row_index, year, region, subcategory)
+                expected = _mask_rows(sample_rows, year, region, subcategory)
+                assert sorted(got.index) == sorted(expected.index), (year, region, subcategory)
+    assert node_rows(sample_rows, row_index, years[0] - 1, "All", "Binders").empty
+
+
+def test_product_yoy_matches_a_groupby(sample_rows, sample_views, row_index):
+    for year, region in sample_views:
+        for subcategory in sample_rows["Sub-Category"].unique():
+            rows = node_rows(sample_rows, row_index, year, region, subcategory)
+            prev_rows = node_rows(sample_rows, row_index, year - 1, region, subcategory)
+            products = product_matrix(rows, prev_rows)
+            if products.empty:
+                continue
+
+            scanned = _mask_rows(sample_rows, year, region, subcategory).groupby(PRODUCT_KEYS)["Sales"].sum().round(SUM_DECIMALS)
+            prev = _mask_rows(sample_rows, year - 1, region, subcategory).groupby(PRODUCT_KEYS)["Sales"].sum()
+            prev = prev.round(SUM_DECIMALS).reindex(scanned.index)
+            yoy = ((scanned - prev) / prev).round(3).where(prev > 0)
+
+            # Products carry no ID in the matrix: compare (name, revenue, YoY) triples
+            expected = _triples(scanned.index.get_level_values("Product Name"), scanned, yoy)
+            got = _triples(products["Sub-Category"], products["Revenue"], products["YoY Revenue %"])
+            assert got == expected, (year, region, subcategory)
+
+
+@pytest.mark.parametrize("product, label", [
+    # Revenue 10943, profit 1911, discount 0.32, YoY +5.1: a top product, rewarded for growth
+    ("GBC DocuBind TL300 Electric Binding System", "increase"),
+    # Revenue 5044, profit 1754, discount 0.15, no sales the year before
+    ("Fellowes PB300 Plastic Comb Binding Machine", "maintain"),
+    # Revenue 1890, loss of 2929 at 0.8 discount, YoY -58%
+    ("Ibico EPK-21 Electric Binding System", "reduce"),
+])
+def test_products_scored_against_product_thresholds(sample_rows, row_index, product, label):
+    rows = node_rows(sample_rows, row_index, 2017, "All", "Binders")
+    prev_rows = node_rows(sample_rows, row_index, 2016, "All", "Binders")
+    products = product_matrix(rows, prev_rows).set_index("Sub-Category")
+    assert products.loc[product, "Revenue Growth | New Customers"] == DECISION_LABELS[label]
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from components.elasticity import GROUP_KEYS, MIN_PERIODS, _t_quantile, fit_elasticity, period_sums
+
+
+@pytest.mark.parametrize("freq", ["month", "week"])
+def test_fit_matches_polyfit_per_group(sample_rows, freq):
+    sums = period_sums(sample_rows, freq)
+    estimates = fit_elasticity(sums, freq)
+    sums = sums[sums["Sales"] > 0]
+
+    fitted = 0
+    for key, group in sums.groupby(level=GROUP_KEYS):
+        x = (group["Discount_sum"] / group["Discount_count"]).to_numpy()
+        y = np.log(group["Sales"].to_numpy())
+        estimate = estimates.loc[key]
+        assert estimate["Periods"] == len(x)
+        # The same cut as the fit: a discount that never changed (up to float error) has no slope
+        if len(x) < MIN_PERIODS or ((x - x.mean()) ** 2).sum() <= 1e-12:
+            assert np.isnan(estimate["Elasticity"]), key
+            continue
+
+        # One least-squares line per group; polyfit's covariance is scaled by residuals / (n - 2)
+        (slope, _), cov = np.polyfit(x, y, 1, cov=True)
+        margin = _t_quantile(0.975, len(x) - 2) * np.sqrt(cov[0, 0])
+        assert estimate["Elasticity"] == pytest.approx(slope * x.mean(), abs=0.005 + 1e-9), key
+        assert estimate["CI Low"] == pytest.approx((slope - margin) * x.mean(), abs=0.005 + 1e-9), key
+        assert estimate["CI High"] == pytest.approx((slope + margin) * x.mean(), abs=0.005 + 1e-9), key
+        fitted += 1
+    assert fitted > 0
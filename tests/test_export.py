@@ -0,0 +1,113 @@
+import io
+import os
+import zipfile
+
+import pandas as pd
+import pytest
+
+from components.cube import SUM_DECIMALS, build_cube, build_trends
+from components.data_loader import DATA_PATH, derive_columns, read_workbook
+from components.elasticity import build_elasticity, region_estimates
+from components.export import clean_export_frame, iter_export_chunks, write_bulk_export
+from components.table_logic import summary
+
+KEYS = ["Category", "Sub-Category"]
+
+
+@pytest.fixture(scope="module")
+def workbook_rows():
+    # Rows as the original dashboard read them with pd.read_excel()
+    return derive_columns(read_workbook(DATA_PATH))
+
+
+def _exported(frame):
+    # The CSV download parsed back as text, so floats compare digit for digit
+    data = b"".join(iter_export_chunks(clean_export_frame(frame), "csv"))
+    out = pd.read_csv(io.BytesIO(data), dtype=str, keep_default_na=False)
+    return out[out["Sub-Category"] != "Total"].set_index(KEYS)
+
+
+@pytest.mark.parametrize("region", ["All", "West"])
+def test_csv_export_matches_workbook_sums(sample_rows, workbook_rows, region):
+    cube = build_cube(sample_rows)
+    trends = build_trends(cube)
+    rows = workbook_rows if region == "All" else workbook_rows[workbook_rows["Region"] == region]
+    by_year = {
+        year: rows[rows["Year"] == year].groupby(KEYS, observed=True).agg(
+            Revenue=("Sales", "sum"), Profit=("Profit", "sum")
+        ).round(SUM_DECIMALS)
+        for year in sorted(rows["Year"].unique())
+    }
+    history = workbook_rows.groupby(KEYS + ["Year"], observed=True)["Sales"].sum().round(SUM_DECIMALS)
+    trend = history.groupby(level=KEYS, observed=True).agg(lambda s: " ".join(str(v) for v in s))
+
+    for year in list(by_year)[1:]:
+        filtered = sample_rows[sample_rows["Year"] == year]
+        if region != "All":
+            filtered = filtered[filtered["Region"] == region]
+        frame = summary(sample_rows, filtered, year, region, "Revenue Growth", "New Customers", cube=cube, trends=trends)
+        out = _exported(frame)
+        expected = by_year[year].reindex(out.index)
+
+        assert out["Revenue"].tolist() == [str(v) for v in expected["Revenue"]]
+        assert out["Profit"].tolist() == [str(v) for v in expected["Profit"]]
+        assert out["Revenue Trend (All Years)"].tolist() == trend.reindex(out.index).tolist()
+
+
+def test_export_has_elasticity_estimates(sample_rows):
+    # The estimate and CI shown in the Elasticity Proxy tooltip, as numeric columns
+    cube = build_cube(sample_rows)
+    estimates = region_estimates(build_elasticity(sample_rows), "West")
+    frame = summary(sample_rows, None, 2017, "West", "Revenue Growth", "New Customers", cube=cube, trends=build_trends(cube))
+    out = clean_export_frame(frame, estimates)
+
+    columns = list(out.columns)
+    at = columns.index("Elasticity Proxy")
+    assert columns[at + 1:at + 4] == ["Elasticity", "Elasticity CI Low", "Elasticity CI High"]
+    is_total = out["Sub-Category"] == "Total"
+    assert out.loc[is_total, ["Elasticity", "Elasticity CI Low", "Elasticity CI High"]].isna().all().all()
+    rows = out[~is_total].set_index(KEYS)
+    expected = estimates.reindex(rows.index)
+    for col, exported in [("Elasticity", "Elasticity"), ("CI Low", "Elasticity CI Low"), ("CI High", "Elasticity CI High")]:
+        pd.testing.assert_series_equal(rows[exported], expected[col], check_names=False)
+    assert "Elasticity" not in clean_export_frame(frame).columns
+
+
+def _export_frame(sample_rows, region):
+    cube = build_cube(sample_rows)
+    frame = summary(sample_rows, None, 2017, region, "Revenue Growth", "New Customers", cube=cube, trends=build_trends(cube))
+    return frame, region_estimates(build_elasticity(sample_rows), region)
+
+
+def _read(data, fmt):
+    if fmt == "parquet":
+        return pd.read_parquet(io.BytesIO(data))
+    return pd.read_excel(io.BytesIO(data), sheet_name="Export")
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "xlsx"])
+def test_export_round_trip(sample_rows, fmt):
+    frame, estimates = _export_frame(sample_rows, "West")
+    clean = clean_export_frame(frame, estimates)
+    # Small chunks, so the rows are written over several row groups / appends
+    data = b"".join(iter_export_chunks(clean, fmt, chunk_rows=4))
+
+    out = _read(data, fmt)
+    assert list(out.columns) == list(clean.columns)
+    pd.testing.assert_frame_equal(out, clean.reset_index(drop=True), check_dtype=fmt == "parquet")
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "xlsx"])
+def test_bulk_export_round_trip(sample_rows, tmp_path, fmt):
+    views = [(f"2017/{region}", *_export_frame(sample_rows, region)) for region in ["All", "West"]]
+    empty = ("2017/None", views[0][1].iloc[:0], None)
+    path = write_bulk_export(iter(views + [empty]), fmt, directory=tmp_path)
+
+    with zipfile.ZipFile(path) as archive:
+        assert archive.namelist() == [f"2017/All.{fmt}", f"2017/West.{fmt}"]
+        for name, frame, estimates in views:
+            data = archive.read(f"{name}.{fmt}")
+            out = pd.read_csv(io.BytesIO(data)) if fmt == "csv" else _read(data, fmt)
+            expected = clean_export_frame(frame, estimates).reset_index(drop=True)
+            pd.testing.assert_frame_equal(out, expected, check_dtype=fmt == "parquet")
+    os.remove(path)
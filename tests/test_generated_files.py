@@ -0,0 +1,51 @@
+'''
+app.py, _build/app.py and the Dashboard.html pages are generated by `quarto render`
+from Dashboard.qmd and navbar-filter.lua: changes belong in those two files, and
+the outputs must be rendered again in the same commit. These tests fail when an
+output lacks code of its sources, e.g. a qmd cell edited without rendering again
+or a hand edit inside a cell of app.py. They check what quarto copies from the
+sources, not the layout quarto wraps around it.
+'''
+import re
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _code_lines(code):
+    # Non-blank lines without their indentation (server cells are indented in app.py)
+    return "\n".join(line.strip() for line in code.split("\n") if line.strip() and not line.startswith("#| "))
+
+
+def python_cells(qmd):
+    # Code of every python cell, in order
+    return [_code_lines(match.group(1)) for match in re.finditer(r"^```\{python\}\n(.*?)^```", qmd, re.S | re.M)]
+
+
+@pytest.mark.parametrize("app_file", ["app.py", "_build/app.py"])
+def test_app_has_every_qmd_cell(app_file):
+    app = _code_lines((ROOT / app_file).read_text())
+    start = 0
+    for cell in python_cells((ROOT / "Dashboard.qmd").read_text()):
+        found = app.find(cell, start)
+        assert found >= 0, cell.split("\n")[0]
+        start = found + len(cell)
+
+
+@pytest.mark.parametrize("page", ["Dashboard.html", "_build/Dashboard.html"])
+def test_page_has_filter_script(page):
+    lua = (ROOT / "navbar-filter.lua").read_text()
+    script = re.search(r'include_text\("after-body", \[\[\n?(.*?)\]\]\)', lua, re.S).group(1)
+    assert script in (ROOT / page).read_text()
+
+
+@pytest.mark.parametrize("page", ["Dashboard.html", "_build/Dashboard.html"])
+def test_page_has_every_input_and_output(page):
+    qmd = (ROOT / "Dashboard.qmd").read_text()
+    ids = re.findall(r'ui\.input_\w+\(\s*"(\w+)"', qmd)
+    ids += re.findall(r"^@render\.(?:ui|text|download)\b.*?^(?:async )?def (\w+)", qmd, re.M | re.S)
+    html = (ROOT / page).read_text()
+    assert ids
+    assert [i for i in ids if f'id="{i}"' not in html] == []
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+
+import pytest
+from starlette.applications import Starlette
+
+from components import metrics
+from components.metrics import (
+    METRICS_PATH, Histogram, metrics_endpoint, mount_metrics, register_gauge, render_metrics, span, trace,
+)
+
+
+@pytest.fixture
+def recording(monkeypatch):
+    # A fresh stage histogram, recorded into as with DASHBOARD_METRICS=1
+    histogram = Histogram("dashboard_stage_seconds", "Time spent in each stage.", buckets=(0.5, 10.0))
+    monkeypatch.setattr(metrics, "stage_seconds", histogram)
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    monkeypatch.setattr(metrics, "SLOW_RENDER_SECONDS", None)
+    return histogram
+
+
+def test_histogram_exposition_format():
+    histogram = Histogram("test_seconds", "Test durations.", buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 2.0):
+        histogram.observe("load", seconds)
+
+    assert histogram.render().splitlines() == [
+        "# HELP test_seconds Test durations.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{stage="load",le="0.1"} 1',
+        'test_seconds_bucket{stage="load",le="1.0"} 2',
+        'test_seconds_bucket{stage="load",le="+Inf"} 3',
+        'test_seconds_sum{stage="load"} 2.55',
+        'test_seconds_count{stage="load"} 3',
+    ]
+
+
+def test_spans_recorded_only_when_enabled(recording, monkeypatch):
+    with trace("render", year=2017):
+        with span("aggregate"):
+            pass
+        with span("aggregate"):
+            pass
+    snapshot = recording.snapshot()
+    assert snapshot["render"]["count"] == 1
+    assert snapshot["aggregate"]["count"] == 2
+
+    monkeypatch.setattr(metrics, "ENABLED", False)
+    assert span("aggregate") is metrics._NOOP
+    with trace("render"):
+        pass
+    assert recording.snapshot()["render"]["count"] == 1
+
+
+def test_slow_trace_logged_with_stages(recording, monkeypatch, caplog):
+    monkeypatch.setattr(metrics, "SLOW_RENDER_SECONDS", 0.0)
+    with caplog.at_level(logging.WARNING, logger="dashboard.metrics"):
+        with trace("render", year=2017, region="West"):
+            with span("aggregate"):
+                pass
+    assert len(caplog.records) == 1
+    message = caplog.records[0].getMessage()
+    assert message.startswith("slow render: ")
+    assert "{'year': 2017, 'region': 'West'}" in message
+    assert "stages={'aggregate': " in message
+
+
+def test_metrics_route_serves_histograms_and_gauges(recording):
+    with span("load"):
+        pass
+    register_gauge("test_metrics_views", "Test views.", "state", lambda: {"done": 3, "total": 5})
+
+    app = Starlette()
+    mount_metrics(app)
+    route = app.router.routes[0]
+    assert route.path == METRICS_PATH
+    assert route.endpoint is metrics_endpoint
+
+    response = asyncio.run(metrics_endpoint(None))
+    assert response.media_type == "text/plain; version=0.0.4"
+    body = response.body.decode()
+    assert body == render_metrics()
+    lines = body.splitlines()
+    assert 'dashboard_stage_seconds_count{stage="load"} 1' in lines
+    assert "# TYPE test_metrics_views gauge" in lines
+    assert 'test_metrics_views{state="done"} 3' in lines
+    assert 'test_metrics_views{state="total"} 5' in lines
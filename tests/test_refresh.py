@@ -0,0 +1,126 @@
+import pandas as pd
+import pytest
+
+from components import refresh
+from components.cube import build_cube, build_trends
+from components.data_loader import (
+    LOADED_COLUMNS, apply_schema, cache_path_for, dataset_version, derive_columns, read_cache, read_source,
+    read_workbook,
+)
+from components.refresh import DatasetRefresher, DatasetState, apply_update, diff_rows
+
+
+def _state(df, version="v1"):
+    cube = build_cube(df)
+    return DatasetState(version, df, cube, build_trends(cube), df["Order Date"].max())
+
+
+def _workbook(sample_rows):
+    # The sample as the workbook gives it: plain strings, sheet order, no "Year"
+    rows = sample_rows.drop(columns="Year").sort_values("Row ID", ignore_index=True)
+    return rows.astype({col: "object" for col in rows.select_dtypes("category").columns})
+
+
+def _appended(rows, **values):
+    # A copy of the first order line under a new Row ID, with some values changed
+    row = rows.iloc[[0]].copy()
+    row["Row ID"] = rows["Row ID"].max() + 1
+    for col, value in values.items():
+        row[col] = value
+    return row
+
+
+def _loaded(raw):
+    # What a fresh load of these source rows holds in memory
+    return derive_columns(apply_schema(raw))[LOADED_COLUMNS]
+
+
+@pytest.mark.parametrize("values", [
+    {"Sub-Category": "Drones", "Category": "Technology"},
+    {"Region": "North"},
+])
+def test_append_with_new_category(sample_rows, values):
+    raw = _workbook(sample_rows)
+    new = pd.concat([raw, _appended(raw, **values)], ignore_index=True)
+
+    state, changes = apply_update(_state(_loaded(raw)), apply_schema(new), "v2")
+
+    assert len(changes.appended) == 1 and len(changes.corrected) == 0 and len(changes.removed) == 0
+    expected = _state(_loaded(new), "v2")
+    pd.testing.assert_frame_equal(state.df, expected.df)
+    pd.testing.assert_frame_equal(state.cube, expected.cube, rtol=1e-9)
+    pd.testing.assert_frame_equal(state.trends.sort_index(), expected.trends.sort_index(), rtol=1e-9)
+
+
+def test_corrected_row_with_new_category(sample_rows):
+    raw = _workbook(sample_rows)
+    new = raw.copy()
+    new.loc[5, "Sub-Category"] = "Drones"
+
+    changes = diff_rows(_loaded(raw), apply_schema(new))
+
+    assert changes.corrected["Row ID"].tolist() == [new.loc[5, "Row ID"]]
+
+
+def test_year_derived_for_changed_rows_only(sample_rows, monkeypatch):
+    raw = _workbook(sample_rows)
+    new = pd.concat([raw, _appended(raw)], ignore_index=True)
+    new.loc[7, "Order Date"] = new.loc[7, "Order Date"] - pd.DateOffset(years=1)
+    new = new.drop(index=11)
+    derived = []
+
+    def spy(df):
+        derived.append(len(df))
+        return derive_columns(df)
+
+    monkeypatch.setattr(refresh, "derive_columns", spy)
+    state, changes = apply_update(_state(_loaded(raw)), apply_schema(new), "v2")
+
+    assert (len(changes.appended), len(changes.corrected), len(changes.removed)) == (1, 1, 1)
+    assert sum(derived) == 2
+    pd.testing.assert_frame_equal(state.df, _loaded(new))
+
+
+def test_refresher_applies_workbook_changes(sample_rows, tmp_path):
+    raw = _workbook(sample_rows).iloc[:400]
+    path = tmp_path / "orders.xlsx"
+    raw.to_excel(path, index=False)
+    refresher = DatasetRefresher(_state(read_source(path)[LOADED_COLUMNS], dataset_version(path)), path, cache_dir=tmp_path)
+    assert not refresher.check()
+
+    new = pd.concat([raw, _appended(raw, **{"Sub-Category": "Drones"})], ignore_index=True)
+    new.loc[3, "Sales"] = 1234.5
+    new.to_excel(path, index=False)
+
+    assert refresher.check()
+    fresh = read_source(path)
+    pd.testing.assert_frame_equal(refresher.state.df, fresh[LOADED_COLUMNS])
+    pd.testing.assert_frame_equal(read_cache(cache_path_for(path, tmp_path)), fresh)
+
+
+def test_loaded_rows_keep_the_sheet_order(sample_rows):
+    # Refreshes compare rows by position and the cube sums the "All" rollup in this order
+    assert sample_rows["Row ID"].is_monotonic_increasing
+    assert isinstance(sample_rows.index, pd.RangeIndex)
+
+
+def test_cell_edit_compared_by_position(sample_rows, tmp_path, monkeypatch):
+    raw = _workbook(sample_rows).iloc[:400]
+    path = tmp_path / "orders.xlsx"
+    raw.to_excel(path, index=False)
+    loaded = read_source(path)[LOADED_COLUMNS]
+    raw.loc[3, "Sales"] = 1234.5
+    raw.to_excel(path, index=False)
+    rows = read_workbook(path)
+
+    # The loaded rows are still the rows of the re-read sheet, in the same order:
+    # no key lookup is needed
+    def lookup(*args, **kwargs):
+        raise AssertionError("rows matched through a key lookup")
+
+    monkeypatch.setattr(pd.Index, "get_indexer", lookup)
+    changes = diff_rows(loaded, rows)
+    monkeypatch.undo()
+
+    assert changes.corrected["Row ID"].tolist() == [raw.loc[3, "Row ID"]]
+    assert changes.appended.empty and changes.removed.empty
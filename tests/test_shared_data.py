@@ -0,0 +1,108 @@
+import os
+
+import pandas as pd
+import pytest
+
+from benchmarks.bench_workers import measure_workers
+from components import shared_data
+from components.data_loader import LOADED_COLUMNS, read_source
+from components.refresh import DatasetState
+from components.shared_data import SharedDatasetRefresher, attach, deployment_dir, load_shared, publish, release
+
+WORKERS = 3
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux /proc")
+def test_attached_workers_share_the_dataset(sample_rows, tmp_path):
+    # The columns a worker keeps, about 400k rows, so the dataset outweighs what a
+    # worker allocates besides it
+    df = pd.concat([sample_rows[LOADED_COLUMNS]] * 40, ignore_index=True)
+    segment = publish(df, "test", tmp_path)
+    segment_kb = sum(f.stat().st_size for f in segment.iterdir()) / 1024
+
+    copy = measure_workers("copy", WORKERS, tmp_path, "test")
+    shared = measure_workers("shared", WORKERS, tmp_path, "test")
+
+    # Memory only that worker maps (USS): a copy holds the whole dataset, an attached
+    # worker only its own bookkeeping; RSS also counts the pages mapped by every worker
+    copied = min(after.uss - before.uss for before, after in copy)
+    for before, after in shared:
+        assert after.uss - before.uss < segment_kb / 2
+        assert after.uss - before.uss < copied / 3
+        assert after.rss - before.rss < min(after.rss - before.rss for before, after in copy)
+
+
+def test_attach_wraps_the_published_frames(sample_rows, tmp_path):
+    publish(sample_rows, "v1", tmp_path)
+    data = attach(tmp_path)
+    assert data.version == "v1"
+    pd.testing.assert_frame_equal(data.df, sample_rows, check_dtype=False, check_categorical=False)
+
+
+def _workbook(sample_rows, path):
+    # A small workbook of the first 400 orders; returns its rows
+    rows = sample_rows.drop(columns="Year").sort_values("Row ID", ignore_index=True).iloc[:400]
+    rows = rows.astype({col: "object" for col in rows.select_dtypes("category").columns})
+    rows.to_excel(path, index=False)
+    return rows
+
+
+def test_one_worker_publishes_a_refresh_the_others_attach(sample_rows, tmp_path, monkeypatch):
+    path = tmp_path / "orders.xlsx"
+    rows = _workbook(sample_rows, path)
+    shared_dir, cache_dir = tmp_path / "shared", tmp_path / "cache"
+
+    def worker():
+        data = load_shared(path, shared_dir, cache_dir)
+        state = DatasetState(data.version, data.df, data.cube, data.trends, None)
+        return SharedDatasetRefresher(state, path, cache_dir=cache_dir, shared_dir=shared_dir)
+
+    workers = [worker(), worker()]
+    rows.loc[3, "Sales"] = 1234.5
+    rows.to_excel(path, index=False)
+
+    loads = []
+    load_dataset = shared_data.load_dataset
+    monkeypatch.setattr(shared_data, "load_dataset", lambda *args: loads.append(args) or load_dataset(*args))
+    assert all(w.check() for w in workers)
+    assert not any(w.check() for w in workers)
+
+    # Read once, by the first worker; both map the same published segment
+    assert len(loads) == 1
+    fresh = read_source(path)[LOADED_COLUMNS]
+    for w in workers:
+        assert w.state.version == shared_data.current_version(shared_dir)
+        pd.testing.assert_frame_equal(w.state.df, fresh, check_dtype=False, check_categorical=False)
+
+
+def test_deployments_keep_their_own_segments(sample_rows, tmp_path):
+    # Two checkouts on one host: publishing and pruning in one never touches the other
+    first, second = deployment_dir("/srv/a/orders.xls", tmp_path), deployment_dir("/srv/b/orders.xls", tmp_path)
+    assert first != second
+    assert deployment_dir("/srv/a/orders.xls", tmp_path) == first
+
+    publish(sample_rows, "v1", second)
+    for version in ["v1", "v2", "v3"]:
+        publish(sample_rows, version, first)
+    assert shared_data.current_version(second) == "v1"
+    assert attach(second).version == "v1"
+    assert sorted(entry.name for entry in os.scandir(first) if entry.is_dir()) == ["v2", "v3"]
+
+
+@pytest.mark.skipif(shared_data.fcntl is None, reason="needs fcntl")
+def test_last_worker_to_exit_removes_the_segments(sample_rows, tmp_path):
+    path = tmp_path / "orders.xlsx"
+    _workbook(sample_rows, path)
+    shared_dir = str(tmp_path / "shared")
+    cache_dir = tmp_path / "cache"
+
+    load_shared(path, shared_dir, cache_dir)
+    # Another worker of the deployment, attached through its own users file lock
+    with open(os.path.join(shared_dir, shared_data.USERS_FILE)) as other:
+        shared_data.fcntl.flock(other, shared_data.fcntl.LOCK_SH)
+        assert not release(shared_dir)
+        assert os.path.isdir(shared_dir)
+
+    load_shared(path, shared_dir, cache_dir)
+    assert release(shared_dir)
+    assert not os.path.exists(shared_dir)
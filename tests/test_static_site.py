@@ -0,0 +1,63 @@
+import json
+import re
+
+import pytest
+
+from components.cube import build_cube
+from components.Discount_logic import COMPANY_GOALS, CUSTOMER_PRIORITIES
+from components.static_site import build_site, pair_slug
+from components.table_logic import DEFAULT_GOAL, DEFAULT_PRIORITY, strategy_view, summary_matrix, view_options
+from components.table_visual import strategy_cells
+
+
+@pytest.fixture(scope="module")
+def site(tmp_path_factory):
+    output = tmp_path_factory.mktemp("site")
+    build_site(output, workers=1)
+    return output
+
+
+def _manifest(site):
+    page = (site / "index.html").read_text(encoding="utf-8")
+    return json.loads(re.search(r"var SITE = (.*?);</script>", page).group(1))
+
+
+def test_filter_choices_match_the_app(site, sample_rows):
+    manifest = _manifest(site)
+    regions, years = view_options(build_cube(sample_rows))
+    assert manifest["regions"] == regions
+    assert manifest["years"] == years
+    assert manifest["goals"] == COMPANY_GOALS
+    assert manifest["priorities"] == CUSTOMER_PRIORITIES
+    assert manifest["default"] == {
+        "year": years[-1], "region": "All", "goal": DEFAULT_GOAL, "priority": DEFAULT_PRIORITY,
+    }
+    assert manifest["defaultPair"] == pair_slug(DEFAULT_GOAL, DEFAULT_PRIORITY)
+    for year in years:
+        for region in regions:
+            assert (site / "views" / str(year) / region / "table.html").is_file(), (year, region)
+
+
+def test_default_table_and_strategies(site, sample_rows):
+    year = _manifest(site)["default"]["year"]
+    folder = site / "views" / str(year) / "All"
+    table = (folder / "table.html").read_text(encoding="utf-8")
+    strategies = json.loads((folder / "strategies.json").read_text(encoding="utf-8"))
+
+    matrix = summary_matrix(sample_rows, None, year, "All")
+    expected = strategy_cells(strategy_view(matrix, DEFAULT_GOAL, DEFAULT_PRIORITY))
+    assert strategies[pair_slug(DEFAULT_GOAL, DEFAULT_PRIORITY)] == expected
+    assert len(strategies) == len(COMPANY_GOALS) * len(CUSTOMER_PRIORITIES)
+    # GT's table ids are random: compare the cells the page shows, not the markup
+    for cell in expected:
+        assert cell["html"] in table
+    for sub_category in matrix["Sub-Category"].dropna():
+        assert sub_category in table
+
+
+def test_page_assets_copied(site):
+    page = (site / "index.html").read_text(encoding="utf-8")
+    assert "$manifest" not in page and "$last_updated" not in page
+    assert (site / "site.js").is_file()
+    for name in re.findall(r'(?:href|src)="([^"#:]+)"', page):
+        assert (site / name).is_file(), name
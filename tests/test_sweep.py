@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from components.cube import build_cube
+from components.Discount_logic import (
+    COMPANY_GOALS, CUSTOMER_PRIORITIES, DECISION_LABELS, discount_policy, market_context,
+    strategy_column, strategy_matrix,
+)
+from components.sweep import DECISIONS, PARAMETERS, evaluate, policy_grid, score_inputs, sweep
+
+
+@pytest.fixture(scope="module")
+def inputs(sample_rows):
+    return score_inputs(build_cube(sample_rows))
+
+
+def test_current_policy_flips_nothing(inputs):
+    # The current policy several times over, in chunks of one policy spread over two processes
+    grid = pd.concat([policy_grid({})] * 3, ignore_index=True)
+    assert sweep(inputs, grid, workers=1).empty
+    assert sweep(inputs, grid, workers=2, chunk_size=1).empty
+
+
+def test_grid_of_current_values_flips_nothing(inputs):
+    # Every parameter varied over its own current value only
+    grid = policy_grid({name: [value, value] for name, value in PARAMETERS.items()})
+    assert len(grid) == 2 ** len(PARAMETERS)
+    assert sweep(inputs, grid, workers=1).empty
+
+
+@pytest.mark.parametrize("changes", [
+    {},
+    # Policies under which some decisions differ from the current one (56 and 1115 of them)
+    {"high_revenue": 50000, "low_profit": 4000},
+    {"inflation_rate": 0.09, "competitor_discount": 0.05},
+])
+def test_evaluate_matches_strategy_matrix(inputs, changes):
+    policy = {name: changes.get(name, value) for name, value in discount_policy.items()}
+    context = {name: changes.get(name, value) for name, value in market_context.items()}
+    grid = policy_grid({name: [value] for name, value in changes.items()})
+    decisions = evaluate(inputs, grid)[0]
+
+    matrix = strategy_matrix(inputs.reset_index(drop=True), policy, context)
+    pairs = [(goal, priority) for goal in COMPANY_GOALS for priority in CUSTOMER_PRIORITIES]
+    for i, (goal, priority) in enumerate(pairs):
+        labels = [DECISION_LABELS[DECISIONS[code]] for code in decisions[i]]
+        assert labels == matrix[strategy_column(goal, priority)].tolist(), (goal, priority)
@@ -0,0 +1,91 @@
+import pandas as pd
+import polars as pl
+import pytest
+
+from components import table_logic_polars
+from components.cube import MEAN_DECIMALS, SUM_DECIMALS, build_cube, build_trends
+from components.table_logic import DISPLAY_COLUMNS, summary_matrix
+
+MEASURES = ["Revenue", "Profit", "Discount", "Quantity", "YoY Revenue %"]
+
+
+@pytest.fixture(scope="module")
+def cube_and_trends(sample_rows):
+    cube = build_cube(sample_rows)
+    return cube, build_trends(cube)
+
+
+def _view_rows(rows, year, region):
+    # The rows of a view in workbook order, as the original dashboard filtered them
+    rows = rows[rows["Year"] == year].sort_values("Row ID")
+    return rows if region == "All" else rows[rows["Region"] == region]
+
+
+def _scanned(rows, year, region):
+    # The summary measures from a scan of the raw rows, like the original summary() did,
+    # to the precision of the source
+    sub = _view_rows(rows, year, region).groupby("Sub-Category", observed=True).agg(
+        Revenue=("Sales", "sum"), Profit=("Profit", "sum"), Discount=("Discount", "sum"),
+        Count=("Discount", "count"), Quantity=("Quantity", "sum"),
+    ).round(SUM_DECIMALS)
+    sub["Discount"] = (sub["Discount"] / sub.pop("Count")).round(MEAN_DECIMALS)
+    prev = _view_rows(rows, year - 1, region).groupby("Sub-Category", observed=True)["Sales"].sum()
+    prev = prev.round(SUM_DECIMALS).reindex(sub.index)
+    sub["YoY Revenue %"] = ((sub["Revenue"] - prev) / prev).round(3).where(prev > 0)
+    return sub
+
+
+def _detail(matrix):
+    # Sub-category rows of a summary_matrix() result (sub-categories are unique across categories)
+    if not isinstance(matrix, pd.DataFrame):
+        matrix = matrix.to_pandas()
+    detail = matrix[matrix["Category_Display"] != "Total"]
+    return detail.set_index(detail["Sub-Category"].astype(str))
+
+
+def test_cube_matches_row_scan_for_every_view(sample_rows, sample_views, cube_and_trends):
+    cube, trends = cube_and_trends
+    for year, region in sample_views:
+        matrix = summary_matrix(sample_rows, _view_rows(sample_rows, year, region), year, region, cube=cube, trends=trends)
+        got = _detail(matrix)[MEASURES]
+        expected = _scanned(sample_rows, year, region)
+        expected = expected.set_axis(expected.index.astype(str)).reindex(got.index)
+
+        assert sorted(got.index) == sorted(expected.index), (year, region)
+        pd.testing.assert_frame_equal(
+            got.astype(float), expected.astype(float), check_exact=True, check_names=False, obj=f"{year} {region}"
+        )
+
+
+def _display(matrix):
+    # Every cell of a summary_matrix() result as the table and the exports show it
+    if not isinstance(matrix, pd.DataFrame):
+        matrix = matrix.to_pandas()
+    return matrix.astype(object).where(matrix.notna(), None).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("with_trends", [True, False])
+def test_polars_row_scan_matches_cube_for_every_view(sample_rows, sample_views, cube_and_trends, with_trends):
+    cube, trends = cube_and_trends
+    rows = table_logic_polars.rows_frame(sample_rows)
+    polars_trends = pl.from_pandas(trends.reset_index()) if with_trends else None
+    for year, region in sample_views:
+        expected = _display(summary_matrix(sample_rows, None, year, region, cube=cube, trends=trends))
+        got = _display(table_logic_polars.summary_matrix(rows, year, region, trends=polars_trends))
+
+        # Same rows, order, numbers, display strings and labels, Total rows included
+        assert got.columns.tolist() == expected.columns.tolist()
+        assert set(DISPLAY_COLUMNS[:-1]) <= set(got.columns)
+        for col in got.columns:
+            assert got[col].map(str).tolist() == expected[col].map(str).tolist(), (year, region, col)
+
+
+def test_view_decided_from_cube_without_rows(sample_rows, sample_views, cube_and_trends):
+    cube, trends = cube_and_trends
+    year, region = sample_views[-1]
+    with_rows = summary_matrix(sample_rows, _view_rows(sample_rows, year, region), year, region, cube=cube, trends=trends)
+    pd.testing.assert_frame_equal(summary_matrix(sample_rows, None, year, region, cube=cube, trends=trends), with_rows)
+
+    first_year = int(sample_rows["Year"].min())
+    assert summary_matrix(sample_rows, None, first_year - 1, "All", cube=cube, trends=trends).empty
+    assert summary_matrix(sample_rows, None, year, "Nowhere", cube=cube, trends=trends).empty
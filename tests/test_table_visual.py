@@ -0,0 +1,50 @@
+from html.parser import HTMLParser
+
+import pytest
+
+from components.cube import build_cube, build_trends
+from components.table_logic import summary
+from components.table_visual import body_html, build_table, render_table_html, table_rows_html
+
+
+class _Rows(HTMLParser):
+    # Rows of every <tbody> in a piece of HTML, as the text of their cells
+    def __init__(self, html):
+        super().__init__()
+        self.bodies = []
+        self.feed(html)
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tbody":
+            self.bodies.append([])
+        elif tag == "tr" and self.bodies:
+            self.bodies[-1].append([])
+        elif tag == "td" and self.bodies:
+            self.bodies[-1][-1].append("")
+
+    def handle_data(self, data):
+        if self.bodies and self.bodies[-1] and self.bodies[-1][-1]:
+            self.bodies[-1][-1][-1] += data.strip()
+
+
+@pytest.fixture(scope="module")
+def view(sample_rows):
+    cube = build_cube(sample_rows)
+    year = int(sample_rows["Year"].max())
+    df_sum = summary(sample_rows, None, year, "All", "Revenue Growth", "New Customers", cube=cube, trends=build_trends(cube))
+    return df_sum, year
+
+
+def test_body_html_is_the_body_of_the_full_table(view):
+    df_sum, year = view
+    tbl = build_table(df_sum, year, "All")
+    body = body_html(tbl)
+    assert body.startswith('<tbody class="gt_table_body">')
+    assert body in tbl._repr_html_()
+
+
+def test_page_rows_match_the_full_table(view):
+    df_sum, year = view
+    full, = _Rows(render_table_html(df_sum, year, "All")).bodies
+    page = _Rows(table_rows_html(df_sum, year, "All", 5, 12)).bodies
+    assert page == [full[5:12]]
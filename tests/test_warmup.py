@@ -0,0 +1,80 @@
+import time
+
+from app import dashboard, region_options, year_options
+from components.warmup import Warmup, WarmupProgress
+
+VIEWS = [(2017, "All"), (2017, "West"), (2016, "All"), (2016, "West")]
+
+
+def _wait_until(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def _finished(warmup):
+    progress = warmup.progress()
+    return progress.total > 0 and not progress.running
+
+
+def test_views_warmed_in_order():
+    warmed = []
+    warmup = Warmup(lambda: VIEWS, lambda *view: warmed.append(view), idle_seconds=0)
+    warmup.start()
+    _wait_until(lambda: _finished(warmup))
+
+    assert warmed == VIEWS
+    assert warmup.progress()[:3] == (len(VIEWS), 0, len(VIEWS))
+    assert warmup.metric_values() == {"done": len(VIEWS), "failed": 0, "total": len(VIEWS)}
+
+
+def test_failed_view_does_not_stop_the_others():
+    warmed = []
+
+    def warm(year, region):
+        if region == "West":
+            raise ValueError("failed")
+        warmed.append((year, region))
+
+    warmup = Warmup(lambda: VIEWS, warm, workers=2, idle_seconds=0)
+    warmup.start()
+    _wait_until(lambda: _finished(warmup))
+
+    assert sorted(warmed) == [(2016, "All"), (2017, "All")]
+    assert warmup.progress()[:3] == (2, 2, len(VIEWS))
+
+
+def test_requests_come_first():
+    warmed = []
+    warmup = Warmup(lambda: VIEWS, lambda *view: warmed.append(time.monotonic()), idle_seconds=0.2)
+    warmup.start()
+    # A request every 50ms for half a second: no view starts until they stop
+    for _ in range(10):
+        warmup.note_activity()
+        time.sleep(0.05)
+    assert warmed == []
+    last_request = warmup.last_activity
+    _wait_until(lambda: _finished(warmup))
+    assert len(warmed) == len(VIEWS)
+    assert warmed[0] - last_request >= 0.2
+
+
+def test_new_run_abandons_the_previous_one():
+    warmed = []
+    warmup = Warmup(lambda: VIEWS, lambda *view: warmed.append(view), idle_seconds=0.2)
+    warmup.note_activity()
+    warmup.start()
+    warmup.start()
+    _wait_until(lambda: _finished(warmup))
+    time.sleep(0.3)
+
+    # The first run gave up while waiting for quiet: every view is warmed once, in order
+    assert warmed == VIEWS
+    assert warmup.progress() == WarmupProgress(len(VIEWS), 0, len(VIEWS), warmup.progress().seconds, False)
+
+
+def test_dashboard_warms_latest_year_and_all_regions_first():
+    views = dashboard.warmup_views()
+    assert views[0] == (year_options[-1], "All")
+    assert views == [(year, region) for year in reversed(year_options) for region in region_options]